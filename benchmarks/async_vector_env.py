@@ -0,0 +1,60 @@
+"""
+Throughput of `async_vector_env` against the single process loops.
+
+    python benchmarks/async_vector_env.py --num-envs 256 --steps 2000
+"""
+
+import argparse
+import os
+import time
+import numpy as np
+from pikazoo import pikazoo_v0
+
+
+def bench_raw_env_loop(num_envs: int, steps: int) -> float:
+    envs = [pikazoo_v0.env() for _ in range(num_envs)]
+    for n, env in enumerate(envs):
+        env.reset(seed=n)
+    actions = np.random.default_rng(0).integers(0, 18, size=(steps, num_envs, 2))
+    start = time.perf_counter()
+    for t in range(steps):
+        for n, env in enumerate(envs):
+            env.step({"player_1": actions[t, n, 0], "player_2": actions[t, n, 1]})
+            if not env.agents:
+                env.reset()
+    return num_envs * steps / (time.perf_counter() - start)
+
+
+def bench_vector_env(env, num_envs: int, steps: int) -> float:
+    env.reset(seed=0)
+    actions = np.random.default_rng(0).integers(0, 18, size=(steps, num_envs, 2))
+    start = time.perf_counter()
+    for t in range(steps):
+        env.step(actions[t])
+    frames_per_second = num_envs * steps / (time.perf_counter() - start)
+    env.close()
+    return frames_per_second
+
+
+def report(name: str, frames_per_second: float):
+    print(f"{name:<24}: {frames_per_second:>12,.0f} frames/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-envs", type=int, default=256)
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--num-workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    num_envs, steps = args.num_envs, args.steps
+    print(f"num_envs={num_envs}, steps={steps}, num_workers={args.num_workers}, cores={os.cpu_count()}")
+    report("raw_env loop", bench_raw_env_loop(num_envs, max(steps // 10, 1)))
+    report("vector_env", bench_vector_env(pikazoo_v0.vector_env(num_envs=num_envs), num_envs, steps))
+    for context in ("fork", "spawn"):
+        env = pikazoo_v0.async_vector_env(num_envs=num_envs, num_workers=args.num_workers, context=context)
+        report(f"async_vector_env {context}", bench_vector_env(env, num_envs, steps))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Computer-vs-computer frames per second of `raw_env` with the random numbers drawn by `np_random.integers` (before)
+and handed out by `BufferedRandom` (after).
+
+    python benchmarks/buffered_random.py --frames 20000 --rounds 5
+"""
+
+import argparse
+import time
+from pikazoo import pikazoo_v0
+
+
+def bench(frames: int, buffered_random: bool) -> float:
+    env = pikazoo_v0.env(is_player1_computer=True, is_player2_computer=True, buffered_random=buffered_random)
+    env.reset(seed=0)
+    actions = {"player_1": 0, "player_2": 0}
+    start = time.perf_counter()
+    for _ in range(frames):
+        env.step(actions)
+        if not env.agents:
+            env.reset()
+    return frames / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, buffered_random in (("np_random.integers", False), ("BufferedRandom", True)):
+        fps = max(bench(args.frames, buffered_random) for _ in range(args.rounds))
+        print(f"{name:<18}: {fps:10,.0f} frames/s")
+
+
+if __name__ == "__main__":
+    main()
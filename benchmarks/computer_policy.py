@@ -0,0 +1,62 @@
+"""
+Decisions per second of the computer for a batch of matches,
+one `let_computer_decide_user_input` call of `physics.py` per match (before) and one `ComputerPolicy` call (after).
+
+    python benchmarks/computer_policy.py --num-envs 1024 --rounds 5
+"""
+
+import argparse
+import time
+import numpy as np
+from pikazoo import pikazoo_v0
+from pikazoo.env import physics
+from pikazoo.env.physics import PikaUserInput
+from pikazoo.env.vec_computer import ComputerPolicy, get_physics_state
+
+
+def collect_envs(num_envs: int):
+    """`raw_env`s of computer vs computer matches at different frames"""
+    envs = []
+    for n in range(num_envs):
+        env = pikazoo_v0.env(is_player1_computer=True, is_player2_computer=True)
+        env.reset(seed=n)
+        for _ in range(n % 300):
+            env.step({"player_1": 0, "player_2": 0})
+        envs.append(env)
+    return envs
+
+
+def bench_scalar(envs) -> float:
+    user_input = PikaUserInput()
+    np_random = np.random.default_rng(0)
+    start = time.perf_counter()
+    for env in envs:
+        p = env.physics
+        physics.calculate_expected_landing_point_x_for(p.ball)
+        physics.let_computer_decide_user_input(p.player2, p.ball, p.player1, user_input, np_random)
+    return len(envs) / (time.perf_counter() - start)
+
+
+def bench_policy(envs) -> float:
+    state = np.stack([get_physics_state(env.physics) for env in envs], axis=1)
+    np_randoms = [np.random.default_rng(n) for n in range(len(envs))]
+    policy = ComputerPolicy(len(envs), side="player_2")
+    start = time.perf_counter()
+    policy(state, np_randoms)
+    return len(envs) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-envs", type=int, default=1024)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    envs = collect_envs(args.num_envs)
+    for name, bench in (("physics.py, per match", bench_scalar), ("ComputerPolicy", bench_policy)):
+        decisions = max(bench(envs) for _ in range(args.rounds))
+        print(f"{name:<21}: {decisions:12,.0f} decisions/s")
+
+
+if __name__ == "__main__":
+    main()
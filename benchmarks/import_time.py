@@ -0,0 +1,75 @@
+"""
+Import time of `pikazoo_v0` and of making a headless env, measured with `python -X importtime` in a new interpreter.
+
+    python benchmarks/import_time.py --runs 5 --top 10 --output benchmarks/import_time.json
+    python benchmarks/import_time.py --baseline benchmarks/import_time.json  # exits with 1 if the import got slower
+
+`benchmarks/import_time.json` is the baseline tracked in the repo, which `tests/test_import_time.py` compares against.
+
+The run with the lowest total is reported, with its slowest top level imports,
+and whether pygame was imported, which a headless env should never do.
+It exits with 1 if pygame was imported, or if the total rose by more than `--tolerance` from the baseline.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from typing import List, Optional, Tuple
+
+CODE = "from pikazoo import pikazoo_v0; pikazoo_v0.env().reset(seed=0); import sys; print('pygame' in sys.modules)"
+
+
+def measure() -> Tuple[List[Tuple[int, str]], bool]:
+    """Cumulative microseconds of every top level import, and whether pygame was imported"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CODE], capture_output=True, text=True, check=True
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        # nested imports are indented
+        if not name.startswith("  "):
+            imports.append((int(cumulative), name.strip()))
+    return imports, result.stdout.strip() == "True"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--output", help="path of the result as JSON")
+    parser.add_argument("--baseline", help="path of the result of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed rise of the total from the baseline")
+    args = parser.parse_args(argv)
+
+    imports, is_pygame_imported = min((measure() for _ in range(args.runs)), key=lambda m: sum(t for t, _ in m[0]))
+    total_ms = sum(t for t, _ in imports) / 1e3
+    line = f"total {total_ms:8.2f} ms, pygame imported: {is_pygame_imported}"
+    baseline_ms = None
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline_ms = json.load(f)["total_ms"]
+        line += f", {total_ms / baseline_ms:6.2f}x baseline"
+    print(line)
+    for cumulative, name in sorted(imports, reverse=True)[: args.top]:
+        print(f"{cumulative / 1e3:8.2f} ms  {name}")
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump({"total_ms": total_ms, "imports": {name: t for t, name in imports}}, f, indent=2)
+
+    if is_pygame_imported:
+        print("pygame was imported by a headless env")
+        return 1
+    if baseline_ms is not None and total_ms > baseline_ms * (1 + args.tolerance):
+        print(f"Slower than the baseline by more than {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
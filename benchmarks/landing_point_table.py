@@ -0,0 +1,75 @@
+"""
+Build time, memory footprint and lookup speed of `LandingPointTable`.
+
+    python benchmarks/landing_point_table.py --frames 20000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+from pikazoo import pikazoo_v0
+from pikazoo.env.landing_point_table import LandingPointTable
+from pikazoo.env.physics import simulate_landing_point_x
+
+
+def collect_ball_states(frames: int) -> np.ndarray:
+    env = pikazoo_v0.env(is_player1_computer=True, is_player2_computer=True)
+    env.reset(seed=0)
+    states = []
+    for _ in range(frames):
+        env.step({"player_1": 0, "player_2": 0})
+        ball = env.physics.ball
+        states.append((ball.x, ball.y, ball.x_velocity, ball.y_velocity))
+        if not env.agents:
+            env.reset()
+    return np.array(states, dtype=np.int32)
+
+
+def bench_computer_vs_computer(frames: int, landing_point_table) -> float:
+    env = pikazoo_v0.env(is_player1_computer=True, is_player2_computer=True, landing_point_table=landing_point_table)
+    env.reset(seed=0)
+    start = time.perf_counter()
+    for _ in range(frames):
+        env.step({"player_1": 0, "player_2": 0})
+        if not env.agents:
+            env.reset()
+    return frames / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=20000)
+    args = parser.parse_args()
+
+    table = LandingPointTable.build()
+    print(f"build time       : {table.build_time * 1e3:.1f} ms")
+    print(f"memory footprint : {table.nbytes / 2**20:.2f} MiB")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "landing_point_table.npz")
+        table.save(path)
+        start = time.perf_counter()
+        LandingPointTable.load(path)
+        print(
+            f"file size        : {os.path.getsize(path) / 2**20:.2f} MiB, load time {(time.perf_counter() - start) * 1e3:.1f} ms"
+        )
+
+    states = [tuple(map(int, state)) for state in collect_ball_states(args.frames)]
+    start = time.perf_counter()
+    for state in states:
+        simulate_landing_point_x(*state)
+    simulate_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for state in states:
+        table.lookup(*state)
+    lookup_time = time.perf_counter() - start
+    print(f"simulate         : {simulate_time / len(states) * 1e6:.2f} us/call")
+    print(f"lookup           : {lookup_time / len(states) * 1e6:.2f} us/call")
+
+    print(f"computer vs computer without table : {bench_computer_vs_computer(args.frames, None):,.0f} frames/s")
+    print(f"computer vs computer with table    : {bench_computer_vs_computer(args.frames, table):,.0f} frames/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Latency of `raw_env.step()` with the state observations, with `obs_type="pixels"`,
+and with pixel observations made outside the env, by resizing `render()` frames and stacking them with `np.stack`.
+
+    python benchmarks/pixel_observation.py --steps 2000
+"""
+
+import argparse
+import collections
+import time
+import numpy as np
+from pikazoo import pikazoo_v0
+
+PIXEL_SHAPE = (76, 108)
+FRAME_STACK = 4
+
+
+def bench(steps: int, observation: str) -> np.ndarray:
+    if observation == "state":
+        env = pikazoo_v0.env()
+    elif observation == "pixels":
+        env = pikazoo_v0.env(obs_type="pixels", pixel_shape=PIXEL_SHAPE, grayscale=True, frame_stack=FRAME_STACK)
+    else:
+        env = pikazoo_v0.env(render_mode="rgb_array", renderer="numpy")
+    frames = collections.deque(maxlen=FRAME_STACK)
+
+    def observe():
+        # what a pixel-based agent did before `obs_type="pixels"`
+        frame = env.render()[:: 304 // PIXEL_SHAPE[0], :: 432 // PIXEL_SHAPE[1]].astype(np.float32)
+        frames.append((frame @ np.array([0.299, 0.587, 0.114], dtype=np.float32)).astype(np.uint8))
+        while len(frames) < FRAME_STACK:
+            frames.append(frames[-1])
+        return np.stack(frames)
+
+    env.reset(seed=0)
+    actions = np.random.default_rng(0).integers(0, 18, size=(steps, 2)).tolist()
+    latencies = np.empty(steps)
+    for t in range(steps):
+        start = time.perf_counter()
+        env.step({"player_1": actions[t][0], "player_2": actions[t][1]})
+        if observation == "render + np.stack":
+            observe()
+        latencies[t] = time.perf_counter() - start
+        if not env.agents:
+            env.reset()
+            frames.clear()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=2000)
+    args = parser.parse_args()
+
+    for observation in ("state", "pixels", "render + np.stack"):
+        latencies = bench(args.steps, observation) * 1e6
+        print(
+            f"{observation:<18}: mean {latencies.mean():8.2f} us, "
+            f"p50 {np.percentile(latencies, 50):8.2f} us, p99 {np.percentile(latencies, 99):8.2f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
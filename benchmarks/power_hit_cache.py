@@ -0,0 +1,80 @@
+"""
+Cost of the power hit decision of the built-in computer with and without the power hit landing point cache.
+
+The ball states in which the computer decides whether to power hit are recorded from computer vs computer games,
+then the landing points of all six power hit directions are evaluated for each recorded state,
+by simulating them and by looking all six up at once in `cached_power_hit_landing_points_x`.
+
+    python benchmarks/power_hit_cache.py --frames 50000
+"""
+
+import argparse
+import time
+from typing import List, Tuple
+from pikazoo import pikazoo_v0
+from pikazoo.env import physics
+
+
+def record_power_hit_states(frames: int) -> List[Tuple[int, int, int]]:
+    states = []
+    decide = physics.decide_whether_input_power_hit
+
+    def recording_decide(player, ball, the_other_player, user_input, np_random):
+        states.append((ball.x, ball.y, abs(ball.y_velocity)))
+        return decide(player, ball, the_other_player, user_input, np_random)
+
+    physics.decide_whether_input_power_hit = recording_decide
+    try:
+        env = pikazoo_v0.env(is_player1_computer=True, is_player2_computer=True)
+        seed = 0
+        env.reset(seed=seed)
+        start = time.perf_counter()
+        for frame in range(1, frames + 1):
+            env.step({"player_1": 0, "player_2": 0})
+            # the computers sometimes rally forever, so start a new game every few thousand frames
+            if not env.agents or frame % 5000 == 0:
+                seed += 1
+                env.reset(seed=seed)
+        print(f"{frames:,} frames in {time.perf_counter() - start:.2f} s, {len(states):,} power hit decisions")
+    finally:
+        physics.decide_whether_input_power_hit = decide
+    return states
+
+
+def bench_simulation(states: List[Tuple[int, int, int]]) -> float:
+    simulate = physics.simulate_power_hit_landing_point_x
+    start = time.perf_counter()
+    for x, y, abs_y_velocity in states:
+        for x_direction, y_direction in physics.POWER_HIT_DIRECTIONS:
+            simulate(x_direction, y_direction, x, y, abs_y_velocity)
+    return (time.perf_counter() - start) / len(states)
+
+
+def bench_cache(states: List[Tuple[int, int, int]]) -> float:
+    cached = physics.cached_power_hit_landing_points_x
+    start = time.perf_counter()
+    for x, y, abs_y_velocity in states:
+        cached(x, y, abs_y_velocity)
+    return (time.perf_counter() - start) / len(states)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=50000)
+    args = parser.parse_args()
+
+    states = record_power_hit_states(args.frames)
+    cached = physics.cached_power_hit_landing_points_x
+    cached.cache_clear()
+    without_cache = bench_simulation(states)
+    cold_cache = bench_cache(states)
+    cold_cache_info = cached.cache_info()
+    warm_cache = bench_cache(states)
+    print(f"distinct ball states: {len(set(states)):,}")
+    print(f"without cache   : {without_cache * 1e6:>8.2f} us per decision")
+    print(f"with cold cache : {cold_cache * 1e6:>8.2f} us per decision, {cold_cache_info}")
+    print(f"with warm cache : {warm_cache * 1e6:>8.2f} us per decision, {cached.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Time of `raw_env.render()` in "rgb_array" mode with the background drawn tile by tile every frame (before)
+and with the cached background (after).
+
+    python benchmarks/render.py --frames 2000
+"""
+
+import argparse
+import time
+import numpy as np
+from pikazoo import pikazoo_v0
+
+
+def bench(frames: int, use_cached_background: bool) -> np.ndarray:
+    env = pikazoo_v0.env(render_mode="rgb_array", is_player1_computer=True, is_player2_computer=True)
+    if not use_cached_background:
+        env.draw_background = lambda: env.draw_background_tiles(env.screen)
+    env.reset(seed=0)
+    latencies = np.empty(frames)
+    for t in range(frames):
+        env.step({"player_1": 0, "player_2": 0})
+        start = time.perf_counter()
+        env.render()
+        latencies[t] = time.perf_counter() - start
+        if not env.agents:
+            env.reset()
+    env.close()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=2000)
+    args = parser.parse_args()
+
+    for name, use_cached_background in (("tiles every frame", False), ("cached background", True)):
+        latencies = bench(args.frames, use_cached_background) * 1e3
+        print(
+            f"{name:<18}: mean {latencies.mean():6.3f} ms, p50 {np.percentile(latencies, 50):6.3f} ms, "
+            f"p99 {np.percentile(latencies, 99):6.3f} ms, {1e3 / latencies.mean():6,.0f} frames/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
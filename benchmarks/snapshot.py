@@ -0,0 +1,35 @@
+"""
+Time to branch a match with `raw_env.get_state()` / `raw_env.set_state()` against `copy.deepcopy`.
+
+    python benchmarks/snapshot.py --number 20000
+"""
+
+import argparse
+import copy
+import timeit
+from pikazoo import pikazoo_v0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    env = pikazoo_v0.env(is_player1_computer=True, is_player2_computer=True)
+    env.reset(seed=0)
+    for _ in range(300):
+        env.step({"player_1": 0, "player_2": 0})
+    state = env.get_state()
+
+    print(f"snapshot size: {len(state[0])} bytes + bit generator state")
+    for name, function, number in (
+        ("get_state", env.get_state, args.number),
+        ("set_state", lambda: env.set_state(state), args.number),
+        ("copy.deepcopy", lambda: copy.deepcopy(env), max(args.number // 100, 1)),
+    ):
+        seconds = min(timeit.repeat(function, number=number, repeat=5)) / number
+        print(f"{name:<14}: {seconds * 1e6:8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Time of constructing `raw_env` without rendering, with rendering when every env loads its own sprites (before),
+and with rendering when the sprites are loaded once per process and shared (after).
+
+    python benchmarks/startup.py --envs 64
+"""
+
+import argparse
+import time
+from pikazoo import pikazoo_v0
+from pikazoo.env.pikazoo_env import raw_env
+
+
+def bench(envs: int, render_mode, shared_sprites: bool) -> float:
+    raw_env.sprites = None
+    start = time.perf_counter()
+    for _ in range(envs):
+        if not shared_sprites:
+            raw_env.sprites = None
+        pikazoo_v0.env(render_mode=render_mode)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--envs", type=int, default=64)
+    args = parser.parse_args()
+
+    for name, render_mode, shared_sprites in (
+        ("no rendering", None, True),
+        ("sprites per env", "rgb_array", False),
+        ("shared sprites", "rgb_array", True),
+    ):
+        elapsed = bench(args.envs, render_mode, shared_sprites)
+        print(f"{name:<16}: {elapsed * 1e3:8.2f} ms for {args.envs} envs, {elapsed / args.envs * 1e3:6.3f} ms per env")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Memory per env and frames per second of `raw_env` with `Player`, `Ball` and `PikaUserInput` stored
+in `__slots__` (the current layout) and in a `__dict__` per object (the previous layout).
+
+The `__dict__` layout is made by copying the methods of the classes into classes without `__slots__`.
+For reference, the same numbers are given for `vector_env`, whose state is a view over one shared int array
+(`VecPikaPhysics.state`).
+
+    python benchmarks/state_layout.py --num-envs 2000 --frames 50000
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+import numpy as np
+from pikazoo import pikazoo_v0
+from pikazoo.env import physics, pikazoo_env
+
+SLOTS_CLASSES = {cls.__name__: cls for cls in (physics.Player, physics.Ball, physics.PikaUserInput)}
+
+
+def without_slots(cls: type) -> type:
+    members = {name: value for name, value in vars(cls).items() if name != "__slots__" and name not in cls.__slots__}
+    return type(cls.__name__, (), members)
+
+
+DICT_CLASSES = {name: without_slots(cls) for name, cls in SLOTS_CLASSES.items()}
+
+
+def use_layout(classes: dict):
+    for module in (physics, pikazoo_env):
+        for name, cls in classes.items():
+            if hasattr(module, name):
+                setattr(module, name, cls)
+
+
+def object_size(obj) -> int:
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+    if hasattr(obj, "sound"):
+        size += sys.getsizeof(obj.sound)
+    return size
+
+
+def bench_memory(num_envs: int):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    envs = [pikazoo_v0.env() for _ in range(num_envs)]
+    for env in envs:
+        env.reset(seed=0)
+    memory_per_env = (tracemalloc.get_traced_memory()[0] - before) / num_envs
+    tracemalloc.stop()
+    env = envs[0]
+    state_size = (
+        object_size(env.physics.player1)
+        + object_size(env.physics.player2)
+        + object_size(env.physics.ball)
+        + sum(object_size(user_input) for user_input in env.keyboard_array)
+    )
+    return memory_per_env, state_size
+
+
+def bench_fps(frames: int, is_computer: bool) -> float:
+    env = pikazoo_v0.env(is_player1_computer=is_computer, is_player2_computer=is_computer)
+    env.reset(seed=0)
+    actions = np.random.default_rng(0).integers(0, 18, size=(frames, 2)).tolist()
+    start = time.perf_counter()
+    for t in range(frames):
+        env.step({"player_1": actions[t][0], "player_2": actions[t][1]})
+        if not env.agents:
+            env.reset()
+    return frames / (time.perf_counter() - start)
+
+
+def bench_vector_env(num_envs: int, frames: int):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    env = pikazoo_v0.vector_env(num_envs=num_envs)
+    env.reset(seed=0)
+    memory_per_env = (tracemalloc.get_traced_memory()[0] - before) / num_envs
+    tracemalloc.stop()
+    state_size = env.physics.state.nbytes // num_envs
+
+    steps = max(frames // num_envs, 1)
+    actions = np.random.default_rng(0).integers(0, 18, size=(steps, num_envs, 2))
+    start = time.perf_counter()
+    for t in range(steps):
+        env.step(actions[t])
+    return memory_per_env, state_size, num_envs * steps / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-envs", type=int, default=2000)
+    parser.add_argument("--frames", type=int, default=50000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    layouts = {"__dict__": DICT_CLASSES, "__slots__": SLOTS_CLASSES}
+    results = {name: {"agents": 0.0, "computers": 0.0} for name in layouts}
+    for name, classes in layouts.items():
+        use_layout(classes)
+        results[name]["memory"] = bench_memory(args.num_envs)
+    # the layouts take turns, and the best round is reported to keep the noise of other processes out
+    for _ in range(args.rounds):
+        for name, classes in layouts.items():
+            use_layout(classes)
+            for opponent, is_computer in (("agents", False), ("computers", True)):
+                results[name][opponent] = max(results[name][opponent], bench_fps(args.frames, is_computer))
+    use_layout(SLOTS_CLASSES)
+
+    for name, result in results.items():
+        memory_per_env, state_size = result["memory"]
+        print(
+            f"{name:<10}: {memory_per_env / 1024:6.2f} KiB per env "
+            f"({state_size:5,} bytes in players, ball and user inputs), "
+            f"{result['agents']:>8,.0f} frames/s (agents), {result['computers']:>8,.0f} frames/s (computers)"
+        )
+    memory_per_env, state_size, frames_per_second = bench_vector_env(args.num_envs, args.frames * 10)
+    print(
+        f"{'vector_env':<10}: {memory_per_env / 1024:6.2f} KiB per env "
+        f"({state_size:5,} bytes in players and ball), {frames_per_second:>8,.0f} frames/s (agents)"
+    )
+
+
+if __name__ == "__main__":
+    main()
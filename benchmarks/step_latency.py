@@ -0,0 +1,94 @@
+"""
+Latency of `raw_env.step()` with the previous observation builder,
+which made two new `np.array`s from Python lists every step,
+and with the current one, which writes both observations into the preallocated (2, 35) int32 buffer.
+
+    python benchmarks/step_latency.py --steps 20000 --rounds 10
+
+The builders take turns for `rounds` rounds, and the round with the lowest median is reported for each builder,
+which keeps the noise of other processes out of the comparison.
+"""
+
+import argparse
+import time
+import numpy as np
+from pikazoo import pikazoo_v0
+
+
+def get_player_info(player):
+    state = [0, 0, 0, 0, 0]
+    state[player.state] = 1
+    return [
+        player.x,
+        player.y,
+        player.y_velocity,
+        player.diving_direction,
+        player.lying_down_duration_left,
+        player.frame_number,
+        player.delay_before_next_frame,
+    ] + state
+
+
+def get_ball_obs(ball):
+    return [
+        ball.x,
+        ball.y,
+        ball.previous_x,
+        ball.previous_y,
+        ball.previous_previous_x,
+        ball.previous_previous_y,
+        ball.x_velocity,
+        ball.y_velocity,
+        ball.is_power_hit,
+    ]
+
+
+def get_obs_with_new_arrays(env):
+    """`raw_env._get_obs` before the observation buffer"""
+    p1_obs = get_player_info(env.physics.player1) + [int(env.keyboard_array[0].power_hit_key_is_down_previous)]
+    p2_obs = get_player_info(env.physics.player2) + [int(env.keyboard_array[1].power_hit_key_is_down_previous)]
+    ball_obs = get_ball_obs(env.physics.ball)
+    obs1 = np.array(p1_obs + p2_obs + ball_obs)
+    obs2 = np.array(p2_obs + p1_obs + ball_obs)
+    return {env.agents[0]: obs1, env.agents[1]: obs2}
+
+
+def bench(steps: int, builder: str) -> np.ndarray:
+    env = pikazoo_v0.env(copy_observation=builder == "buffer, copy_observation=True")
+    if builder == "new arrays":
+        env._get_obs = lambda: get_obs_with_new_arrays(env)
+    env.reset(seed=0)
+    actions = np.random.default_rng(0).integers(0, 18, size=(steps, 2)).tolist()
+    latencies = np.empty(steps)
+    for t in range(steps):
+        start = time.perf_counter()
+        env.step({"player_1": actions[t][0], "player_2": actions[t][1]})
+        latencies[t] = time.perf_counter() - start
+        if not env.agents:
+            env.reset()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    builders = ("new arrays", "buffer", "buffer, copy_observation=True")
+    best = {}
+    for _ in range(args.rounds):
+        for builder in builders:
+            latencies = bench(args.steps, builder) * 1e6
+            if builder not in best or np.median(latencies) < np.median(best[builder]):
+                best[builder] = latencies
+    for builder in builders:
+        latencies = best[builder]
+        print(
+            f"{builder:<30}: mean {latencies.mean():6.2f} us, "
+            f"p50 {np.percentile(latencies, 50):6.2f} us, p99 {np.percentile(latencies, 99):6.2f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Throughput benchmark of the environment and its wrappers.
+
+    python -m pikazoo.benchmark --steps 5000 --output results.json
+    python -m pikazoo.benchmark --baseline results.json  # exits with 1 if a scenario got slower
+
+Every scenario calls one `raw_env.step()` (one frame) per measured call, except `reset` (one `reset()`)
+and the `render_*` scenarios (one step and one `render()`). Episodes which end are reset within the measured call.
+For every scenario it reports
+
+* frames_per_sec: measured calls per second
+* p50_us, p99_us: latency of a call in microseconds
+* peak_memory_kib: peak of the memory allocated while making the env and running the calls, traced by `tracemalloc`
+  in a separate run, so that tracing does not slow down the timed runs
+
+The timed run is repeated `rounds` times, and the round with the lowest median latency is reported,
+which keeps the noise of other processes out of the results.
+"""
+
+import argparse
+import fnmatch
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+
+# scenario -> metrics
+Results = Dict[str, Dict[str, float]]
+
+
+class _NullWriter:
+    """Video writer of `RecordVideo` which drops the frames, so that the scenario does not measure ffmpeg"""
+
+    def __init__(self, path, size, fps):
+        pass
+
+    def write_frame(self, frame):
+        pass
+
+    def close(self):
+        pass
+
+
+def _stepper(env, actions: list) -> Callable[[int], None]:
+    unwrapped = env.unwrapped
+    env.reset(seed=0)
+
+    def run(t: int):
+        env.step(actions[t % len(actions)])
+        if not unwrapped.agents:
+            env.reset()
+
+    return run
+
+
+def _random_actions(steps: int, num_actions: int = 18, single_agent: bool = False) -> list:
+    actions = np.random.default_rng(0).integers(0, num_actions, size=(min(steps, 10000), 2)).tolist()
+    if single_agent:
+        return [action[0] for action in actions]
+    return [{"player_1": action[0], "player_2": action[1]} for action in actions]
+
+
+def _raw_env(**kwargs):
+    from pikazoo.env.pikazoo_env import raw_env
+
+    return raw_env(**kwargs)
+
+
+def _env_scenario(steps: int, **kwargs) -> Tuple[Callable[[int], None], Callable[[], None]]:
+    env = _raw_env(**kwargs)
+    return _stepper(env, _random_actions(steps)), env.close
+
+
+def _reset_scenario(steps: int):
+    env = _raw_env()
+    env.reset(seed=0)
+    return lambda t: env.reset(), env.close
+
+
+def _render_scenario(steps: int, renderer: str):
+    env = _raw_env(render_mode="rgb_array", renderer=renderer, is_player1_computer=True, is_player2_computer=True)
+    step = _stepper(env, _random_actions(steps))
+
+    def run(t: int):
+        step(t)
+        env.render()
+
+    return run, env.close
+
+
+def _wrapper_scenario(steps: int, name: str):
+    from pikazoo import wrappers
+
+    folder = tempfile.mkdtemp() if name in ("RecordVideo", "RecordReplay") else None
+    env = _raw_env(render_mode="rgb_array", renderer="numpy") if name == "RecordVideo" else _raw_env()
+    actions = _random_actions(steps)
+    if name == "RewardInNormalState":
+        env = wrappers.RewardInNormalState(env, -0.001)
+    elif name == "RewardByBallPosition":
+        env = wrappers.RewardByBallPosition(env, (0.001, -0.001, 0.001, -0.001, -0.001, 0.001, -0.001, 0.001))
+    elif name == "ConvertSingleAgent":
+        env = wrappers.ConvertSingleAgent(env, "player_1")
+        actions = _random_actions(steps, single_agent=True)
+    elif name == "SimplifyAction":
+        env = wrappers.SimplifyAction(env)
+        actions = _random_actions(steps, num_actions=13)
+    elif name == "RecordVideo":
+        env = wrappers.RecordVideo(env, folder, writer_factory=_NullWriter)
+    elif name == "RecordReplay":
+        env = wrappers.RecordReplay(env, folder)
+    else:
+        env = getattr(wrappers, name)(env)
+    step = _stepper(env, actions)
+
+    def close():
+        env.close()
+        if folder is not None:
+            shutil.rmtree(folder)
+
+    return step, close
+
+
+WRAPPERS = (
+    "RewardInNormalState",
+    "RewardByBallPosition",
+    "ConvertSingleAgent",
+    "RecordEpisodeStatistics",
+    "NormalizeObservation",
+    "SimplifyAction",
+    "RecordVideo",
+    "RecordReplay",
+)
+
+# name -> function of the number of steps returning `run(t)` and `close()`
+SCENARIOS: Dict[str, Callable[[int], Tuple[Callable[[int], None], Callable[[], None]]]] = {
+    "step": lambda steps: _env_scenario(steps),
+    "computer_vs_computer": lambda steps: _env_scenario(steps, is_player1_computer=True, is_player2_computer=True),
+    "computer_vs_agent": lambda steps: _env_scenario(steps, is_player2_computer=True),
+    "reset": _reset_scenario,
+    "render_rgb_array": lambda steps: _render_scenario(steps, "pygame"),
+    "render_rgb_array_numpy": lambda steps: _render_scenario(steps, "numpy"),
+    **{f"wrapper_{name}": (lambda steps, name=name: _wrapper_scenario(steps, name)) for name in WRAPPERS},
+}
+
+
+def measure_latencies(scenario: str, steps: int) -> np.ndarray:
+    """Latency of every call of the scenario in seconds"""
+    run, close = SCENARIOS[scenario](steps)
+    latencies = np.empty(steps)
+    try:
+        for t in range(steps):
+            start = time.perf_counter()
+            run(t)
+            latencies[t] = time.perf_counter() - start
+    finally:
+        close()
+    return latencies
+
+
+def measure_peak_memory(scenario: str, steps: int) -> int:
+    """Peak of the memory allocated while making the env and running the scenario, in bytes"""
+    tracemalloc.start()
+    try:
+        run, close = SCENARIOS[scenario](steps)
+        try:
+            for t in range(steps):
+                run(t)
+        finally:
+            close()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmark(scenarios: List[str], steps: int, rounds: int, memory_steps: int) -> Results:
+    results = {}
+    for scenario in scenarios:
+        best = None
+        for _ in range(rounds):
+            latencies = measure_latencies(scenario, steps)
+            if best is None or np.median(latencies) < np.median(best):
+                best = latencies
+        results[scenario] = {
+            "frames_per_sec": float(steps / best.sum()),
+            "p50_us": float(np.percentile(best, 50) * 1e6),
+            "p99_us": float(np.percentile(best, 99) * 1e6),
+            "peak_memory_kib": measure_peak_memory(scenario, memory_steps) / 1024,
+        }
+    return results
+
+
+def compare(results: Results, baseline: Results, tolerance: float) -> List[str]:
+    """Scenarios whose frames per second dropped by more than `tolerance` (a fraction) from the baseline"""
+    regressions = []
+    for scenario, metrics in results.items():
+        if scenario in baseline:
+            ratio = metrics["frames_per_sec"] / baseline[scenario]["frames_per_sec"]
+            if ratio < 1 - tolerance:
+                regressions.append(scenario)
+    return regressions
+
+
+def get_metadata() -> Dict[str, str]:
+    from pikazoo import __version__
+
+    return {
+        "pikazoo": __version__,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Throughput benchmark of pikazoo")
+    parser.add_argument("--scenarios", nargs="+", default=["*"], help="names or patterns, ex) step 'wrapper_*'")
+    parser.add_argument("--steps", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--memory-steps", type=int, default=1000, help="steps of the run traced by tracemalloc")
+    parser.add_argument("--output", help="path of the results as JSON")
+    parser.add_argument("--baseline", help="path of the results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed drop of frames/s from the baseline")
+    parser.add_argument("--list", action="store_true", help="list the scenarios and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(SCENARIOS))
+        return 0
+    scenarios = [name for name in SCENARIOS if any(fnmatch.fnmatch(name, pattern) for pattern in args.scenarios)]
+    baseline = None
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    results = run_benchmark(scenarios, args.steps, args.rounds, args.memory_steps)
+    for scenario, metrics in results.items():
+        line = (
+            f"{scenario:<32}: {metrics['frames_per_sec']:10,.0f} frames/s, p50 {metrics['p50_us']:9.1f} us, "
+            f"p99 {metrics['p99_us']:9.1f} us, peak {metrics['peak_memory_kib']:9,.0f} KiB"
+        )
+        if baseline is not None and scenario in baseline:
+            line += f", {metrics['frames_per_sec'] / baseline[scenario]['frames_per_sec']:6.2f}x baseline"
+        print(line)
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump({"metadata": get_metadata(), "results": results}, f, indent=2)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"Slower than the baseline by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
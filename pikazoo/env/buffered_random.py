@@ -0,0 +1,51 @@
+"""
+Random integers of the physics engine and the computer, handed out from blocks drawn in advance.
+
+`np.random.Generator.integers` costs microseconds per call for a single scalar, and the engine draws
+single scalars every frame. `BufferedRandom` draws `block_size` uniform floats at once with `np_random.random`
+and hands them out in order, so a call costs about as much as indexing a list.
+
+Draw order: the n-th call of `integers`, counted from the creation of the `BufferedRandom`,
+uses the n-th float of `np_random.random`, so a match is reproducible from the seed of its generator
+(but different from the match with the same seed drawn by `np_random.integers`).
+`integers(low, high)` is `low + floor(u * (high - low))`, whose bias is far below 2 ** -40 for the small ranges used.
+"""
+
+from typing import Any, Dict
+import numpy as np
+
+BLOCK_SIZE = 1024
+
+
+class BufferedRandom:
+    """`integers` of `np.random.Generator` for scalars, from blocks drawn in advance"""
+
+    def __init__(self, np_random: np.random.Generator, block_size: int = BLOCK_SIZE) -> None:
+        self.np_random = np_random
+        self.block_size = block_size
+        self._draw_block()
+
+    def _draw_block(self):
+        # the state from which the block is drawn, so that `state` can draw the same block again
+        self._block_state = self.np_random.bit_generator.state
+        self._block = self.np_random.random(self.block_size).tolist()
+        self._index = 0
+
+    def integers(self, low: int, high: int) -> int:
+        """Random integer in [low, high)"""
+        if self._index == self.block_size:
+            self._draw_block()
+        u = self._block[self._index]
+        self._index += 1
+        return low + int(u * (high - low))
+
+    @property
+    def state(self) -> Dict[str, Any]:
+        """The state of the bit generator before the current block was drawn, and the number of used values of the block"""
+        return {"block_state": self._block_state, "index": self._index}
+
+    @state.setter
+    def state(self, state: Dict[str, Any]):
+        self.np_random.bit_generator.state = state["block_state"]
+        self._draw_block()
+        self._index = state["index"]
@@ -2,40 +2,58 @@
 All of the code for pika-zoo was written based on https://github.com/gorisanson/pikachu-volleyball
 
 hs) For multithreaded optimization and experimental reproducibility, I used a generator for random number extraction.
-    As an argument to the class/function, the environment's self.np_random is used as a generator.
+    As an argument to the class/function, the environment's self.render_np_random is used as a generator.
+
+The clouds and the wave are small arrays moved together, and the random numbers of a frame are drawn by
+one call of the generator, in the order of `ENGINE_RANDOM_HIGHS`.
+The random numbers which are not needed in the frame (clouds still on the screen, wave not going back) are discarded.
 """
 
 import numpy as np
-from typing import List
+from numpy.typing import NDArray
+
+NUM_OF_CLOUDS = 10
+NUM_OF_WAVES = 432 // 16
 
+# exclusive upper bounds of the random numbers drawn by `Clouds.__init__`, in order:
+# top_left_point_x + 68, top_left_point_y, top_left_point_x_velocity - 1, size_diff_turn_number of every cloud
+CLOUD_RANDOM_HIGHS = np.repeat([432 + 68, 152, 2, 11], NUM_OF_CLOUDS)
+# exclusive upper bounds of the random numbers drawn by `cloud_and_wave_engine` every frame, in order:
+# top_left_point_y and top_left_point_x_velocity - 1 of every cloud which goes back to the left,
+# -vertical_coord of the wave going back down, and the y offset of every wave
+ENGINE_RANDOM_HIGHS = np.concatenate(
+    [np.full(NUM_OF_CLOUDS, 152), np.full(NUM_OF_CLOUDS, 2), [40], np.full(NUM_OF_WAVES, 3)]
+)
 
-class Cloud:
-    """class represents a cloud"""
+
+class Clouds:
+    """class represents the clouds, as arrays of `NUM_OF_CLOUDS`"""
 
     def __init__(self, np_random: np.random.Generator) -> None:
-        self.top_left_point_x = -68 + (np_random.integers(0, 432 + 68))
-        self.top_left_point_y = np_random.integers(0, 152)
-        self.top_left_point_x_velocity = 1 + np_random.integers(0, 2)
-        self.size_diff_turn_number = np_random.integers(0, 11)
+        x, y, x_velocity, size_diff_turn_number = np_random.integers(0, CLOUD_RANDOM_HIGHS).reshape(4, NUM_OF_CLOUDS)
+        self.top_left_point_x: NDArray[np.int64] = x - 68
+        self.top_left_point_y: NDArray[np.int64] = y
+        self.top_left_point_x_velocity: NDArray[np.int64] = 1 + x_velocity
+        self.size_diff_turn_number: NDArray[np.int64] = size_diff_turn_number
 
     @property
-    def size_diff(self):
-        return 5 - abs(self.size_diff_turn_number - 5)
+    def size_diff(self) -> NDArray[np.int64]:
+        return 5 - np.abs(self.size_diff_turn_number - 5)
 
     @property
-    def sprite_top_left_point_x(self):
+    def sprite_top_left_point_x(self) -> NDArray[np.int64]:
         return self.top_left_point_x - self.size_diff
 
     @property
-    def sprite_top_left_point_y(self):
+    def sprite_top_left_point_y(self) -> NDArray[np.int64]:
         return self.top_left_point_y - self.size_diff
 
     @property
-    def sprite_width(self):
+    def sprite_width(self) -> NDArray[np.int64]:
         return 48 + 2 * self.size_diff
 
     @property
-    def sprite_height(self):
+    def sprite_height(self) -> NDArray[np.int64]:
         return 24 + 2 * self.size_diff
 
 
@@ -45,26 +63,26 @@ class Wave:
     def __init__(self) -> None:
         self.vertical_coord = 0
         self.vertical_coord_velocity = 2
-        self.y_coords = []
-        for i in range(432 // 16):
-            self.y_coords.append(314)
+        self.y_coords: NDArray[np.int64] = np.full(NUM_OF_WAVES, 314, dtype=np.int64)
 
 
-def cloud_and_wave_engine(cloud_array: List[Cloud], wave: Wave, np_random: np.random.Generator):
+def cloud_and_wave_engine(clouds: Clouds, wave: Wave, np_random: np.random.Generator):
     """Move clouds and wave
 
     Args:
-        cloud_array (List[Cloud]): cloud array
+        clouds (Clouds): clouds
         wave (Wave): wave
-        np_random (np.random.Generator): random number Generator, ex) `self.np_random`
+        np_random (np.random.Generator): random number Generator, ex) `self.render_np_random`
     """
-    for i in range(10):
-        cloud_array[i].top_left_point_x += cloud_array[i].top_left_point_x_velocity
-        if cloud_array[i].top_left_point_x > 432:
-            cloud_array[i].top_left_point_x = -68
-            cloud_array[i].top_left_point_y = np_random.integers(0, 152)
-            cloud_array[i].top_left_point_x_velocity = 1 + np_random.integers(0, 2)
-        cloud_array[i].size_diff_turn_number = (cloud_array[i].size_diff_turn_number + 1) % 11
+    random_numbers = np_random.integers(0, ENGINE_RANDOM_HIGHS)
+
+    clouds.top_left_point_x += clouds.top_left_point_x_velocity
+    is_out = clouds.top_left_point_x > 432
+    clouds.top_left_point_x[is_out] = -68
+    clouds.top_left_point_y[is_out] = random_numbers[:NUM_OF_CLOUDS][is_out]
+    clouds.top_left_point_x_velocity[is_out] = 1 + random_numbers[NUM_OF_CLOUDS : 2 * NUM_OF_CLOUDS][is_out]
+    clouds.size_diff_turn_number += 1
+    clouds.size_diff_turn_number %= 11
 
     wave.vertical_coord += wave.vertical_coord_velocity
     if wave.vertical_coord > 32:
@@ -72,7 +90,6 @@ def cloud_and_wave_engine(cloud_array: List[Cloud], wave: Wave, np_random: np.ra
         wave.vertical_coord_velocity = -1
     elif wave.vertical_coord < 0 and wave.vertical_coord_velocity < 0:
         wave.vertical_coord_velocity = 2
-        wave.vertical_coord = -(np_random.integers(0, 40))
+        wave.vertical_coord = -int(random_numbers[2 * NUM_OF_CLOUDS])
 
-    for i in range(432 // 16):
-        wave.y_coords[i] = 314 - wave.vertical_coord + np_random.integers(0, 3)
+    np.add(random_numbers[2 * NUM_OF_CLOUDS + 1 :], 314 - wave.vertical_coord, out=wave.y_coords)
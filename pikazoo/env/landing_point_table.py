@@ -0,0 +1,196 @@
+"""
+Precomputed table of the expected landing point of the ball.
+
+Without the net pillar, the x-direction and the y-direction of the flight simulated by
+`simulate_landing_point_x` do not depend on each other:
+the left and right world bounds only look at x and x velocity,
+and the upper world bound and the ground only look at y and y velocity.
+So the flight is stored as two small tables.
+
+* `(y, y_velocity)` -> number of simulated frames until the ball lands,
+  and the frames in which the ball is lower than the top of the net pillar.
+* `(x, x_velocity)` -> x coord of the ball in each frame,
+  and the frames in which the ball is as close to the net pillar as the net pillar check of the simulation.
+
+If there is no frame in which both are true, the net pillar never touches the ball,
+and the landing point is the x coord of the last frame.
+Otherwise, or if the state is out of the table, the flight is simulated as before,
+so the result is always the same as `simulate_landing_point_x`.
+"""
+
+import time
+import numpy as np
+from numpy.typing import NDArray
+from .physics import (
+    GROUND_WIDTH,
+    GROUND_HALF_WIDTH,
+    BALL_RADIUS,
+    BALL_TOUCHING_GROUND_Y_COORD,
+    NET_PILLAR_HALF_WIDTH,
+    NET_PILLAR_TOP_TOP_Y_COORD,
+    simulate_landing_point_x,
+)
+
+# range of the ball states in the table, both ends inclusive
+X_MIN: int = 0
+X_MAX: int = GROUND_WIDTH + BALL_RADIUS
+Y_MIN: int = 0
+Y_MAX: int = BALL_TOUCHING_GROUND_Y_COORD
+# the x velocity is at most 20 (power hit)
+X_VELOCITY_MIN: int = -20
+X_VELOCITY_MAX: int = 20
+Y_VELOCITY_MIN: int = -128
+Y_VELOCITY_MAX: int = 127
+# flights longer than this are simulated. One frame is one bit of a uint64 mask.
+MAX_FRAMES: int = 64
+NUM_X_VELOCITIES: int = X_VELOCITY_MAX - X_VELOCITY_MIN + 1
+NUM_Y_VELOCITIES: int = Y_VELOCITY_MAX - Y_VELOCITY_MIN + 1
+
+
+class LandingPointTable:
+    """Precomputed landing points of the ball. See the module docstring for how it works."""
+
+    def __init__(
+        self,
+        x_positions: NDArray[np.int16],
+        x_net_masks: NDArray[np.uint64],
+        landing_frames: NDArray[np.uint8],
+        y_net_masks: NDArray[np.uint64],
+    ) -> None:
+        """
+        Args:
+            x_positions (NDArray[np.int16]): [x, x_velocity, frame] x coord of the ball in the frame
+            x_net_masks (NDArray[np.uint64]): [x, x_velocity] bit i is set if the ball is near the net in frame i
+            landing_frames (NDArray[np.uint8]): [y, y_velocity] number of simulated frames, 0 if not in the table
+            y_net_masks (NDArray[np.uint64]): [y, y_velocity] bit i is set if the ball is low in frame i
+        """
+        self.x_positions = x_positions
+        self.x_net_masks = x_net_masks
+        self.landing_frames = landing_frames
+        self.y_net_masks = y_net_masks
+        self.build_time: float = 0.0
+        # flat views for `lookup`, indexing them is much cheaper than indexing NumPy arrays with scalars
+        self._x_positions = memoryview(np.ascontiguousarray(x_positions).reshape(-1))
+        self._x_net_masks = memoryview(np.ascontiguousarray(x_net_masks).reshape(-1))
+        self._landing_frames = memoryview(np.ascontiguousarray(landing_frames).reshape(-1))
+        self._y_net_masks = memoryview(np.ascontiguousarray(y_net_masks).reshape(-1))
+
+    @classmethod
+    def build(cls) -> "LandingPointTable":
+        """Build the table. It takes a few tens of milliseconds."""
+        start = time.perf_counter()
+        one = np.uint64(1)
+
+        # x-direction
+        x, x_velocity = np.meshgrid(
+            np.arange(X_MIN, X_MAX + 1, dtype=np.int32),
+            np.arange(X_VELOCITY_MIN, X_VELOCITY_MAX + 1, dtype=np.int32),
+            indexing="ij",
+        )
+        x_positions = np.empty(x.shape + (MAX_FRAMES,), dtype=np.int16)
+        x_net_masks = np.zeros(x.shape, dtype=np.uint64)
+        for frame in range(MAX_FRAMES):
+            x_positions[..., frame] = x
+            x_net_masks[np.abs(x - GROUND_HALF_WIDTH) < NET_PILLAR_HALF_WIDTH] |= one << np.uint64(frame)
+            future_x = x + x_velocity
+            x_velocity = np.where((future_x < BALL_RADIUS) | (future_x > GROUND_WIDTH), -x_velocity, x_velocity)
+            x = x + x_velocity
+
+        # y-direction
+        y, y_velocity = np.meshgrid(
+            np.arange(Y_MIN, Y_MAX + 1, dtype=np.int32),
+            np.arange(Y_VELOCITY_MIN, Y_VELOCITY_MAX + 1, dtype=np.int32),
+            indexing="ij",
+        )
+        landing_frames = np.zeros(y.shape, dtype=np.uint8)
+        y_net_masks = np.zeros(y.shape, dtype=np.uint64)
+        is_flying = np.ones(y.shape, dtype=bool)
+        for frame in range(MAX_FRAMES):
+            y_net_masks[is_flying & (y > NET_PILLAR_TOP_TOP_Y_COORD)] |= one << np.uint64(frame)
+            y_velocity = np.where(y + y_velocity < 0, 1, y_velocity)
+            y = y + y_velocity
+            is_landing = is_flying & (y > BALL_TOUCHING_GROUND_Y_COORD)
+            landing_frames[is_landing] = frame + 1
+            is_flying &= ~is_landing
+            y_velocity = y_velocity + 1
+
+        table = cls(x_positions, x_net_masks, landing_frames, y_net_masks)
+        table.build_time = time.perf_counter() - start
+        return table
+
+    @classmethod
+    def load(cls, path: str) -> "LandingPointTable":
+        """Load a table saved by `save`"""
+        with np.load(path) as arrays:
+            return cls(arrays["x_positions"], arrays["x_net_masks"], arrays["landing_frames"], arrays["y_net_masks"])
+
+    def save(self, path: str) -> None:
+        """Save the table as a .npz file"""
+        np.savez_compressed(
+            path,
+            x_positions=self.x_positions,
+            x_net_masks=self.x_net_masks,
+            landing_frames=self.landing_frames,
+            y_net_masks=self.y_net_masks,
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Memory footprint of the table in bytes"""
+        return self.x_positions.nbytes + self.x_net_masks.nbytes + self.landing_frames.nbytes + self.y_net_masks.nbytes
+
+    def lookup(self, x: int, y: int, x_velocity: int, y_velocity: int) -> int:
+        """x coord of the expected landing point of the ball, same as `simulate_landing_point_x`
+
+        Args:
+            x (int): ball.x
+            y (int): ball.y
+            x_velocity (int): ball.x_velocity
+            y_velocity (int): ball.y_velocity
+
+        Returns:
+            int: x coord of expected landing point
+        """
+        if (
+            X_MIN <= x <= X_MAX
+            and Y_MIN <= y <= Y_MAX
+            and X_VELOCITY_MIN <= x_velocity <= X_VELOCITY_MAX
+            and Y_VELOCITY_MIN <= y_velocity <= Y_VELOCITY_MAX
+        ):
+            x_index = (x - X_MIN) * NUM_X_VELOCITIES + x_velocity - X_VELOCITY_MIN
+            y_index = (y - Y_MIN) * NUM_Y_VELOCITIES + y_velocity - Y_VELOCITY_MIN
+            frames = self._landing_frames[y_index]
+            if frames > 0 and not self._x_net_masks[x_index] & self._y_net_masks[y_index]:
+                return self._x_positions[x_index * MAX_FRAMES + frames - 1]
+        return simulate_landing_point_x(x, y, x_velocity, y_velocity)
+
+    def lookup_batch(
+        self,
+        x: NDArray[np.int32],
+        y: NDArray[np.int32],
+        x_velocity: NDArray[np.int32],
+        y_velocity: NDArray[np.int32],
+    ) -> NDArray[np.int32]:
+        """`lookup` for arrays of ball states
+
+        Returns:
+            NDArray[np.int32]: x coord of expected landing point of each ball
+        """
+        x_index = np.clip(x - X_MIN, 0, X_MAX - X_MIN)
+        x_velocity_index = np.clip(x_velocity - X_VELOCITY_MIN, 0, X_VELOCITY_MAX - X_VELOCITY_MIN)
+        y_index = np.clip(y - Y_MIN, 0, Y_MAX - Y_MIN)
+        y_velocity_index = np.clip(y_velocity - Y_VELOCITY_MIN, 0, Y_VELOCITY_MAX - Y_VELOCITY_MIN)
+
+        frames = self.landing_frames[y_index, y_velocity_index].astype(np.intp)
+        landing_point_x = self.x_positions[x_index, x_velocity_index, np.maximum(frames - 1, 0)].astype(np.int32)
+        is_in_table = (
+            (frames > 0)
+            & (self.x_net_masks[x_index, x_velocity_index] & self.y_net_masks[y_index, y_velocity_index] == 0)
+            & (x_index == x - X_MIN)
+            & (x_velocity_index == x_velocity - X_VELOCITY_MIN)
+            & (y_index == y - Y_MIN)
+            & (y_velocity_index == y_velocity - Y_VELOCITY_MIN)
+        )
+        for i in np.flatnonzero(~is_in_table):
+            landing_point_x[i] = simulate_landing_point_x(int(x[i]), int(y[i]), int(x_velocity[i]), int(y_velocity[i]))
+        return landing_point_x
@@ -2,10 +2,14 @@
 All of the code for pika-zoo was written based on https://github.com/gorisanson/pikachu-volleyball
 """
 
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple, TYPE_CHECKING
+import functools
 import numpy as np
 from numpy.typing import NDArray
 
+if TYPE_CHECKING:
+    from .landing_point_table import LandingPointTable
+
 # ground width
 GROUND_WIDTH: int = 432
 # ground half-width, it is also the net pillar x coordinate
@@ -32,6 +36,22 @@ NET_PILLAR_TOP_BOTTOM_Y_COORD: int = 192
 """
 INFINITE_LOOP_LIMIT: int = 1000
 
+# maximum number of ball states whose six power hit landing points are cached
+POWER_HIT_CACHE_SIZE: int = 2**13
+
+# (x direction, y direction) of the six power hits, in the order of `cached_power_hit_landing_points_x`
+POWER_HIT_DIRECTIONS = tuple((x_direction, y_direction) for x_direction in (1, 0) for y_direction in (-1, 0, 1))
+# (index of the landing point, x direction, y direction) of the six power hits,
+# in the order `decide_whether_input_power_hit` tries them, after the first random draw is 0 or 1
+POWER_HIT_CANDIDATES = tuple(
+    tuple(
+        (POWER_HIT_DIRECTIONS.index((x_direction, y_direction)), x_direction, y_direction)
+        for x_direction in (1, 0)
+        for y_direction in y_directions
+    )
+    for y_directions in ((-1, 0, 1), (1, 0, -1))
+)
+
 
 class PikaUserInput:
     """
@@ -40,6 +60,19 @@ class PikaUserInput:
         This is because the current environment does not accept keyboard input.
     """
 
+    __slots__ = (
+        "x_direction",
+        "y_direction",
+        "power_hit",
+        "power_hit_key_is_down_previous",
+        "left_key",
+        "right_key",
+        "up_key",
+        "down_key",
+        "power_hit_key",
+        "down_right_key",
+    )
+
     def __init__(self) -> None:
         # 0: no horizontal-direction input, -1: left-direction input, 1: right-direction input
         self.x_direction: int = 0
@@ -109,18 +142,23 @@ class PikaPhysics:
         is_player1_computer: bool,
         is_player2_computer: bool,
         np_random: np.random.Generator,
+        landing_point_table: Optional["LandingPointTable"] = None,
     ) -> None:
         """Create a physics pack
 
         Args:
             is_player1_computer (bool): Is player on the left (player 1) controlled by computer?
             is_player2_computer (bool): Is player on the right (player 2) controlled by computer?
-            np_random (np.random.Generator): The environment-dependent np.random.generator
+            np_random (np.random.Generator): The environment-dependent np.random.generator,
+                or a `BufferedRandom` of it, which has the same `integers`
+            landing_point_table (LandingPointTable, optional): Table used in place of the simulation
+                of the expected landing point of the ball
         """
         self.player1 = Player(False, is_player1_computer, np_random)
         self.player2 = Player(True, is_player2_computer, np_random)
         self.ball = Ball(False)
         self.np_random = np_random
+        self.landing_point_table = landing_point_table
 
     def run_engine_for_next_frame(self, user_input_array: List[PikaUserInput]) -> bool:
         """run `physicsEngine` function with this physics object and user input
@@ -132,7 +170,7 @@ class PikaPhysics:
             bool: Is ball touching ground?
         """
         is_ball_touching_ground: bool = physics_engine(
-            self.player1, self.player2, self.ball, user_input_array, self.np_random
+            self.player1, self.player2, self.ball, user_input_array, self.np_random, self.landing_point_table
         )
         return is_ball_touching_ground
 
@@ -140,6 +178,27 @@ class PikaPhysics:
 class Player:
     """Class representing a player"""
 
+    __slots__ = (
+        "is_player2",
+        "is_computer",
+        "np_random",
+        "x",
+        "y",
+        "y_velocity",
+        "is_collision_with_ball_happened",
+        "state",
+        "frame_number",
+        "normal_status_arm_swing_direction",
+        "delay_before_next_frame",
+        "computer_boldness",
+        "diving_direction",
+        "lying_down_duration_left",
+        "is_winner",
+        "game_ended",
+        "computer_where_to_stand_by",
+        "sound",
+    )
+
     def __init__(self, is_player2: bool, is_computer: bool, np_random: np.random.Generator):
         """create a player
 
@@ -215,12 +274,31 @@ class Player:
         and dives less.
         See the source code of the `let_computer_decide_user_input` function.
         """
-        self.computer_boldness: int = self.np_random.integers(0, 5)
+        self.computer_boldness: int = int(self.np_random.integers(0, 5))
 
 
 class Ball:
     """Class representing a ball"""
 
+    __slots__ = (
+        "x",
+        "y",
+        "x_velocity",
+        "y_velocity",
+        "punch_effect_radius",
+        "is_power_hit",
+        "expected_landing_point_x",
+        "rotation",
+        "fine_rotation",
+        "punch_effect_x",
+        "punch_effect_y",
+        "previous_x",
+        "previous_previous_x",
+        "previous_y",
+        "previous_previous_y",
+        "sound",
+    )
+
     def __init__(self, is_player2_serve: bool):
         """Create a ball
 
@@ -283,6 +361,7 @@ def physics_engine(
     ball: Ball,
     user_input_array: List[PikaUserInput],
     np_random: np.random.Generator,
+    landing_point_table: Optional["LandingPointTable"] = None,
 ) -> bool:
     """This is the Pikachu Volleyball physics engine!
     This physics engine calculates and set the physics values for the next frame.
@@ -293,6 +372,8 @@ def physics_engine(
         ball (Ball): ball
         user_input_array (List[PikaUserInput]): userInputArray[0]: user input for player 1, userInputArray[1]: user input for player 2
         np_random (np.random.Generator): The environment-dependent np.random.generator
+        landing_point_table (LandingPointTable, optional): Table used in place of the simulation
+            of the expected landing point of the ball
 
     Returns:
         bool: Is ball touching ground?
@@ -312,7 +393,7 @@ def physics_engine(
         # calculate expected x
         # https://github.com/helpingstar/pika-zoo/pull/5
         if player1.is_computer or player2.is_computer:
-            calculate_expected_landing_point_x_for(ball)
+            calculate_expected_landing_point_x_for(ball, landing_point_table)
 
         process_player_movement_and_set_player_position(player, user_input_array[i], the_other_player, ball, np_random)
 
@@ -329,7 +410,7 @@ def physics_engine(
                 process_collision_between_ball_and_player(ball, player.x, user_input_array[i], player.state, np_random)
                 # https://github.com/helpingstar/pika-zoo/pull/5
                 if player1.is_computer or player2.is_computer:
-                    calculate_expected_landing_point_x_for(ball)
+                    calculate_expected_landing_point_x_for(ball, landing_point_table)
                 player.is_collision_with_ball_happened = True
         else:
             player.is_collision_with_ball_happened = False
@@ -398,7 +479,7 @@ def process_collision_between_ball_and_world_and_set_ball_position(ball: Ball) -
     Is this a mistake of the author of the original game?
     Or, was it set to this value to resolve infinite loop problem? (See comments on the constant INFINITE_LOOP_LIMIT.)
     If apply (future_ball_x > (GROUND_WIDTH - BALL_RADIUS)), and if the maximum number of loop is not limited,
-    it is observed that infinite loop in the function `expected_landing_point_x_when_power_hit` does not terminate.
+    it is observed that infinite loop in the function `simulate_power_hit_landing_point_x` does not terminate.
     """
     if (future_ball_x < BALL_RADIUS) or (future_ball_x > GROUND_WIDTH):
         ball.x_velocity = -ball.x_velocity
@@ -640,50 +721,63 @@ def process_collision_between_ball_and_player(
     # calculate_expected_landing_point_x_for(ball)
 
 
-def calculate_expected_landing_point_x_for(ball: Ball):
+def calculate_expected_landing_point_x_for(ball: Ball, landing_point_table: Optional["LandingPointTable"] = None):
     """Calculate x coordinate of expected landing point of the ball
 
     Args:
         ball (Ball): ball
+        landing_point_table (LandingPointTable, optional): If given, the landing point is looked up in this table
+            instead of simulating the flight of the ball. The result is the same.
+    """
+    if landing_point_table is None:
+        ball.expected_landing_point_x = simulate_landing_point_x(ball.x, ball.y, ball.x_velocity, ball.y_velocity)
+    else:
+        ball.expected_landing_point_x = landing_point_table.lookup(ball.x, ball.y, ball.x_velocity, ball.y_velocity)
+
+
+def simulate_landing_point_x(x: int, y: int, x_velocity: int, y_velocity: int) -> int:
+    """Simulate the flight of a ball frame by frame and return the x coordinate of its landing point.
+    This is the loop of the original `calculateExpectedLandingPointXFor` function,
+    on local variables instead of a copy of the ball.
+
+    Args:
+        x (int): ball.x
+        y (int): ball.y
+        x_velocity (int): ball.x_velocity
+        y_velocity (int): ball.y_velocity
+
+    Returns:
+        int: x coord of expected landing point
     """
-    copy_ball: Dict[str, int] = {
-        "x": ball.x,
-        "y": ball.y,
-        "x_velocity": ball.x_velocity,
-        "y_velocity": ball.y_velocity,
-    }
     loop_counter = 0
     while True:
         loop_counter += 1
 
-        future_copy_ball_x: int = copy_ball["x_velocity"] + copy_ball["x"]
+        future_copy_ball_x: int = x_velocity + x
         if future_copy_ball_x < BALL_RADIUS or future_copy_ball_x > GROUND_WIDTH:
-            copy_ball["x_velocity"] = -copy_ball["x_velocity"]
-        if copy_ball["y"] + copy_ball["y_velocity"] < 0:
-            copy_ball["y_velocity"] = 1
+            x_velocity = -x_velocity
+        if y + y_velocity < 0:
+            y_velocity = 1
 
         # If copy ball touches net
-        if (
-            abs(copy_ball["x"] - GROUND_HALF_WIDTH) < NET_PILLAR_HALF_WIDTH
-            and copy_ball["y"] > NET_PILLAR_TOP_TOP_Y_COORD
-        ):
-            if copy_ball["y"] < NET_PILLAR_TOP_BOTTOM_Y_COORD:
-                if copy_ball["y_velocity"] > 0:
-                    copy_ball["y_velocity"] = -copy_ball["y_velocity"]
+        if abs(x - GROUND_HALF_WIDTH) < NET_PILLAR_HALF_WIDTH and y > NET_PILLAR_TOP_TOP_Y_COORD:
+            if y < NET_PILLAR_TOP_BOTTOM_Y_COORD:
+                if y_velocity > 0:
+                    y_velocity = -y_velocity
             else:
-                if copy_ball["x"] < GROUND_HALF_WIDTH:
-                    copy_ball["x_velocity"] = -abs(copy_ball["x_velocity"])
+                if x < GROUND_HALF_WIDTH:
+                    x_velocity = -abs(x_velocity)
                 else:
-                    copy_ball["x_velocity"] = abs(copy_ball["x_velocity"])
+                    x_velocity = abs(x_velocity)
 
-        copy_ball["y"] = copy_ball["y"] + copy_ball["y_velocity"]
+        y = y + y_velocity
         # if copy_ball would touch ground
-        if copy_ball["y"] > BALL_TOUCHING_GROUND_Y_COORD or loop_counter >= INFINITE_LOOP_LIMIT:
+        if y > BALL_TOUCHING_GROUND_Y_COORD or loop_counter >= INFINITE_LOOP_LIMIT:
             break
 
-        copy_ball["x"] = copy_ball["x"] + copy_ball["x_velocity"]
-        copy_ball["y_velocity"] += 1
-    ball.expected_landing_point_x = copy_ball["x"]
+        x = x + x_velocity
+        y_velocity += 1
+    return x
 
 
 def let_computer_decide_user_input(
@@ -792,93 +886,98 @@ def decide_whether_input_power_hit(
     Returns:
         bool: Will input power hit?
     """
-    if np_random.integers(0, 2) == 0:
-        for x_direction in range(1, -1, -1):
-            for y_direction in range(-1, 2, 1):
-                expected_landing_point_x: int = expected_landing_point_x_when_power_hit(x_direction, y_direction, ball)
-                if (
-                    expected_landing_point_x <= int(player.is_player2) * GROUND_HALF_WIDTH
-                    or expected_landing_point_x >= int(player.is_player2) * GROUND_WIDTH + GROUND_HALF_WIDTH
-                ) and abs(expected_landing_point_x - the_other_player.x) > PLAYER_LENGTH:
-                    user_input.x_direction = x_direction
-                    user_input.y_direction = y_direction
-                    return True
-    else:
-        for x_direction in range(1, -1, -1):
-            for y_direction in range(1, -2, -1):
-                expected_landing_point_x = expected_landing_point_x_when_power_hit(x_direction, y_direction, ball)
-                if (
-                    expected_landing_point_x <= int(player.is_player2) * GROUND_HALF_WIDTH
-                    or expected_landing_point_x >= int(player.is_player2) * GROUND_WIDTH + GROUND_HALF_WIDTH
-                ) and abs(expected_landing_point_x - the_other_player.x) > PLAYER_LENGTH:
-                    user_input.x_direction = x_direction
-                    user_input.y_direction = y_direction
-                    return True
+    candidates = POWER_HIT_CANDIDATES[0] if np_random.integers(0, 2) == 0 else POWER_HIT_CANDIDATES[1]
+    landing_points_x = cached_power_hit_landing_points_x(ball.x, ball.y, abs(ball.y_velocity))
+    for index, x_direction, y_direction in candidates:
+        expected_landing_point_x: int = landing_points_x[index]
+        if (
+            expected_landing_point_x <= int(player.is_player2) * GROUND_HALF_WIDTH
+            or expected_landing_point_x >= int(player.is_player2) * GROUND_WIDTH + GROUND_HALF_WIDTH
+        ) and abs(expected_landing_point_x - the_other_player.x) > PLAYER_LENGTH:
+            user_input.x_direction = x_direction
+            user_input.y_direction = y_direction
+            return True
     return False
 
 
-def expected_landing_point_x_when_power_hit(
-    user_input_x_direction: int, user_input_y_direction: int, ball: Ball
+@functools.lru_cache(maxsize=POWER_HIT_CACHE_SIZE)
+def cached_power_hit_landing_points_x(ball_x: int, ball_y: int, ball_abs_y_velocity: int) -> Tuple[int, ...]:
+    """`simulate_power_hit_landing_point_x` of the six power hits with a bounded cache.
+    The x velocity of the ball is replaced by the power hit and only the absolute value of the y velocity is used,
+    so these three values decide the landing points of every direction, which one lookup returns.
+
+    The least recently used entry is evicted when the cache is full.
+    The hit/miss counters are in `cached_power_hit_landing_points_x.cache_info()`.
+
+    Args:
+        ball_x (int): ball.x
+        ball_y (int): ball.y
+        ball_abs_y_velocity (int): abs(ball.y_velocity)
+
+    Returns:
+        Tuple[int, ...]: x coords of the expected landing points, in the order of `POWER_HIT_DIRECTIONS`
+    """
+    return tuple(
+        simulate_power_hit_landing_point_x(x_direction, y_direction, ball_x, ball_y, ball_abs_y_velocity)
+        for x_direction, y_direction in POWER_HIT_DIRECTIONS
+    )
+
+
+def simulate_power_hit_landing_point_x(
+    user_input_x_direction: int, user_input_y_direction: int, x: int, y: int, y_velocity: int
 ) -> int:
-    """This function is called by `decide_whether_input_power_hit`,
-    and calculates the expected x coordinate of the landing point of the ball
-    when power hit
+    """This function is called by `cached_power_hit_landing_points_x`,
+    and calculates the expected x coordinate of the landing point of the ball when power hit,
+    on local variables instead of a copy of the ball
 
     Args:
         user_input_x_direction (int):
         user_input_y_direction (int):
-        ball (Ball): ball
+        x (int): ball.x
+        y (int): ball.y
+        y_velocity (int): ball.y_velocity
 
     Returns:
         int: x coord of expected landing point when power hit the ball
     """
-    copy_ball: Dict[str, int] = {
-        "x": ball.x,
-        "y": ball.y,
-        "x_velocity": ball.x_velocity,
-        "y_velocity": ball.y_velocity,
-    }
-    if copy_ball["x"] < GROUND_HALF_WIDTH:
-        copy_ball["x_velocity"] = (abs(user_input_x_direction) + 1) * 10
+    if x < GROUND_HALF_WIDTH:
+        x_velocity = (abs(user_input_x_direction) + 1) * 10
     else:
-        copy_ball["x_velocity"] = -(abs(user_input_x_direction) + 1) * 10
-    copy_ball["y_velocity"] = abs(copy_ball["y_velocity"]) * user_input_y_direction * 2
+        x_velocity = -(abs(user_input_x_direction) + 1) * 10
+    y_velocity = abs(y_velocity) * user_input_y_direction * 2
 
     loop_counter = 0
     while True:
         loop_counter += 1
 
-        future_copy_ball_x: int = copy_ball["x"] + copy_ball["x_velocity"]
+        future_copy_ball_x: int = x + x_velocity
         if future_copy_ball_x < BALL_RADIUS or future_copy_ball_x > GROUND_WIDTH:
-            copy_ball["x_velocity"] = -copy_ball["x_velocity"]
-        if copy_ball["y"] + copy_ball["y_velocity"] < 0:
-            copy_ball["y_velocity"] = 1
-        if (
-            abs(copy_ball["x"] - GROUND_HALF_WIDTH) < NET_PILLAR_HALF_WIDTH
-            and copy_ball["y"] > NET_PILLAR_TOP_TOP_Y_COORD
-        ):
+            x_velocity = -x_velocity
+        if y + y_velocity < 0:
+            y_velocity = 1
+        if abs(x - GROUND_HALF_WIDTH) < NET_PILLAR_HALF_WIDTH and y > NET_PILLAR_TOP_TOP_Y_COORD:
             """
             The code below maybe is intended to make computer do mistakes.
             The player controlled by computer occasionally power hit ball that is bounced back by the net pillar,
             since code below do not anticipate the bounce back.
             """
-            if copy_ball["y_velocity"] > 0:
-                copy_ball["y_velocity"] = -copy_ball["y_velocity"]
+            if y_velocity > 0:
+                y_velocity = -y_velocity
             """
             An alternative code for making the computer not do those mistakes is as below. 
             
-            if copy_ball["y"] <= NET_PILLAR_TOP_BOTTOM_Y_COORD:
-                if copy_ball["y_velocity"] > 0:
-                    copy_ball["y_velocity"] = -copy_ball["y_velocity"]
+            if y <= NET_PILLAR_TOP_BOTTOM_Y_COORD:
+                if y_velocity > 0:
+                    y_velocity = -y_velocity
             else:
-                if copy_ball["x"] < GROUND_HALF_WIDTH:
-                    copy_ball["x_velocity"] = -abs(copy_ball["x_velocity"])
+                if x < GROUND_HALF_WIDTH:
+                    x_velocity = -abs(x_velocity)
                 else:
-                    copy_ball["x_velocity"] = abs(copy_ball["x_velocity"])
+                    x_velocity = abs(x_velocity)
             """
 
-        copy_ball["y"] = copy_ball["y"] + copy_ball["y_velocity"]
-        if copy_ball["y"] > BALL_TOUCHING_GROUND_Y_COORD or loop_counter >= INFINITE_LOOP_LIMIT:
-            return copy_ball["x"]
-        copy_ball["x"] = copy_ball["x"] + copy_ball["x_velocity"]
-        copy_ball["y_velocity"] += 1
+        y = y + y_velocity
+        if y > BALL_TOUCHING_GROUND_Y_COORD or loop_counter >= INFINITE_LOOP_LIMIT:
+            return x
+        x = x + x_velocity
+        y_velocity += 1
@@ -0,0 +1,179 @@
+import multiprocessing
+import os
+import traceback
+import numpy as np
+from typing import Optional
+from .pikazoo_vector_env import raw_vector_env
+from .shared_memory import (
+    SharedArraySpecs,
+    get_shared_arrays,
+    get_shared_buffer_size,
+    start_workers,
+    wait_for_workers,
+    close_workers,
+)
+
+
+def async_vector_env(**kwargs):
+    env = raw_async_vector_env(**kwargs)
+    return env
+
+
+def get_shared_array_specs(num_envs: int) -> SharedArraySpecs:
+    """(name, shape, dtype) of every array in the shared memory block
+
+    Args:
+        num_envs (int): Number of matches of all workers
+    """
+    return (
+        ("actions", (num_envs, 2), np.dtype(np.int32)),
+        ("observations", (num_envs, 2, 35), np.dtype(np.int32)),
+        ("rewards", (num_envs, 2), np.dtype(np.float32)),
+        ("terminations", (num_envs, 2), np.dtype(bool)),
+        ("truncations", (num_envs, 2), np.dtype(bool)),
+        ("scores", (num_envs, 2), np.dtype(np.int32)),
+        ("final_observation", (num_envs, 2, 35), np.dtype(np.int32)),
+        ("final_score", (num_envs, 2), np.dtype(np.int32)),
+    )
+
+
+def _worker(pipe, buffer, num_envs: int, start: int, stop: int, env_kwargs: dict):
+    """Step the matches [start, stop) with a `raw_vector_env` whose output buffers are the shared arrays"""
+    shared_arrays = get_shared_arrays(buffer, get_shared_array_specs(num_envs))
+    actions = shared_arrays["actions"][start:stop]
+    final_observation = shared_arrays["final_observation"][start:stop]
+    final_score = shared_arrays["final_score"][start:stop]
+
+    env = raw_vector_env(num_envs=stop - start, **env_kwargs)
+    # `raw_vector_env` writes every output in place, so it writes straight into the shared memory.
+    env.observations = shared_arrays["observations"][start:stop]
+    env.rewards = shared_arrays["rewards"][start:stop]
+    env.terminations = shared_arrays["terminations"][start:stop]
+    env.truncations = shared_arrays["truncations"][start:stop]
+    env.scores = shared_arrays["scores"][start:stop]
+
+    try:
+        while True:
+            command, data = pipe.recv()
+            if command == "step":
+                _, _, terminations, _, infos = env.step(actions)
+                is_game_ended = "final_observation" in infos
+                if is_game_ended:
+                    game_ended = terminations[:, 0]
+                    final_observation[game_ended] = infos["final_observation"][game_ended]
+                    final_score[game_ended] = infos["final_score"][game_ended]
+                pipe.send(("ok", is_game_ended))
+            elif command == "reset":
+                env.reset(seed=None if data is None else data + start)
+                pipe.send(("ok", None))
+            elif command == "close":
+                env.close()
+                pipe.send(("closed", None))
+                break
+    except KeyboardInterrupt:
+        pass
+    except Exception:
+        pipe.send(("error", traceback.format_exc()))
+    finally:
+        pipe.close()
+
+
+class raw_async_vector_env:
+    """
+    `raw_vector_env` split into shards, each stepped by its own worker process.
+
+    Every worker writes the observations, rewards, terminations, truncations and scores of its matches
+    straight into arrays in one shared memory block, and reads its actions from there.
+    Only short commands go through the pipes, so nothing is pickled per frame.
+    The API is the same as `raw_vector_env`.
+    """
+
+    metadata = {
+        "render_modes": [],
+        "name": "pikazoo_async_vector_v0",
+    }
+
+    def __init__(
+        self,
+        num_envs=1,
+        num_workers=None,
+        context=None,
+        winning_score=15,
+        serve="winner",
+    ):
+        """
+        Args:
+            num_envs (int): Number of matches of all workers
+            num_workers (int, optional): Number of worker processes. Defaults to the number of cores.
+            context (str, optional): Start method of the workers, "fork", "spawn" or "forkserver".
+                Defaults to the default start method of the platform.
+        """
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        num_workers = min(num_workers, num_envs)
+        self.num_envs: int = num_envs
+        self.num_workers: int = num_workers
+        self.possible_agents = ["player_1", "player_2"]
+        self.agents = self.possible_agents[:]
+        env_kwargs = {"winning_score": winning_score, "serve": serve}
+        # for the spaces
+        self._single_env = raw_vector_env(num_envs=1, **env_kwargs)
+
+        ctx = multiprocessing.get_context(context)
+        arrays = get_shared_array_specs(num_envs)
+        self._buffer = ctx.RawArray("b", get_shared_buffer_size(arrays))
+        self._shared_arrays = get_shared_arrays(self._buffer, arrays)
+        self._pipes, self._processes = start_workers(ctx, _worker, self._buffer, num_envs, num_workers, env_kwargs)
+        self.closed = False
+
+    def reset(self, seed: Optional[int] = None, options: Optional[dict] = None):
+        """Reset every match. If `seed` is given, match n is seeded with `seed + n`, same as `raw_vector_env`."""
+        for pipe in self._pipes:
+            pipe.send(("reset", seed))
+        self._wait()
+        return self._shared_arrays["observations"], {"score": self._shared_arrays["scores"]}
+
+    def step(self, actions):
+        self.step_async(actions)
+        return self.step_wait()
+
+    def step_async(self, actions):
+        """Write the actions into the shared memory and let the workers step"""
+        self._shared_arrays["actions"][...] = actions
+        for pipe in self._pipes:
+            pipe.send(("step", None))
+
+    def step_wait(self):
+        """Wait for the workers to finish the step started by `step_async`"""
+        is_game_ended = any(self._wait())
+        shared_arrays = self._shared_arrays
+        infos = {"score": shared_arrays["scores"]}
+        if is_game_ended:
+            infos["final_observation"] = shared_arrays["final_observation"]
+            infos["final_score"] = shared_arrays["final_score"]
+        return (
+            shared_arrays["observations"],
+            shared_arrays["rewards"],
+            shared_arrays["terminations"],
+            shared_arrays["truncations"],
+            infos,
+        )
+
+    def _wait(self) -> list:
+        return wait_for_workers(self._pipes, self.close, "async_vector_env")
+
+    def observation_space(self, agent):
+        return self._single_env.observation_space(agent)
+
+    def action_space(self, agent):
+        return self._single_env.action_space(agent)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        close_workers(self._pipes, self._processes)
+
+    def __del__(self):
+        if not getattr(self, "closed", True):
+            self.close()
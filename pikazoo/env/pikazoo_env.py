@@ -1,6 +1,9 @@
 import functools
+import operator
+import struct
 import gymnasium
 import numpy as np
+from numpy.typing import NDArray
 from gymnasium import spaces
 from gymnasium.utils import seeding
 from pettingzoo import ParallelEnv
@@ -16,12 +19,184 @@ from .physics import (
     BALL_RADIUS,
     BALL_TOUCHING_GROUND_Y_COORD,
 )
-from .cloud_and_wave import Cloud, Wave, cloud_and_wave_engine
-from typing import List, Dict
-import pygame
+from .vec_physics import PLAYER_FIELDS, BALL_FIELDS, USER_INPUT_FIELDS
+from .cloud_and_wave import Clouds, Wave, cloud_and_wave_engine
+from .pixel_observation import PixelObservation
+from .buffered_random import BufferedRandom
+from . import rasterizer
+from .rasterizer import PLAYER_RENDER_FIELDS, BALL_RENDER_FIELDS, CLOUD_RENDER_FIELDS, SCORES, CLOUDS_START, WAVES_START
+from typing import List, Dict, Tuple, TYPE_CHECKING
 import os
+from types import SimpleNamespace
+
+# pygame is imported by the methods which render with it, so that an env which does not render never imports it
+if TYPE_CHECKING:
+    import pygame
 
 GROUND_HEIGHT = 304
+# The highest y coord of a player, at the top of a jump
+PLAYER_HIGHEST_Y_COORD = 108
+
+# [left, right, up, down, power_hit] keys pressed by each action
+ACTION_KEY_MAP = np.array(
+    [
+        [0, 0, 0, 0, 0],  # 0
+        [0, 0, 0, 0, 1],  # 1
+        [0, 0, 1, 0, 0],  # 2
+        [0, 1, 0, 0, 0],  # 3
+        [1, 0, 0, 0, 0],  # 4
+        [0, 0, 0, 1, 0],  # 5
+        [0, 1, 1, 0, 0],  # 6
+        [1, 0, 1, 0, 0],  # 7
+        [0, 1, 0, 1, 0],  # 8
+        [1, 0, 0, 1, 0],  # 9
+        [0, 0, 1, 0, 1],  # 10
+        [0, 1, 0, 0, 1],  # 11
+        [1, 0, 0, 0, 1],  # 12
+        [0, 0, 0, 1, 1],  # 13
+        [0, 1, 1, 0, 1],  # 14
+        [1, 0, 1, 0, 1],  # 15
+        [0, 1, 0, 1, 1],  # 16
+        [1, 0, 0, 1, 1],  # 17
+    ],
+    dtype=np.uint8,
+)
+
+
+# writes the observations of both agents, (player 1 | player 2 | ball, player 2 | player 1 | ball), as int32
+OBSERVATION_STRUCT = struct.Struct("70i")
+# fields of a player in its observation, followed by the one-hot `state` and `power_hit_key_is_down_previous`
+get_player_obs_fields = operator.attrgetter(
+    "x", "y", "y_velocity", "diving_direction", "lying_down_duration_left", "frame_number", "delay_before_next_frame"
+)
+# one-hot `Player.state`, by state
+PLAYER_STATE_ONE_HOT = tuple(tuple(int(i == state) for i in range(5)) for state in range(5))
+get_ball_obs_fields = operator.attrgetter(
+    "x",
+    "y",
+    "previous_x",
+    "previous_y",
+    "previous_previous_x",
+    "previous_previous_y",
+    "x_velocity",
+    "y_velocity",
+    "is_power_hit",
+)
+
+# fields of the snapshot made by `raw_env.get_state`, the bool fields are packed as bool so that they are restored as bool
+PLAYER_BOOL_FIELDS = ("is_collision_with_ball_happened", "is_winner", "game_ended")
+BALL_BOOL_FIELDS = ("is_power_hit",)
+# the punch effect is shrunk every frame only for the pictures, so it is left out with the clouds and the wave
+BALL_STATE_FIELDS = tuple(name for name in BALL_FIELDS if name != "punch_effect_radius")
+USER_INPUT_BOOL_FIELDS = ("power_hit_key_is_down_previous",)
+# scores of player 1 and player 2, frames run since `reset`, game_ended, round_ended, is_player2_serve
+# and whether the agents are alive
+ENV_STATE_FORMAT = "iii????"
+STATE_STRUCT = struct.Struct(
+    "="
+    + "".join("?" if name in PLAYER_BOOL_FIELDS else "i" for name in PLAYER_FIELDS) * 2
+    + "".join("?" if name in BALL_BOOL_FIELDS else "i" for name in BALL_STATE_FIELDS)
+    + "".join("?" if name in USER_INPUT_BOOL_FIELDS else "i" for name in USER_INPUT_FIELDS) * 2
+    + ENV_STATE_FORMAT
+)
+PLAYER1_STATE_SLICE = slice(0, len(PLAYER_FIELDS))
+PLAYER2_STATE_SLICE = slice(PLAYER1_STATE_SLICE.stop, PLAYER1_STATE_SLICE.stop + len(PLAYER_FIELDS))
+BALL_STATE_SLICE = slice(PLAYER2_STATE_SLICE.stop, PLAYER2_STATE_SLICE.stop + len(BALL_STATE_FIELDS))
+USER_INPUT1_STATE_SLICE = slice(BALL_STATE_SLICE.stop, BALL_STATE_SLICE.stop + len(USER_INPUT_FIELDS))
+USER_INPUT2_STATE_SLICE = slice(USER_INPUT1_STATE_SLICE.stop, USER_INPUT1_STATE_SLICE.stop + len(USER_INPUT_FIELDS))
+ENV_STATE_SLICE = slice(USER_INPUT2_STATE_SLICE.stop, None)
+get_player_render_fields = operator.attrgetter(*PLAYER_RENDER_FIELDS)
+get_ball_render_fields = operator.attrgetter(*BALL_RENDER_FIELDS)
+get_player_fields = operator.attrgetter(*PLAYER_FIELDS)
+get_ball_state_fields = operator.attrgetter(*BALL_STATE_FIELDS)
+get_user_input_fields = operator.attrgetter(*USER_INPUT_FIELDS)
+
+
+def state_observation_space() -> spaces.Box:
+    """Space of the observation of an agent when `obs_type` is "state", shared by `raw_env` and the vector envs"""
+    # hs) 108 : The maximum height reachable by the player.
+    return spaces.Box(
+        low=np.array(
+            [
+                PLAYER_HALF_LENGTH,  # player
+                108,
+                -15,
+                -1,
+                -2,
+                0,
+                0,
+                0,
+                0,
+                0,
+                0,
+                0,
+                0,
+                PLAYER_HALF_LENGTH,  # opponent player
+                108,
+                -15,
+                -1,
+                -2,
+                0,
+                0,
+                0,
+                0,
+                0,
+                0,
+                0,
+                0,
+                BALL_RADIUS,  # ball
+                0,
+                0,
+                0,
+                0,
+                0,
+                -20,
+                -124,
+                0,
+            ]
+        ),
+        high=np.array(
+            [
+                GROUND_WIDTH - PLAYER_HALF_LENGTH,  # player
+                PLAYER_TOUCHING_GROUND_Y_COORD,
+                16,
+                1,
+                3,
+                4,
+                4,
+                1,
+                1,
+                1,
+                1,
+                1,
+                1,
+                GROUND_WIDTH - PLAYER_HALF_LENGTH,  # opponent player
+                PLAYER_TOUCHING_GROUND_Y_COORD,
+                16,
+                1,
+                3,
+                4,
+                4,
+                1,
+                1,
+                1,
+                1,
+                1,
+                1,
+                GROUND_WIDTH,  # ball
+                BALL_TOUCHING_GROUND_Y_COORD,
+                GROUND_WIDTH,
+                BALL_TOUCHING_GROUND_Y_COORD,
+                GROUND_WIDTH,
+                BALL_TOUCHING_GROUND_Y_COORD,
+                20,
+                124,
+                1,
+            ]
+        ),
+        shape=(35,),
+        dtype=np.int32,
+    )
 
 
 def env(**kwargs):
@@ -30,6 +205,8 @@ def env(**kwargs):
 
 
 def get_image(path):
+    import pygame
+
     cwd = os.path.dirname(__file__)
     image = pygame.image.load(cwd + "/" + path)
     sfc = pygame.Surface(image.get_size(), flags=pygame.SRCALPHA)
@@ -37,6 +214,108 @@ def get_image(path):
     return sfc
 
 
+def load_all_image() -> Dict[str, "pygame.Surface"]:
+    """Load every sprite of the game, and make the flipped and scaled sprites drawn every frame
+
+    Returns:
+        Dict[str, pygame.Surface]: The sprites by the name of the attribute of `raw_env`
+    """
+    import pygame
+
+    sprites = SimpleNamespace()
+    sprites.ball_hyper = get_image(os.path.join("img", "ball_hyper.png"))
+    sprites.ball_punch = get_image(os.path.join("img", "ball_punch.png"))
+    sprites.ball_trail = get_image(os.path.join("img", "ball_trail.png"))
+
+    sprites.ball = (
+        get_image(os.path.join("img", "ball_0.png")),
+        get_image(os.path.join("img", "ball_1.png")),
+        get_image(os.path.join("img", "ball_2.png")),
+        get_image(os.path.join("img", "ball_3.png")),
+        get_image(os.path.join("img", "ball_4.png")),
+        sprites.ball_hyper,
+    )
+
+    sprites.black = get_image(os.path.join("img", "black.png"))
+    sprites.cloud = get_image(os.path.join("img", "cloud.png"))
+    sprites.fight = get_image(os.path.join("img", "fight.png"))
+    sprites.game_end = get_image(os.path.join("img", "game_end.png"))
+    sprites.game_start = get_image(os.path.join("img", "game_start.png"))
+    sprites.ground_line = get_image(os.path.join("img", "ground_line.png"))
+    sprites.ground_line_leftmost = get_image(os.path.join("img", "ground_line_leftmost.png"))
+    sprites.ground_line_rightmost = get_image(os.path.join("img", "ground_line_rightmost.png"))
+    sprites.ground_red = get_image(os.path.join("img", "ground_red.png"))
+    sprites.ground_yellow = get_image(os.path.join("img", "ground_yellow.png"))
+    sprites.mark = get_image(os.path.join("img", "mark.png"))
+    sprites.mountain = get_image(os.path.join("img", "mountain.png"))
+    sprites.net_pillar = get_image(os.path.join("img", "net_pillar.png"))
+    sprites.net_pillar_top = get_image(os.path.join("img", "net_pillar_top.png"))
+    sprites.number = (
+        get_image(os.path.join("img", "number_0.png")),
+        get_image(os.path.join("img", "number_1.png")),
+        get_image(os.path.join("img", "number_2.png")),
+        get_image(os.path.join("img", "number_3.png")),
+        get_image(os.path.join("img", "number_4.png")),
+        get_image(os.path.join("img", "number_5.png")),
+        get_image(os.path.join("img", "number_6.png")),
+        get_image(os.path.join("img", "number_7.png")),
+        get_image(os.path.join("img", "number_8.png")),
+        get_image(os.path.join("img", "number_9.png")),
+    )
+    sprites.pikachu = (
+        get_image(os.path.join("img", "pikachu_0_0.png")),
+        get_image(os.path.join("img", "pikachu_0_1.png")),
+        get_image(os.path.join("img", "pikachu_0_2.png")),
+        get_image(os.path.join("img", "pikachu_0_3.png")),
+        get_image(os.path.join("img", "pikachu_0_4.png")),
+        get_image(os.path.join("img", "pikachu_1_0.png")),
+        get_image(os.path.join("img", "pikachu_1_1.png")),
+        get_image(os.path.join("img", "pikachu_1_2.png")),
+        get_image(os.path.join("img", "pikachu_1_3.png")),
+        get_image(os.path.join("img", "pikachu_1_4.png")),
+        get_image(os.path.join("img", "pikachu_2_0.png")),
+        get_image(os.path.join("img", "pikachu_2_1.png")),
+        get_image(os.path.join("img", "pikachu_2_2.png")),
+        get_image(os.path.join("img", "pikachu_2_3.png")),
+        get_image(os.path.join("img", "pikachu_2_4.png")),
+        get_image(os.path.join("img", "pikachu_3_0.png")),
+        get_image(os.path.join("img", "pikachu_3_1.png")),
+        get_image(os.path.join("img", "pikachu_4_0.png")),
+        get_image(os.path.join("img", "pikachu_5_0.png")),
+        get_image(os.path.join("img", "pikachu_5_1.png")),
+        get_image(os.path.join("img", "pikachu_5_2.png")),
+        get_image(os.path.join("img", "pikachu_5_3.png")),
+        get_image(os.path.join("img", "pikachu_5_4.png")),
+        get_image(os.path.join("img", "pikachu_6_0.png")),
+        get_image(os.path.join("img", "pikachu_6_1.png")),
+        get_image(os.path.join("img", "pikachu_6_2.png")),
+        get_image(os.path.join("img", "pikachu_6_3.png")),
+        get_image(os.path.join("img", "pikachu_6_4.png")),
+    )
+    sprites.pikachu_volleyball = get_image(os.path.join("img", "pikachu_volleyball.png"))
+    sprites.pokemon = get_image(os.path.join("img", "pokemon.png"))
+    sprites.ready = get_image(os.path.join("img", "ready.png"))
+    sprites.sachisoft = get_image(os.path.join("img", "sachisoft.png"))
+    sprites.shadow = get_image(os.path.join("img", "shadow.png"))
+    sprites.sitting_pikachu = get_image(os.path.join("img", "sitting_pikachu.png"))
+    sprites.sky_blue = get_image(os.path.join("img", "sky_blue.png"))
+    sprites.wave = get_image(os.path.join("img", "wave.png"))
+    sprites.with_computer = get_image(os.path.join("img", "with_computer.png"))
+    sprites.with_friend = get_image(os.path.join("img", "with_friend.png"))
+
+    # the flipped and scaled sprites drawn every frame, made once here
+    sprites.flipped_pikachu = tuple(pygame.transform.flip(sprite, True, False) for sprite in sprites.pikachu)
+    # indexed by `Clouds.size_diff`, in [0, 5]
+    sprites.scaled_cloud = tuple(
+        pygame.transform.scale(sprites.cloud, (48 + 2 * size_diff, 24 + 2 * size_diff)) for size_diff in range(6)
+    )
+    # indexed by `Ball.punch_effect_radius`, in [0, BALL_RADIUS]
+    sprites.scaled_ball_punch = tuple(
+        pygame.transform.scale(sprites.ball_punch, (2 * radius, 2 * radius)) for radius in range(BALL_RADIUS + 1)
+    )
+    return vars(sprites)
+
+
 def blit_center(screen, source, dest):
     x = dest[0] - source.get_width() // 2
     y = dest[1] - source.get_height() // 2
@@ -76,6 +355,11 @@ class raw_env(ParallelEnv):
         "render_fps": 20,
     }
 
+    # The static background drawn once by `draw_background_tiles` and shared by every env of the process
+    background = None
+    # The sprites loaded once by `load_all_image` and shared by every env of the process
+    sprites = None
+
     def __init__(
         self,
         winning_score=15,
@@ -83,6 +367,16 @@ class raw_env(ParallelEnv):
         is_player1_computer=False,
         is_player2_computer=False,
         render_mode=None,
+        landing_point_table=None,
+        copy_observation=False,
+        frame_skip=1,
+        fast_forward=False,
+        renderer="pygame",
+        obs_type="state",
+        pixel_shape=(76, 108),
+        grayscale=True,
+        frame_stack=4,
+        buffered_random=False,
     ):
         self.possible_agents = ["player_1", "player_2"]
         # left, right, up, down, power_hit, (down_right)
@@ -93,8 +387,11 @@ class raw_env(ParallelEnv):
                 [spaces.Discrete(18)] * 2,
             )
         )
+        # Whether the physics and the computer draw random numbers from a `BufferedRandom` of `np_random`
+        self.buffered_random: bool = buffered_random
         self._seed()
-        self.physics = PikaPhysics(is_player1_computer, is_player2_computer, self.np_random)
+        # `LandingPointTable` used in place of the simulation of the expected landing point of the ball
+        self.physics = PikaPhysics(is_player1_computer, is_player2_computer, self.random, landing_point_table)
         self.keyboard_array: List[PikaUserInput] = [PikaUserInput(), PikaUserInput()]
         # [0] for player 1 score, [1] for player 2 score
         self.scores: List[int] = [0, 0]
@@ -111,43 +408,60 @@ class raw_env(ParallelEnv):
         self.is_player2_serve: bool = False
 
         # Game Status
+        # number of frames run since `reset`
         self.frames = 0
         self.render_mode = render_mode
         self.screen = None
+        # pygame / numpy, numpy draws "rgb_array" frames with `rasterizer` without pygame
+        assert renderer in ("pygame", "numpy")
+        assert renderer == "pygame" or render_mode != "human"
+        self.renderer = renderer
 
         # [left, right, up, down, power_hit]
-        self.action_key_map = np.array(
-            [
-                [0, 0, 0, 0, 0],  # 0
-                [0, 0, 0, 0, 1],  # 1
-                [0, 0, 1, 0, 0],  # 2
-                [0, 1, 0, 0, 0],  # 3
-                [1, 0, 0, 0, 0],  # 4
-                [0, 0, 0, 1, 0],  # 5
-                [0, 1, 1, 0, 0],  # 6
-                [1, 0, 1, 0, 0],  # 7
-                [0, 1, 0, 1, 0],  # 8
-                [1, 0, 0, 1, 0],  # 9
-                [0, 0, 1, 0, 1],  # 10
-                [0, 1, 0, 0, 1],  # 11
-                [1, 0, 0, 0, 1],  # 12
-                [0, 0, 0, 1, 1],  # 13
-                [0, 1, 1, 0, 1],  # 14
-                [1, 0, 1, 0, 1],  # 15
-                [0, 1, 0, 1, 1],  # 16
-                [1, 0, 0, 1, 1],  # 17
-            ],
-            dtype=np.uint8,
-        )
+        self.action_key_map = ACTION_KEY_MAP
+
+        # [0] for player 1 observation, [1] for player 2 observation.
+        # The observations returned by `reset` and `step` are views of this buffer which are overwritten by the next call,
+        # unless `copy_observation` is True.
+        self.observations = np.zeros((2, 35), dtype=np.int32)
+        self._observation_views = (self.observations[0], self.observations[1])
+        self.copy_observation: bool = copy_observation
+        # state / pixels, pixels are the frames drawn by `rasterizer`, downsampled and stacked by `PixelObservation`
+        assert obs_type in ("state", "pixels")
+        self.obs_type = obs_type
+        if obs_type == "pixels":
+            self.pixel_observation = PixelObservation(pixel_shape, grayscale, frame_stack)
+
+        # number of frames run by one `step`, with the same action
+        assert frame_skip >= 1
+        self.frame_skip: int = frame_skip
+        # Whether to run the frames at the start of a round in which no player can touch the ball inside the env
+        self.fast_forward: bool = fast_forward
 
         if self.render_mode == "human":
+            import pygame
+
             self.clock = pygame.time.Clock()
 
-        if render_mode is not None:
+        # Whether the clouds, the wave and the punch effect move every frame, which only matters to the pictures
+        self.advances_render_state: bool = render_mode is not None or obs_type == "pixels"
+        if render_mode is not None and renderer == "pygame":
             self.get_all_image()
+        elif render_mode is not None or obs_type == "pixels":
+            self.initialize_clouds_and_wave()
 
     def reset(self, seed=None, options=None):
+        if seed is not None:
+            self._seed(seed)
+            self.physics.np_random = self.random
+            self.physics.player1.np_random = self.random
+            self.physics.player2.np_random = self.random
+            # the clouds and the wave are drawn again from the seeded generator, so that the frames are reproducible
+            if self.render_mode is not None or self.obs_type == "pixels":
+                self.initialize_clouds_and_wave()
+
         self.agents = self.possible_agents[:]
+        self.frames = 0
         self.game_ended = False
         self.round_ended = False
         self.is_player2_serve = False
@@ -168,20 +482,65 @@ class raw_env(ParallelEnv):
         if self.render_mode == "human":
             self.render()
 
+        # no key has been pressed yet, so the agents press no key in the frames run before the first observation
+        skipped_frames = self._fast_forward_serve([self.action_key_map[0]] * 2) if self.fast_forward else 0
+
+        if self.obs_type == "pixels":
+            self.pixel_observation.clear()
         observations = self._get_obs()
-        infos = self._get_infos()
+        infos = self._get_infos(skipped_frames)
         return observations, infos
 
     def step(self, actions):
+        keys = [self.action_key_map[actions[agent]] for agent in self.agents]
+        # Stop at the end of a round so that a step never goes over two rounds,
+        # which also makes the reward of the last frame the sum of the rewards of the frames.
+        for _ in range(self.frame_skip):
+            self._run_frame(keys)
+            if self.round_ended:
+                break
+
+        if self.round_ended:
+            if self.is_player2_serve:
+                player1_reward = -1
+            else:
+                player1_reward = 1
+        else:
+            player1_reward = 0
+
+        skipped_frames = 0
+        if self.fast_forward and self.round_ended and not self.game_ended:
+            self._start_new_round()
+            skipped_frames = self._fast_forward_serve(keys)
+
+        observations = self._get_obs()
+
+        rewards = {
+            self.agents[0]: player1_reward,
+            self.agents[1]: -player1_reward,
+        }
+
+        # hs) If self.game_ended = True, then player.state will be set to 5 or 6 in the next step
+        # by the run_engine_for_next_frame function, but since the environment terminates immediately,
+        # player.state does not become 5 or 6.
+        terminations = {agent: self.game_ended for agent in self.agents}
+        truncations = {agent: False for agent in self.agents}
+        infos = self._get_infos(skipped_frames)
+
+        if any(terminations.values()) or all(truncations.values()):
+            self.agents = []
+
+        return observations, rewards, terminations, truncations, infos
+
+    def _run_frame(self, keys):
+        """Run the physics engine for one frame with the keys of player 1 and player 2, and update scores and flags"""
         if self.round_ended and not self.game_ended:
-            self.physics.player1.initialize_for_new_round()
-            self.physics.player2.initialize_for_new_round()
-            self.physics.ball.initialize_for_new_round(self.get_server())
-            self.round_ended = False
+            self._start_new_round()
+        self.frames += 1
 
-        actions = {agent: self.action_key_map[actions[agent]] for agent in self.agents}
-        for i, agent in enumerate(self.agents):
-            self.keyboard_array[i].get_input(actions[agent])
+        # The input is read every frame, so a power hit key held over repeated frames is a power hit only once.
+        for i, key in enumerate(keys):
+            self.keyboard_array[i].get_input(key)
 
         is_ball_touching_ground: bool = self.physics.run_engine_for_next_frame(self.keyboard_array)
 
@@ -209,41 +568,112 @@ class raw_env(ParallelEnv):
 
             self.round_ended = True
 
+        if self.advances_render_state:
+            self.advance_render_state()
+
         if self.render_mode == "human":
             self.render()
 
-        observations = self._get_obs()
+    def _start_new_round(self):
+        self.physics.player1.initialize_for_new_round()
+        self.physics.player2.initialize_for_new_round()
+        self.physics.ball.initialize_for_new_round(self.get_server())
+        self.round_ended = False
 
-        if self.round_ended:
-            if self.is_player2_serve:
-                player1_reward = -1
-            else:
-                player1_reward = 1
+    def _fast_forward_serve(self, keys) -> int:
+        """Run the frames at the start of a round while the served ball is dropping out of reach of both players.
+
+        The agents keep pressing `keys`, the keys of their last action, as with `frame_skip`,
+        so the players move in these frames just as the computers, which decide every frame as usual, do.
+        The frames stop before the frame in which the ball could be lower than the top of a jumping player can touch,
+        so no collision and no point happen in these frames.
+
+        Args:
+            keys: The keys of player 1 and player 2 pressed in every frame
+
+        Returns:
+            int: Number of frames run
+        """
+        ball = self.physics.ball
+        skipped_frames = 0
+        while ball.y + ball.y_velocity < PLAYER_HIGHEST_Y_COORD - PLAYER_HALF_LENGTH and not self.round_ended:
+            self._run_frame(keys)
+            skipped_frames += 1
+        return skipped_frames
+
+    def get_state(self) -> Tuple[bytes, dict]:
+        """Snapshot of the match which `set_state` restores.
+
+        It covers the players, the ball, the input edge detection of both players, the scores,
+        the number of frames run since `reset`, the serve and round/game flags and the random number generator,
+        so a restored env continues exactly like the env the snapshot was taken from.
+        The clouds, the wave and the shrinking punch effect, which only the pictures use, are not included.
+        Neither are the stacked frames of `obs_type="pixels"`,
+        which `set_state` clears, so the first observation after it stacks the same frame `frame_stack` times.
+
+        Returns:
+            Tuple[bytes, dict]: The fields packed by `STATE_STRUCT`, and the state of the bit generator of `np_random`
+                (the state of the `BufferedRandom` if `buffered_random` is True)
+        """
+        physics = self.physics
+        state = STATE_STRUCT.pack(
+            *get_player_fields(physics.player1),
+            *get_player_fields(physics.player2),
+            *get_ball_state_fields(physics.ball),
+            *get_user_input_fields(self.keyboard_array[0]),
+            *get_user_input_fields(self.keyboard_array[1]),
+            self.scores[0],
+            self.scores[1],
+            self.frames,
+            self.game_ended,
+            self.round_ended,
+            self.is_player2_serve,
+            len(self.agents) > 0,
+        )
+        if self.buffered_random:
+            return state, self.random.state
+        return state, self.np_random.bit_generator.state
+
+    def set_state(self, state: Tuple[bytes, dict]):
+        """Restore a snapshot made by `get_state`
+
+        Args:
+            state (Tuple[bytes, dict]): Return value of `get_state`
+        """
+        packed_state, random_state = state
+        values = STATE_STRUCT.unpack(packed_state)
+        physics = self.physics
+        for obj, fields, state_slice in (
+            (physics.player1, PLAYER_FIELDS, PLAYER1_STATE_SLICE),
+            (physics.player2, PLAYER_FIELDS, PLAYER2_STATE_SLICE),
+            (physics.ball, BALL_STATE_FIELDS, BALL_STATE_SLICE),
+            (self.keyboard_array[0], USER_INPUT_FIELDS, USER_INPUT1_STATE_SLICE),
+            (self.keyboard_array[1], USER_INPUT_FIELDS, USER_INPUT2_STATE_SLICE),
+        ):
+            for name, value in zip(fields, values[state_slice]):
+                setattr(obj, name, value)
+        (
+            self.scores[0],
+            self.scores[1],
+            self.frames,
+            self.game_ended,
+            self.round_ended,
+            self.is_player2_serve,
+            is_alive,
+        ) = values[ENV_STATE_SLICE]
+        self.agents = self.possible_agents[:] if is_alive else []
+        if self.buffered_random:
+            self.random.state = random_state
         else:
-            player1_reward = 0
-
-        rewards = {
-            self.agents[0]: player1_reward,
-            self.agents[1]: -player1_reward,
-        }
-
-        # hs) If self.game_ended = True, then player.state will be set to 5 or 6 in the next step
-        # by the run_engine_for_next_frame function, but since the environment terminates immediately,
-        # player.state does not become 5 or 6.
-        terminations = {agent: self.game_ended for agent in self.agents}
-        truncations = {agent: False for agent in self.agents}
-        infos = self._get_infos()
-
-        if any(terminations.values()) or all(truncations.values()):
-            self.agents = []
-
-        return observations, rewards, terminations, truncations, infos
+            self.np_random.bit_generator.state = random_state
+        if self.obs_type == "pixels":
+            self.pixel_observation.clear()
 
     def get_server(self):
         if self.serve == "winner":
             return self.is_player2_serve
         elif self.serve == "random":
-            return self.np_random.integers(0, 2) == 0
+            return self.random.integers(0, 2) == 0
         else:  # alternate
             return (self.scores[0] + self.scores[1]) % 2 == 1
 
@@ -262,15 +692,8 @@ class raw_env(ParallelEnv):
         p2_sprite_idx = get_frame_number_for_player_animated_sprite(p2.state, p2.frame_number)
         p1_xflip = (p1.state == 3 or p1.state == 4) and p1.diving_direction == -1
         p2_xflip = not ((p2.state == 3 or p2.state == 4) and p2.diving_direction == 1)
-        if p1_xflip:
-            _p1_sprite = pygame.transform.flip(self.pikachu[p1_sprite_idx], True, False)
-        else:
-            _p1_sprite = self.pikachu[p1_sprite_idx]
-
-        if p2_xflip:
-            _p2_sprite = pygame.transform.flip(self.pikachu[p2_sprite_idx], True, False)
-        else:
-            _p2_sprite = self.pikachu[p2_sprite_idx]
+        _p1_sprite = self.flipped_pikachu[p1_sprite_idx] if p1_xflip else self.pikachu[p1_sprite_idx]
+        _p2_sprite = self.flipped_pikachu[p2_sprite_idx] if p2_xflip else self.pikachu[p2_sprite_idx]
         blit_center(self.screen, _p1_sprite, (p1.x, p1.y))
         blit_center(self.screen, _p2_sprite, (p2.x, p2.y))
 
@@ -290,46 +713,51 @@ class raw_env(ParallelEnv):
             )
 
         if ball.punch_effect_radius > 0:
-            ball.punch_effect_radius -= 2
-            scaled_ball_punch = pygame.transform.scale(
-                self.ball_punch,
-                (2 * ball.punch_effect_radius, 2 * ball.punch_effect_radius),
-            )
             blit_center(
                 self.screen,
-                scaled_ball_punch,
+                self.scaled_ball_punch[ball.punch_effect_radius],
                 (ball.punch_effect_x, ball.punch_effect_y),
             )
 
     def draw_background(self):
+        if raw_env.background is None:
+            import pygame
+
+            background = pygame.Surface(self.screen.get_size(), 0, self.screen)
+            self.draw_background_tiles(background)
+            raw_env.background = background
+        self.screen.blit(raw_env.background, (0, 0))
+
+    def draw_background_tiles(self, screen):
+        """Draw the sky, the mountain, the ground and the net pillar, which never change, tile by tile"""
         # sky
         for j in range(12):
             for i in range(432 // 16):
-                self.screen.blit(self.sky_blue, (16 * i, 16 * j))
+                screen.blit(self.sky_blue, (16 * i, 16 * j))
 
         # mountain
-        self.screen.blit(self.mountain, (0, 188))
+        screen.blit(self.mountain, (0, 188))
 
         # ground_red
         for i in range(432 // 16):
-            self.screen.blit(self.ground_red, (16 * i, 248))
+            screen.blit(self.ground_red, (16 * i, 248))
 
         # ground_line
         for i in range(1, 432 // 16 - 1):
-            self.screen.blit(self.ground_line, (16 * i, 264))
-        self.screen.blit(self.ground_line_leftmost, (0, 264))
-        self.screen.blit(self.ground_line_rightmost, (432 - 16, 264))
+            screen.blit(self.ground_line, (16 * i, 264))
+        screen.blit(self.ground_line_leftmost, (0, 264))
+        screen.blit(self.ground_line_rightmost, (432 - 16, 264))
 
         # ground_yellow
         for j in range(2):
             for i in range(432 // 16):
-                self.screen.blit(self.ground_yellow, (16 * i, 280 + 16 * j))
+                screen.blit(self.ground_yellow, (16 * i, 280 + 16 * j))
 
         # net pillar
-        self.screen.blit(self.net_pillar_top, (213, 176))
+        screen.blit(self.net_pillar_top, (213, 176))
 
         for j in range(12):
-            self.screen.blit(self.net_pillar, (213, 184 + 8 * j))
+            screen.blit(self.net_pillar, (213, 184 + 8 * j))
 
     def draw_scores_to_score_boards(self):
         # player1
@@ -343,30 +771,68 @@ class raw_env(ParallelEnv):
         self.screen.blit(self.number[self.scores[1] % 10], (432 - 32 - 32 - 14 + 32, 10))
 
     def draw_clouds_and_wave(self):
-        cloud_array = self.cloud_array
+        clouds = self.clouds
         wave = self.wave_
 
-        cloud_and_wave_engine(cloud_array, wave, self.np_random)
-
-        for i in range(self.NUM_OF_CLOUDS):
-            cloud = cloud_array[i]
-            x = cloud.sprite_top_left_point_x
-            y = cloud.sprite_top_left_point_y
-            w = cloud.sprite_width
-            h = cloud.sprite_height
-            scaled_cloud = pygame.transform.scale(self.cloud, (w, h))
-            self.screen.blit(scaled_cloud, (x, y))
+        scaled_cloud = self.scaled_cloud
+        self.screen.blits(
+            [
+                (scaled_cloud[size_diff], (x, y))
+                for x, y, size_diff in zip(
+                    clouds.sprite_top_left_point_x.tolist(),
+                    clouds.sprite_top_left_point_y.tolist(),
+                    clouds.size_diff.tolist(),
+                )
+            ],
+            doreturn=False,
+        )
 
-        for i in range(432 // 16):
-            y = wave.y_coords[i]
-            self.screen.blit(self.wave, (i * 16, y))
+        self.screen.blits([(self.wave, (i * 16, y)) for i, y in enumerate(wave.y_coords.tolist())], doreturn=False)
 
     def render(self):
         if self.render_mode is None:
             gymnasium.logger.warn("You are calling render method without specifying any render mode.")
             return
 
+        if self.render_mode == "rgb_array":
+            return self.render_into(np.empty(rasterizer.SCREEN_SHAPE, dtype=np.uint8))
+
+        import pygame
+
+        self._draw_screen()
+        pygame.display.flip()
+        self.clock.tick(self.metadata["render_fps"])
+
+    def render_into(self, out: NDArray[np.uint8]) -> NDArray[np.uint8]:
+        """Draw the frame of `rgb_array` mode into `out` with no intermediate array.
+        `out` can be a slot of a larger array, ex) `frames[i]` of a (N, 304, 432, 3) array.
+
+        Args:
+            out (NDArray[np.uint8]): (304, 432, 3) array to draw into
+
+        Returns:
+            NDArray[np.uint8]: `out`
+        """
+        assert self.render_mode == "rgb_array"
+        assert out.shape == rasterizer.SCREEN_SHAPE and out.dtype == np.uint8
+
+        if self.renderer == "numpy":
+            rasterizer.render_batch(self.get_render_state(), out=out[np.newaxis])
+            return out
+
+        import pygame
+
+        self._draw_screen()
+        # (width, height, 3) view of the pixels of the screen, the screen is locked until it is deleted
+        pixels = pygame.surfarray.pixels3d(self.screen)
+        np.copyto(out, pixels.transpose(1, 0, 2))
+        del pixels
+        return out
+
+    def _draw_screen(self):
         if self.screen is None:
+            import pygame
+
             pygame.init()
 
             if self.render_mode == "human":
@@ -377,248 +843,125 @@ class raw_env(ParallelEnv):
 
         self.draw()
 
-        observation = np.array(pygame.surfarray.pixels3d(self.screen))
-        if self.render_mode == "human":
-            pygame.display.flip()
-            self.clock.tick(self.metadata["render_fps"])
-        return np.transpose(observation, axes=(1, 0, 2)) if self.render_mode == "rgb_array" else None
-
     def close(self):
         if self.screen is not None:
+            import pygame
+
             pygame.quit()
             self.screen = None
 
     # rename to self.*_sprite
     def get_all_image(self):
-        self.NUM_OF_CLOUDS = 10
-
-        self.ball_hyper = get_image(os.path.join("img", "ball_hyper.png"))
-        self.ball_punch = get_image(os.path.join("img", "ball_punch.png"))
-        self.ball_trail = get_image(os.path.join("img", "ball_trail.png"))
-
-        self.ball = (
-            get_image(os.path.join("img", "ball_0.png")),
-            get_image(os.path.join("img", "ball_1.png")),
-            get_image(os.path.join("img", "ball_2.png")),
-            get_image(os.path.join("img", "ball_3.png")),
-            get_image(os.path.join("img", "ball_4.png")),
-            self.ball_hyper,
-        )
+        """Set the sprites of `load_all_image` as attributes, loaded once per process"""
+        if raw_env.sprites is None:
+            raw_env.sprites = load_all_image()
+        self.__dict__.update(raw_env.sprites)
+        self.initialize_clouds_and_wave()
+
+    def initialize_clouds_and_wave(self):
+        self.clouds = Clouds(self.render_np_random)
+        self.wave_ = Wave()
 
-        self.black = get_image(os.path.join("img", "black.png"))
-        self.cloud = get_image(os.path.join("img", "cloud.png"))
-        self.fight = get_image(os.path.join("img", "fight.png"))
-        self.game_end = get_image(os.path.join("img", "game_end.png"))
-        self.game_start = get_image(os.path.join("img", "game_start.png"))
-        self.ground_line = get_image(os.path.join("img", "ground_line.png"))
-        self.ground_line_leftmost = get_image(os.path.join("img", "ground_line_leftmost.png"))
-        self.ground_line_rightmost = get_image(os.path.join("img", "ground_line_rightmost.png"))
-        self.ground_red = get_image(os.path.join("img", "ground_red.png"))
-        self.ground_yellow = get_image(os.path.join("img", "ground_yellow.png"))
-        self.mark = get_image(os.path.join("img", "mark.png"))
-        self.mountain = get_image(os.path.join("img", "mountain.png"))
-        self.net_pillar = get_image(os.path.join("img", "net_pillar.png"))
-        self.net_pillar_top = get_image(os.path.join("img", "net_pillar_top.png"))
-        self.number = (
-            get_image(os.path.join("img", "number_0.png")),
-            get_image(os.path.join("img", "number_1.png")),
-            get_image(os.path.join("img", "number_2.png")),
-            get_image(os.path.join("img", "number_3.png")),
-            get_image(os.path.join("img", "number_4.png")),
-            get_image(os.path.join("img", "number_5.png")),
-            get_image(os.path.join("img", "number_6.png")),
-            get_image(os.path.join("img", "number_7.png")),
-            get_image(os.path.join("img", "number_8.png")),
-            get_image(os.path.join("img", "number_9.png")),
-        )
-        self.pikachu = (
-            get_image(os.path.join("img", "pikachu_0_0.png")),
-            get_image(os.path.join("img", "pikachu_0_1.png")),
-            get_image(os.path.join("img", "pikachu_0_2.png")),
-            get_image(os.path.join("img", "pikachu_0_3.png")),
-            get_image(os.path.join("img", "pikachu_0_4.png")),
-            get_image(os.path.join("img", "pikachu_1_0.png")),
-            get_image(os.path.join("img", "pikachu_1_1.png")),
-            get_image(os.path.join("img", "pikachu_1_2.png")),
-            get_image(os.path.join("img", "pikachu_1_3.png")),
-            get_image(os.path.join("img", "pikachu_1_4.png")),
-            get_image(os.path.join("img", "pikachu_2_0.png")),
-            get_image(os.path.join("img", "pikachu_2_1.png")),
-            get_image(os.path.join("img", "pikachu_2_2.png")),
-            get_image(os.path.join("img", "pikachu_2_3.png")),
-            get_image(os.path.join("img", "pikachu_2_4.png")),
-            get_image(os.path.join("img", "pikachu_3_0.png")),
-            get_image(os.path.join("img", "pikachu_3_1.png")),
-            get_image(os.path.join("img", "pikachu_4_0.png")),
-            get_image(os.path.join("img", "pikachu_5_0.png")),
-            get_image(os.path.join("img", "pikachu_5_1.png")),
-            get_image(os.path.join("img", "pikachu_5_2.png")),
-            get_image(os.path.join("img", "pikachu_5_3.png")),
-            get_image(os.path.join("img", "pikachu_5_4.png")),
-            get_image(os.path.join("img", "pikachu_6_0.png")),
-            get_image(os.path.join("img", "pikachu_6_1.png")),
-            get_image(os.path.join("img", "pikachu_6_2.png")),
-            get_image(os.path.join("img", "pikachu_6_3.png")),
-            get_image(os.path.join("img", "pikachu_6_4.png")),
-        )
-        self.pikachu_volleyball = get_image(os.path.join("img", "pikachu_volleyball.png"))
-        self.pokemon = get_image(os.path.join("img", "pokemon.png"))
-        self.ready = get_image(os.path.join("img", "ready.png"))
-        self.sachisoft = get_image(os.path.join("img", "sachisoft.png"))
-        self.shadow = get_image(os.path.join("img", "shadow.png"))
-        self.sitting_pikachu = get_image(os.path.join("img", "sitting_pikachu.png"))
-        self.sky_blue = get_image(os.path.join("img", "sky_blue.png"))
-        self.wave = get_image(os.path.join("img", "wave.png"))
-        self.with_computer = get_image(os.path.join("img", "with_computer.png"))
-        self.with_friend = get_image(os.path.join("img", "with_friend.png"))
-
-        self.cloud_array: List[Cloud] = []
-        for i in range(self.NUM_OF_CLOUDS):
-            self.cloud_array.append(Cloud(self.np_random))
+    def advance_render_state(self):
+        """Move the clouds and the wave and shrink the punch effect, once every frame run by `_run_frame`.
+        The renderers and the pixel observation only draw them, so they can draw the same frame any number of times.
+        """
+        cloud_and_wave_engine(self.clouds, self.wave_, self.render_np_random)
+        ball: Ball = self.physics.ball
+        if ball.punch_effect_radius > 0:
+            ball.punch_effect_radius -= 2
 
-        self.wave_ = Wave()
+    def get_render_state(self) -> NDArray[np.int32]:
+        """Everything drawn in a frame, as the int vector drawn by `rasterizer.render_batch`.
+        Available if `render_mode` is given or `obs_type` is "pixels".
+
+        Returns:
+            NDArray[np.int32]: (rasterizer.RENDER_STATE_SIZE,) render state
+        """
+        physics = self.physics
+        clouds = self.clouds
+        state = np.empty(rasterizer.RENDER_STATE_SIZE, dtype=np.int32)
+        state[:SCORES] = (
+            *get_player_render_fields(physics.player1),
+            *get_player_render_fields(physics.player2),
+            *get_ball_render_fields(physics.ball),
+        )
+        state[SCORES : SCORES + 2] = self.scores
+        cloud_state = state[CLOUDS_START:WAVES_START].reshape(-1, len(CLOUD_RENDER_FIELDS))
+        for i, name in enumerate(CLOUD_RENDER_FIELDS):
+            cloud_state[:, i] = getattr(clouds, name)
+        state[WAVES_START:] = self.wave_.y_coords
+        return state
 
     @functools.lru_cache(maxsize=None)
     def observation_space(self, agent=None):
-        # hs) 108 : The maximum height reachable by the player.
-        return spaces.Box(
-            low=np.array(
-                [
-                    PLAYER_HALF_LENGTH,  # player
-                    108,
-                    -15,
-                    -1,
-                    -2,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    PLAYER_HALF_LENGTH,  # opponent player
-                    108,
-                    -15,
-                    -1,
-                    -2,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    BALL_RADIUS,  # ball
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    -20,
-                    -124,
-                    0,
-                ]
-            ),
-            high=np.array(
-                [
-                    GROUND_WIDTH - PLAYER_HALF_LENGTH,  # player
-                    PLAYER_TOUCHING_GROUND_Y_COORD,
-                    16,
-                    1,
-                    3,
-                    4,
-                    4,
-                    1,
-                    1,
-                    1,
-                    1,
-                    1,
-                    1,
-                    GROUND_WIDTH - PLAYER_HALF_LENGTH,  # opponent player
-                    PLAYER_TOUCHING_GROUND_Y_COORD,
-                    16,
-                    1,
-                    3,
-                    4,
-                    4,
-                    1,
-                    1,
-                    1,
-                    1,
-                    1,
-                    1,
-                    GROUND_WIDTH,  # ball
-                    BALL_TOUCHING_GROUND_Y_COORD,
-                    GROUND_WIDTH,
-                    BALL_TOUCHING_GROUND_Y_COORD,
-                    GROUND_WIDTH,
-                    BALL_TOUCHING_GROUND_Y_COORD,
-                    20,
-                    124,
-                    1,
-                ]
-            ),
-            shape=(35,),
-            dtype=np.int32,
-        )
+        if self.obs_type == "pixels":
+            return spaces.Box(low=0, high=255, shape=self.pixel_observation.shape, dtype=np.uint8)
+        return state_observation_space()
 
     def action_space(self, agent):
         return self.action_spaces[agent]
 
     def _seed(self, seed=None):
         self.np_random, seed = seeding.np_random(seed)
-
-    def _get_infos(self):
+        # the source of the random numbers of the match, `np_random` itself or a `BufferedRandom` of it
+        self.random = BufferedRandom(self.np_random) if self.buffered_random else self.np_random
+        # The clouds and the wave draw from their own generator, so that rendering never changes the match
+        self.render_np_random = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(0,)))
+
+    def _get_infos(self, skipped_frames=0):
+        # `skipped_frames` are the frames of a new round run by `_fast_forward_serve`,
+        # in which the agents repeat the keys of their last action
+        if self.fast_forward:
+            return {agent: {"score": self.scores, "skipped_frames": skipped_frames} for agent in self.agents}
         return {agent: {"score": self.scores} for agent in self.agents}
 
     def _get_obs(self):
-        # p1_obs = self._get_player_obs(0)
-        p1_obs = self._get_player_info(self.physics.player1) + [
-            int(self.keyboard_array[0].power_hit_key_is_down_previous)
-        ]
-        p2_obs = self._get_player_info(self.physics.player2) + [
-            int(self.keyboard_array[1].power_hit_key_is_down_previous)
-        ]
-        ball_obs = self._get_ball_obs()
-        obs1 = np.array(p1_obs + p2_obs + ball_obs)
-        obs2 = np.array(p2_obs + p1_obs + ball_obs)
+        if self.obs_type == "pixels":
+            return self._get_pixel_obs()
+
+        # packed straight from the tuples of the fields, the bools are packed as 0 or 1
+        physics = self.physics
+        player1 = physics.player1
+        player2 = physics.player2
+        p1_fields = get_player_obs_fields(player1)
+        p2_fields = get_player_obs_fields(player2)
+        p1_state = PLAYER_STATE_ONE_HOT[player1.state]
+        p2_state = PLAYER_STATE_ONE_HOT[player2.state]
+        p1_key = self.keyboard_array[0].power_hit_key_is_down_previous
+        p2_key = self.keyboard_array[1].power_hit_key_is_down_previous
+        ball_fields = get_ball_obs_fields(physics.ball)
+        OBSERVATION_STRUCT.pack_into(
+            self.observations,
+            0,
+            *p1_fields,
+            *p1_state,
+            p1_key,
+            *p2_fields,
+            *p2_state,
+            p2_key,
+            *ball_fields,
+            *p2_fields,
+            *p2_state,
+            p2_key,
+            *p1_fields,
+            *p1_state,
+            p1_key,
+            *ball_fields,
+        )
 
+        obs1, obs2 = self._observation_views
+        if self.copy_observation:
+            obs1, obs2 = obs1.copy(), obs2.copy()
         return {self.agents[0]: obs1, self.agents[1]: obs2}
 
-    def _get_player_info(self, player: Player):
-        state = [0, 0, 0, 0, 0]
-        state[player.state] = 1
-        return [
-            player.x,
-            player.y,
-            player.y_velocity,
-            player.diving_direction,
-            player.lying_down_duration_left,
-            player.frame_number,
-            player.delay_before_next_frame,
-        ] + state
-
-    def _get_ball_obs(self):
-        ball: Ball = self.physics.ball
-        x = ball.x
-        y = ball.y
-        previous_x = ball.previous_x
-        previous_y = ball.previous_y
-        previous_previous_x = ball.previous_previous_x
-        previous_previous_y = ball.previous_previous_y
-        x_velocity = ball.x_velocity
-        y_velocity = ball.y_velocity
-        is_power_hit = ball.is_power_hit
-        return [
-            x,
-            y,
-            previous_x,
-            previous_y,
-            previous_previous_x,
-            previous_previous_y,
-            x_velocity,
-            y_velocity,
-            is_power_hit,
-        ]
+    def _get_pixel_obs(self):
+        """Both agents observe the same stack of frames"""
+        pixel_observation = self.pixel_observation
+        rasterizer.render_batch(
+            self.get_render_state(), out=pixel_observation.frame[np.newaxis], shape=pixel_observation.pixel_shape
+        )
+        obs = self.pixel_observation.push()
+        if self.copy_observation:
+            return {self.agents[0]: obs.copy(), self.agents[1]: obs.copy()}
+        return {self.agents[0]: obs, self.agents[1]: obs}
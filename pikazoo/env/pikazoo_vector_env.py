@@ -0,0 +1,205 @@
+import functools
+import numpy as np
+from gymnasium import spaces
+from gymnasium.utils import seeding
+from numpy.typing import NDArray
+from typing import Optional
+from .physics import GROUND_HALF_WIDTH
+from .vec_physics import VecPikaPhysics, VecPikaUserInput
+from .pikazoo_env import ACTION_KEY_MAP, state_observation_space
+
+
+def vector_env(**kwargs):
+    env = raw_vector_env(**kwargs)
+    return env
+
+
+class raw_vector_env:
+    """
+    `num_envs` matches of `raw_env` stepped at once on top of `VecPikaPhysics`.
+
+    Actions are given as a (N, 2) int array, [:, 0] for player_1 and [:, 1] for player_2.
+    Observations are returned as a (N, 2, 35) int32 array, where [n, i] is the observation of agent i in match n
+    (the same one `raw_env` gives), and rewards, terminations and truncations as (N, 2) arrays.
+
+    A finished match is reset at the end of the step in which it finished,
+    so the returned observation of that match is the first observation of the next match.
+    The last observation and score of finished matches are given in `infos["final_observation"]`
+    and `infos["final_score"]`.
+
+    The returned arrays are buffers owned by the environment which are overwritten by the next `step()` or `reset()`.
+    Copy them if you need to keep them.
+    """
+
+    metadata = {
+        "render_modes": [],
+        "name": "pikazoo_vector_v0",
+    }
+
+    def __init__(
+        self,
+        num_envs=1,
+        winning_score=15,
+        serve="winner",
+    ):
+        self.num_envs: int = num_envs
+        self.possible_agents = ["player_1", "player_2"]
+        self.agents = self.possible_agents[:]
+        self.action_spaces = dict(
+            zip(
+                self.agents,
+                [spaces.Discrete(18)] * 2,
+            )
+        )
+        self.physics = VecPikaPhysics(num_envs, [seeding.np_random()[0] for _ in range(num_envs)])
+        # the physics and the environment share the generators of each match
+        self.np_randoms = self.physics.np_randoms
+        self.user_input = VecPikaUserInput(num_envs)
+        # [:, 0] for player 1 score, [:, 1] for player 2 score
+        self.scores: NDArray[np.int32] = np.zeros((num_envs, 2), dtype=np.int32)
+        # winning score: if either one of the players reaches this score, game ends
+        self.winning_score: int = winning_score
+        # winner / alternate / random
+        assert serve in ("winner", "alternate", "random")
+        self.serve = serve
+        # Is the game ended?
+        self.game_ended: NDArray[np.bool_] = np.zeros(num_envs, dtype=bool)
+        # Is the round ended?
+        self.round_ended: NDArray[np.bool_] = np.zeros(num_envs, dtype=bool)
+        # Will player 2 serve?
+        self.is_player2_serve: NDArray[np.bool_] = np.zeros(num_envs, dtype=bool)
+
+        self.observations: NDArray[np.int32] = np.zeros((num_envs, 2, 35), dtype=np.int32)
+        self.rewards: NDArray[np.float32] = np.zeros((num_envs, 2), dtype=np.float32)
+        self.terminations: NDArray[np.bool_] = np.zeros((num_envs, 2), dtype=bool)
+        self.truncations: NDArray[np.bool_] = np.zeros((num_envs, 2), dtype=bool)
+
+    def reset(self, seed: Optional[int] = None, options: Optional[dict] = None):
+        """Reset every match. If `seed` is given, match n is seeded with `seed + n`,
+        which is the same as `raw_env.reset(seed=seed + n)`.
+        """
+        if seed is not None:
+            for n in range(self.num_envs):
+                self.np_randoms[n] = seeding.np_random(seed + n)[0]
+
+        self._reset_matches(np.arange(self.num_envs))
+        self._get_obs()
+        return self.observations, {"score": self.scores}
+
+    def step(self, actions):
+        physics = self.physics
+
+        # every finished match has been reset at the end of the previous step, so there is no game ended match here.
+        new_round_env_indices = np.flatnonzero(self.round_ended)
+        if new_round_env_indices.size > 0:
+            physics.player.initialize_for_new_round(new_round_env_indices, self.np_randoms)
+            physics.ball.initialize_for_new_round(new_round_env_indices, self.get_server(new_round_env_indices))
+            self.round_ended[new_round_env_indices] = False
+
+        keys = ACTION_KEY_MAP[np.asarray(actions).T]
+        self.user_input.get_input(keys)
+
+        is_ball_touching_ground = physics.run_engine_for_next_frame(self.user_input)
+
+        is_round_ended = is_ball_touching_ground & ~self.round_ended & ~self.game_ended
+        is_player2_scored = is_round_ended & (physics.ball.punch_effect_x < GROUND_HALF_WIDTH)
+        is_player1_scored = is_round_ended & ~is_player2_scored
+        self.is_player2_serve[is_player2_scored] = True
+        self.is_player2_serve[is_player1_scored] = False
+        self.scores[:, 0] += is_player1_scored
+        self.scores[:, 1] += is_player2_scored
+
+        is_player1_winner = is_player1_scored & (self.scores[:, 0] >= self.winning_score)
+        is_player2_winner = is_player2_scored & (self.scores[:, 1] >= self.winning_score)
+        is_game_ended = is_player1_winner | is_player2_winner
+        self.game_ended |= is_game_ended
+        physics.player.is_winner[0, is_game_ended] = is_player1_winner[is_game_ended]
+        physics.player.is_winner[1, is_game_ended] = is_player2_winner[is_game_ended]
+        physics.player.game_ended[:, is_game_ended] = 1
+        self.round_ended |= is_round_ended
+
+        self._get_obs()
+
+        player1_reward = self.rewards[:, 0]
+        player1_reward[...] = 0
+        player1_reward[self.round_ended & ~self.is_player2_serve] = 1
+        player1_reward[self.round_ended & self.is_player2_serve] = -1
+        np.negative(player1_reward, out=self.rewards[:, 1])
+
+        self.terminations[...] = self.game_ended[:, None]
+        infos = {"score": self.scores}
+
+        game_ended_env_indices = np.flatnonzero(self.game_ended)
+        if game_ended_env_indices.size > 0:
+            infos["final_observation"] = self.observations.copy()
+            infos["final_score"] = self.scores.copy()
+            self._reset_matches(game_ended_env_indices)
+            self._get_obs()
+
+        return self.observations, self.rewards, self.terminations, self.truncations, infos
+
+    def get_server(self, env_indices: NDArray[np.intp]) -> NDArray[np.bool_]:
+        """Same as `raw_env.get_server` for the given matches
+
+        Returns:
+            NDArray[np.bool_]: Will player 2 serve?
+        """
+        if self.serve == "winner":
+            return self.is_player2_serve[env_indices]
+        elif self.serve == "random":
+            return np.array([self.np_randoms[n].integers(0, 2) == 0 for n in env_indices], dtype=bool)
+        else:  # alternate
+            return self.scores[env_indices].sum(axis=1) % 2 == 1
+
+    def _reset_matches(self, env_indices: NDArray[np.intp]):
+        """Same as `raw_env.reset` for the given matches"""
+        physics = self.physics
+        self.game_ended[env_indices] = False
+        self.round_ended[env_indices] = False
+        self.is_player2_serve[env_indices] = False
+        physics.player.game_ended[:, env_indices] = 0
+        physics.player.is_winner[:, env_indices] = 0
+
+        self.scores[env_indices] = 0
+
+        physics.player.initialize_for_new_round(env_indices, self.np_randoms)
+        physics.ball.initialize_for_new_round(env_indices, self.get_server(env_indices))
+
+    def _get_obs(self):
+        """Write the observation of every agent of every match into `self.observations`"""
+        obs = self.observations
+        player = self.physics.player
+        ball = self.physics.ball
+
+        # [:, i, 0:13] the player i, [:, i, 13:26] the opponent of player i, [:, i, 26:35] the ball
+        obs[:, :, 0] = player.x.T
+        obs[:, :, 1] = player.y.T
+        obs[:, :, 2] = player.y_velocity.T
+        obs[:, :, 3] = player.diving_direction.T
+        obs[:, :, 4] = player.lying_down_duration_left.T
+        obs[:, :, 5] = player.frame_number.T
+        obs[:, :, 6] = player.delay_before_next_frame.T
+        obs[:, :, 7:12] = player.state.T[:, :, None] == np.arange(5)
+        obs[:, :, 12] = self.user_input.power_hit_key_is_down_previous.T
+        obs[:, :, 13:26] = obs[:, ::-1, 0:13]
+
+        obs[:, :, 26] = ball.x[:, None]
+        obs[:, :, 27] = ball.y[:, None]
+        obs[:, :, 28] = ball.previous_x[:, None]
+        obs[:, :, 29] = ball.previous_y[:, None]
+        obs[:, :, 30] = ball.previous_previous_x[:, None]
+        obs[:, :, 31] = ball.previous_previous_y[:, None]
+        obs[:, :, 32] = ball.x_velocity[:, None]
+        obs[:, :, 33] = ball.y_velocity[:, None]
+        obs[:, :, 34] = ball.is_power_hit[:, None]
+
+    # the spaces of a single agent of a single match, same as `raw_env`
+    @functools.lru_cache(maxsize=None)
+    def observation_space(self, agent=None):
+        return state_observation_space()
+
+    def action_space(self, agent):
+        return self.action_spaces[agent]
+
+    def close(self):
+        pass
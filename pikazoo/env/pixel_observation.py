@@ -0,0 +1,78 @@
+"""
+Pixel observations of `raw_env` with `obs_type="pixels"`.
+
+The frame is drawn by `rasterizer` directly at the observation size into a preallocated buffer
+(nearest neighbor sampling of the full size picture, the same pixels as `scale_sprite`)
+and optionally converted to grayscale, all into preallocated buffers.
+
+The last `frame_stack` frames are kept in a ring buffer of `2 * frame_stack` slots in which every frame is written twice,
+at `i` and `i + frame_stack`, so the last `frame_stack` frames are always a contiguous slice of the buffer,
+and the stacked observation is a view of it instead of a copy.
+"""
+
+from typing import Tuple
+import numpy as np
+from numpy.typing import NDArray
+from .rasterizer import GROUND_HEIGHT
+from .physics import GROUND_WIDTH
+
+
+class PixelObservation:
+    """Grayscale conversion and frame stacking of the frames drawn by `rasterizer`"""
+
+    def __init__(self, pixel_shape: Tuple[int, int], grayscale: bool, frame_stack: int):
+        height, width = pixel_shape
+        assert 0 < height <= GROUND_HEIGHT and 0 < width <= GROUND_WIDTH
+        assert frame_stack >= 1
+        self.grayscale: bool = grayscale
+        self.frame_stack: int = frame_stack
+
+        # (height, width) of the frames drawn by `rasterizer.render_batch`
+        self.pixel_shape: Tuple[int, int] = (height, width)
+        # the frame drawn by `rasterizer.render_batch` at the observation size
+        self.frame: NDArray[np.uint8] = np.empty((height, width, 3), dtype=np.uint8)
+        if grayscale:
+            self._luma = np.empty((height, width), dtype=np.uint16)
+            self._channel = np.empty((height, width), dtype=np.uint16)
+
+        frame_shape = (height, width) if grayscale else (height, width, 3)
+        # (frame_stack, height, width) or (frame_stack, height, width, 3), the oldest frame first
+        self.shape: Tuple[int, ...] = (frame_stack,) + frame_shape
+        self._stack = np.zeros((2 * frame_stack,) + frame_shape, dtype=np.uint8)
+        self._index = 0
+        self._is_empty = True
+
+    def clear(self):
+        """Forget the stacked frames, the next frame fills the whole stack"""
+        self._is_empty = True
+
+    def push(self) -> NDArray[np.uint8]:
+        """Add `frame` to the stack
+
+        Returns:
+            NDArray[np.uint8]: View of the last `frame_stack` frames, which is overwritten by the next `push`
+        """
+        k = self.frame_stack
+        i = self._index
+        latest = self._stack[i + k]
+        self._convert(latest)
+        if self._is_empty:
+            self._stack[:] = latest
+            self._is_empty = False
+        else:
+            self._stack[i] = latest
+        self._index = (i + 1) % k
+        return self._stack[i + 1 : i + 1 + k]
+
+    def _convert(self, out: NDArray[np.uint8]):
+        frame = self.frame
+        if not self.grayscale:
+            np.copyto(out, frame)
+            return
+        # ITU-R BT.601 luma, (77 R + 150 G + 29 B) / 256
+        np.multiply(frame[..., 0], 77, out=self._luma, dtype=np.uint16)
+        np.multiply(frame[..., 1], 150, out=self._channel, dtype=np.uint16)
+        np.add(self._luma, self._channel, out=self._luma)
+        np.multiply(frame[..., 2], 29, out=self._channel, dtype=np.uint16)
+        np.add(self._luma, self._channel, out=self._luma)
+        np.right_shift(self._luma, 8, out=out, casting="unsafe")
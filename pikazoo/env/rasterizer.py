@@ -0,0 +1,348 @@
+"""
+Headless renderer which draws the same picture as the pygame renderer of `raw_env` with NumPy only.
+
+The sprites are loaded once per process as RGBA arrays.
+Every pixel of every sprite of the game is either fully opaque or fully transparent,
+so drawing a sprite is copying its opaque pixels, and the result is the same as the alpha blending of pygame.
+
+The picture of a match is decided by a small int vector, the render state (see `RENDER_STATE_FIELDS`),
+so many matches can be drawn by one call of `render_batch` into a (N, 304, 432, 3) uint8 array.
+
+A picture of a smaller `shape` is drawn directly at that size: every pixel is the pixel of the full size picture
+picked by the nearest neighbor sampling of `get_sampling`, and only those pixels of the sprites are copied.
+"""
+
+import functools
+import os
+from typing import Dict, NamedTuple, Optional, Tuple
+import numpy as np
+from numpy.typing import NDArray
+from .physics import GROUND_WIDTH
+from .cloud_and_wave import NUM_OF_CLOUDS, NUM_OF_WAVES
+
+GROUND_HEIGHT = 304
+SCREEN_SHAPE: Tuple[int, int, int] = (GROUND_HEIGHT, GROUND_WIDTH, 3)
+
+PLAYER_RENDER_FIELDS = ("x", "y", "state", "frame_number", "diving_direction")
+BALL_RENDER_FIELDS = (
+    "x",
+    "y",
+    "rotation",
+    "is_power_hit",
+    "previous_x",
+    "previous_y",
+    "previous_previous_x",
+    "previous_previous_y",
+    "punch_effect_radius",
+    "punch_effect_x",
+    "punch_effect_y",
+)
+CLOUD_RENDER_FIELDS = ("sprite_top_left_point_x", "sprite_top_left_point_y", "sprite_width", "sprite_height")
+# fields of the render state, followed by `CLOUD_RENDER_FIELDS` of every cloud and the y coord of every wave
+RENDER_STATE_FIELDS = (
+    tuple(f"player1_{name}" for name in PLAYER_RENDER_FIELDS)
+    + tuple(f"player2_{name}" for name in PLAYER_RENDER_FIELDS)
+    + tuple(f"ball_{name}" for name in BALL_RENDER_FIELDS)
+    + ("player1_score", "player2_score")
+)
+CLOUDS_START = len(RENDER_STATE_FIELDS)
+WAVES_START = CLOUDS_START + NUM_OF_CLOUDS * len(CLOUD_RENDER_FIELDS)
+RENDER_STATE_SIZE = WAVES_START + NUM_OF_WAVES
+PLAYER1 = RENDER_STATE_FIELDS.index("player1_x")
+PLAYER2 = RENDER_STATE_FIELDS.index("player2_x")
+BALL = RENDER_STATE_FIELDS.index("ball_x")
+SCORES = RENDER_STATE_FIELDS.index("player1_score")
+
+
+class Sprite(NamedTuple):
+    """RGB of a sprite and the mask of its opaque pixels"""
+
+    rgb: NDArray[np.uint8]
+    mask: NDArray[np.bool_]
+
+
+def load_rgba(name: str) -> NDArray[np.uint8]:
+    """Load `img/{name}.png` as a (height, width, 4) uint8 RGBA array.
+    pygame only decodes the file here, it does not have to be initialized.
+    """
+    import pygame
+
+    surface = pygame.image.load(os.path.join(os.path.dirname(__file__), "img", name + ".png"))
+    width, height = surface.get_size()
+    return np.frombuffer(pygame.image.tobytes(surface, "RGBA"), dtype=np.uint8).reshape(height, width, 4)
+
+
+def to_sprite(rgba: NDArray[np.uint8]) -> Sprite:
+    return Sprite(np.ascontiguousarray(rgba[..., :3]), rgba[..., 3] == 255)
+
+
+def flip_sprite(sprite: Sprite) -> Sprite:
+    return Sprite(np.ascontiguousarray(sprite.rgb[:, ::-1]), np.ascontiguousarray(sprite.mask[:, ::-1]))
+
+
+def scale_sprite(sprite: Sprite, width: int, height: int) -> Sprite:
+    """Nearest neighbor scaling, which picks the same pixels as `pygame.transform.scale`"""
+    rows = np.arange(height) * sprite.mask.shape[0] // height
+    columns = np.arange(width) * sprite.mask.shape[1] // width
+    return Sprite(sprite.rgb[rows[:, None], columns], sprite.mask[rows[:, None], columns])
+
+
+class Sampling(NamedTuple):
+    """Rows and columns of the full size picture which make a picture of a smaller shape, in ascending order"""
+
+    rows: NDArray[np.intp]
+    columns: NDArray[np.intp]
+
+
+@functools.lru_cache(maxsize=None)
+def get_sampling(height: int, width: int) -> Sampling:
+    """Nearest neighbor sampling of the full size picture down to (height, width), the same pixels as `scale_sprite`"""
+    assert 0 < height <= GROUND_HEIGHT and 0 < width <= GROUND_WIDTH
+    return Sampling(np.arange(height) * GROUND_HEIGHT // height, np.arange(width) * GROUND_WIDTH // width)
+
+
+@functools.lru_cache(maxsize=None)
+def get_sampled_background(height: int, width: int) -> NDArray[np.uint8]:
+    rows, columns = get_sampling(height, width)
+    return get_sprites().background[rows[:, None], columns]
+
+
+class Sprites(NamedTuple):
+    background: NDArray[np.uint8]
+    pikachu: Tuple[Sprite, ...]
+    flipped_pikachu: Tuple[Sprite, ...]
+    ball: Tuple[Sprite, ...]
+    ball_hyper: Sprite
+    ball_trail: Sprite
+    ball_punch: Sprite
+    shadow: Sprite
+    number: Tuple[Sprite, ...]
+    cloud: Sprite
+    wave: Sprite
+
+
+# file names of the pikachu sprites, in the order of `get_frame_number_for_player_animated_sprite`
+PIKACHU_SPRITE_NAMES = tuple(f"pikachu_{state}_{frame}" for state in range(3) for frame in range(5)) + (
+    "pikachu_3_0",
+    "pikachu_3_1",
+    "pikachu_4_0",
+    *(f"pikachu_{state}_{frame}" for state in (5, 6) for frame in range(5)),
+)
+
+
+@functools.lru_cache(maxsize=None)
+def get_sprites() -> Sprites:
+    """The sprites of the game, loaded once per process"""
+    sprites = {name: to_sprite(load_rgba(name)) for name in PIKACHU_SPRITE_NAMES}
+    pikachu = tuple(sprites[name] for name in PIKACHU_SPRITE_NAMES)
+    ball_hyper = to_sprite(load_rgba("ball_hyper"))
+    return Sprites(
+        background=make_background(),
+        pikachu=pikachu,
+        flipped_pikachu=tuple(flip_sprite(sprite) for sprite in pikachu),
+        ball=tuple(to_sprite(load_rgba(f"ball_{i}")) for i in range(5)) + (ball_hyper,),
+        ball_hyper=ball_hyper,
+        ball_trail=to_sprite(load_rgba("ball_trail")),
+        ball_punch=to_sprite(load_rgba("ball_punch")),
+        shadow=to_sprite(load_rgba("shadow")),
+        number=tuple(to_sprite(load_rgba(f"number_{i}")) for i in range(10)),
+        cloud=to_sprite(load_rgba("cloud")),
+        wave=to_sprite(load_rgba("wave")),
+    )
+
+
+def make_background() -> NDArray[np.uint8]:
+    """The sky, the mountain, the ground and the net pillar, same as `raw_env.draw_background_tiles`"""
+    screen = np.zeros(SCREEN_SHAPE, dtype=np.uint8)
+    tiles: Dict[str, Sprite] = {
+        name: to_sprite(load_rgba(name))
+        for name in (
+            "sky_blue",
+            "mountain",
+            "ground_red",
+            "ground_line",
+            "ground_line_leftmost",
+            "ground_line_rightmost",
+            "ground_yellow",
+            "net_pillar_top",
+            "net_pillar",
+        )
+    }
+    # sky
+    for j in range(12):
+        for i in range(432 // 16):
+            blit(screen, tiles["sky_blue"], 16 * i, 16 * j)
+    # mountain
+    blit(screen, tiles["mountain"], 0, 188)
+    # ground_red
+    for i in range(432 // 16):
+        blit(screen, tiles["ground_red"], 16 * i, 248)
+    # ground_line
+    for i in range(1, 432 // 16 - 1):
+        blit(screen, tiles["ground_line"], 16 * i, 264)
+    blit(screen, tiles["ground_line_leftmost"], 0, 264)
+    blit(screen, tiles["ground_line_rightmost"], 432 - 16, 264)
+    # ground_yellow
+    for j in range(2):
+        for i in range(432 // 16):
+            blit(screen, tiles["ground_yellow"], 16 * i, 280 + 16 * j)
+    # net pillar
+    blit(screen, tiles["net_pillar_top"], 213, 176)
+    for j in range(12):
+        blit(screen, tiles["net_pillar"], 213, 184 + 8 * j)
+    return screen
+
+
+def blit(screen: NDArray[np.uint8], sprite: Sprite, x: int, y: int, sampling: Optional[Sampling] = None):
+    """Copy the opaque pixels of the sprite whose top left corner is at (x, y), clipped to the screen.
+    If `sampling` is given, the screen is the sampled picture and only the sampled pixels of the sprite are copied.
+    """
+    height, width = sprite.mask.shape
+    if sampling is not None:
+        rows, columns = sampling
+        i0, i1 = np.searchsorted(rows, (y, y + height)).tolist()
+        j0, j1 = np.searchsorted(columns, (x, x + width)).tolist()
+        if i0 >= i1 or j0 >= j1:
+            return
+        sprite_rows = rows[i0:i1, None] - y
+        sprite_columns = columns[j0:j1] - x
+        np.copyto(
+            screen[i0:i1, j0:j1],
+            sprite.rgb[sprite_rows, sprite_columns],
+            where=sprite.mask[sprite_rows, sprite_columns, None],
+        )
+        return
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + width, screen.shape[1]), min(y + height, screen.shape[0])
+    if x0 >= x1 or y0 >= y1:
+        return
+    np.copyto(
+        screen[y0:y1, x0:x1],
+        sprite.rgb[y0 - y : y1 - y, x0 - x : x1 - x],
+        where=sprite.mask[y0 - y : y1 - y, x0 - x : x1 - x, None],
+    )
+
+
+def blit_center(screen: NDArray[np.uint8], sprite: Sprite, x: int, y: int, sampling: Optional[Sampling] = None):
+    height, width = sprite.mask.shape
+    blit(screen, sprite, x - width // 2, y - height // 2, sampling)
+
+
+@functools.lru_cache(maxsize=None)
+def get_scaled_sprite(name: str, width: int, height: int) -> Sprite:
+    """`scale_sprite` of the cloud or the punch effect, cached for every size"""
+    return scale_sprite(getattr(get_sprites(), name), width, height)
+
+
+def get_player_sprite(sprites: Sprites, is_player2: bool, state: int, frame_number: int, diving_direction: int):
+    """The sprite of the player, flipped the same way as `raw_env.draw_player`"""
+    if state < 4:
+        index = 5 * state + frame_number
+    elif state == 4:
+        index = 17 + frame_number
+    else:
+        index = 18 + 5 * (state - 5) + frame_number
+    is_diving = state == 3 or state == 4
+    if is_player2:
+        is_flipped = not (is_diving and diving_direction == 1)
+    else:
+        is_flipped = is_diving and diving_direction == -1
+    return sprites.flipped_pikachu[index] if is_flipped else sprites.pikachu[index]
+
+
+def draw_waves(screens: NDArray[np.uint8], wave_y_coords: NDArray[np.int32], wave: Sprite):
+    """Draw every wave of every screen at once. The waves do not overlap each other."""
+    height, width = wave.mask.shape
+    # (N, waves, rows)
+    y = wave_y_coords[:, :, None] + np.arange(height)
+    is_visible = (y >= 0) & (y < screens.shape[1])
+    n, i, row, column = np.nonzero(is_visible[:, :, :, None] & wave.mask[None, None, :, :])
+    screens[n, y[n, i, row], 16 * i + column] = wave.rgb[row, column]
+
+
+def draw_dynamic_layers(
+    screen: NDArray[np.uint8], render_state: NDArray[np.int32], sprites: Sprites, sampling: Optional[Sampling] = None
+):
+    """Draw the players, the ball and the scores of one match, in the order of `raw_env.draw`"""
+    state = render_state.tolist()
+    p1_x, p1_y, p1_state, p1_frame_number, p1_diving_direction = state[PLAYER1 : PLAYER1 + 5]
+    p2_x, p2_y, p2_state, p2_frame_number, p2_diving_direction = state[PLAYER2 : PLAYER2 + 5]
+    p1_sprite = get_player_sprite(sprites, False, p1_state, p1_frame_number, p1_diving_direction)
+    p2_sprite = get_player_sprite(sprites, True, p2_state, p2_frame_number, p2_diving_direction)
+    blit_center(screen, p1_sprite, p1_x, p1_y, sampling)
+    blit_center(screen, p2_sprite, p2_x, p2_y, sampling)
+    blit_center(screen, sprites.shadow, p1_x, 273, sampling)
+    blit_center(screen, sprites.shadow, p2_x, 273, sampling)
+
+    (
+        ball_x,
+        ball_y,
+        rotation,
+        is_power_hit,
+        previous_x,
+        previous_y,
+        previous_previous_x,
+        previous_previous_y,
+        punch_effect_radius,
+        punch_effect_x,
+        punch_effect_y,
+    ) = state[BALL : BALL + len(BALL_RENDER_FIELDS)]
+    blit_center(screen, sprites.ball[rotation], ball_x, ball_y, sampling)
+    blit_center(screen, sprites.shadow, ball_x, 273, sampling)
+    if is_power_hit:
+        blit_center(screen, sprites.ball_hyper, previous_x, previous_y, sampling)
+        blit_center(screen, sprites.ball_trail, previous_previous_x, previous_previous_y, sampling)
+    if punch_effect_radius > 0:
+        punch = get_scaled_sprite("ball_punch", 2 * punch_effect_radius, 2 * punch_effect_radius)
+        blit_center(screen, punch, punch_effect_x, punch_effect_y, sampling)
+
+    player1_score, player2_score = state[SCORES : SCORES + 2]
+    if player1_score >= 10:
+        blit(screen, sprites.number[1], 14, 10, sampling)
+    blit(screen, sprites.number[player1_score % 10], 14 + 32, 10, sampling)
+    if player2_score >= 10:
+        blit(screen, sprites.number[1], 432 - 32 - 32 - 14, 10, sampling)
+    blit(screen, sprites.number[player2_score % 10], 432 - 32 - 32 - 14 + 32, 10, sampling)
+
+
+def render_batch(
+    render_states: NDArray[np.int32],
+    out: Optional[NDArray[np.uint8]] = None,
+    shape: Optional[Tuple[int, int]] = None,
+) -> NDArray[np.uint8]:
+    """Draw the matches of the render states
+
+    Args:
+        render_states (NDArray[np.int32]): (N, RENDER_STATE_SIZE) render states, see `raw_env.get_render_state`
+        out (NDArray[np.uint8], optional): (N, height, width, 3) array to draw into. A new array if not given.
+        shape (Tuple[int, int], optional): (height, width) of the pictures, sampled by `get_sampling`.
+            (304, 432) if not given.
+
+    Returns:
+        NDArray[np.uint8]: (N, height, width, 3) RGB pictures of the matches
+    """
+    render_states = np.asarray(render_states).reshape(-1, RENDER_STATE_SIZE)
+    screen_shape = SCREEN_SHAPE if shape is None else tuple(shape) + (3,)
+    if out is None:
+        out = np.empty((len(render_states),) + screen_shape, dtype=np.uint8)
+    sprites = get_sprites()
+
+    if screen_shape == SCREEN_SHAPE:
+        sampling = None
+        out[...] = sprites.background
+    else:
+        sampling = get_sampling(*screen_shape[:2])
+        out[...] = get_sampled_background(*screen_shape[:2])
+    for screen, render_state in zip(out, render_states):
+        clouds = render_state[CLOUDS_START:WAVES_START].reshape(NUM_OF_CLOUDS, len(CLOUD_RENDER_FIELDS)).tolist()
+        for x, y, width, height in clouds:
+            blit(screen, get_scaled_sprite("cloud", width, height), x, y, sampling)
+    if sampling is None:
+        draw_waves(out, render_states[:, WAVES_START:], sprites.wave)
+    else:
+        for screen, render_state in zip(out, render_states):
+            for i, y in enumerate(render_state[WAVES_START:].tolist()):
+                blit(screen, sprites.wave, 16 * i, y, sampling)
+    for screen, render_state in zip(out, render_states):
+        draw_dynamic_layers(screen, render_state, sprites, sampling)
+    return out
@@ -0,0 +1,112 @@
+"""
+Shared memory block and worker processes of `raw_async_vector_env` and `pikazoo.league.League`.
+
+The arrays exchanged with the workers are laid out one after another in one block of shared memory,
+described by a sequence of (name, shape, dtype). Every worker steps a shard of the matches and writes its
+results straight into the arrays, so only short commands and their replies go through the pipes.
+"""
+
+from typing import Callable, Dict, List, Sequence, Tuple
+import numpy as np
+from numpy.typing import NDArray
+
+# (name, shape, dtype) of every array in the shared memory block, in order
+SharedArraySpecs = Sequence[Tuple[str, Tuple[int, ...], np.dtype]]
+
+
+def get_shared_array_layout(arrays: SharedArraySpecs) -> Dict[str, Tuple[Tuple[int, ...], np.dtype, int]]:
+    """Shape, dtype and byte offset of every array in the shared memory block
+
+    Args:
+        arrays (SharedArraySpecs): (name, shape, dtype) of every array
+
+    Returns:
+        Dict[str, Tuple[Tuple[int, ...], np.dtype, int]]: name -> (shape, dtype, offset)
+    """
+    layout = {}
+    offset = 0
+    for name, shape, dtype in arrays:
+        layout[name] = (shape, dtype, offset)
+        # keep every array 8 byte aligned
+        offset += -(-int(np.prod(shape)) * dtype.itemsize // 8) * 8
+    return layout
+
+
+def get_shared_arrays(buffer, arrays: SharedArraySpecs) -> Dict[str, NDArray]:
+    """NumPy views of the arrays in the shared memory block"""
+    return {
+        name: np.frombuffer(buffer, dtype=dtype, count=int(np.prod(shape)), offset=offset).reshape(shape)
+        for name, (shape, dtype, offset) in get_shared_array_layout(arrays).items()
+    }
+
+
+def get_shared_buffer_size(arrays: SharedArraySpecs) -> int:
+    shape, dtype, offset = list(get_shared_array_layout(arrays).values())[-1]
+    return offset + int(np.prod(shape)) * dtype.itemsize
+
+
+def start_workers(ctx, target: Callable, buffer, num_envs: int, num_workers: int, *args) -> Tuple[List, List]:
+    """Start `num_workers` processes, each running `target(pipe, buffer, num_envs, start, stop, *args)`
+    for its shard [start, stop) of the matches
+
+    Returns:
+        Tuple[List, List]: The parent ends of the pipes and the processes, by worker
+    """
+    boundaries = np.linspace(0, num_envs, num_workers + 1).astype(int)
+    pipes: List = []
+    processes: List = []
+    for start, stop in zip(boundaries[:-1], boundaries[1:]):
+        parent_pipe, child_pipe = ctx.Pipe()
+        process = ctx.Process(
+            target=target,
+            args=(child_pipe, buffer, num_envs, int(start), int(stop), *args),
+            daemon=True,
+        )
+        process.start()
+        child_pipe.close()
+        pipes.append(parent_pipe)
+        processes.append(process)
+    return pipes, processes
+
+
+def wait_for_workers(pipes: List, close: Callable[[], None], name: str) -> list:
+    """Receive the reply of every worker to the last command.
+    If a worker failed, the replies of the other workers are still received before `close`,
+    so that none of them is left in a pipe to be taken for the reply to "close".
+
+    Args:
+        pipes (List): The parent ends of the pipes
+        close (Callable[[], None]): Called before raising if a worker failed
+        name (str): Name of the owner of the workers, for the error message
+
+    Returns:
+        list: The results of the workers
+    """
+    results = []
+    error = None
+    for pipe in pipes:
+        status, result = pipe.recv()
+        if status == "error" and error is None:
+            error = result
+        results.append(result)
+    if error is not None:
+        close()
+        raise RuntimeError(f"Worker of {name} failed:\n{error}")
+    return results
+
+
+def close_workers(pipes: List, processes: List):
+    """Let every worker close its env and exit, and wait for the processes.
+    Replies to earlier commands still in a pipe are skipped until the worker replies "closed".
+    """
+    for pipe in pipes:
+        try:
+            pipe.send(("close", None))
+            while pipe.recv()[0] != "closed":
+                pass
+        # the worker already exited, ex) after it failed
+        except (ConnectionError, EOFError):
+            pass
+        pipe.close()
+    for process in processes:
+        process.join()
@@ -0,0 +1,305 @@
+"""
+Struct-of-arrays version of the computer player in `physics.py`, usable as a policy for a batch of matches.
+
+`let_computer_decide_user_input` is the vectorized counterpart of the function with the same name in `physics.py`:
+given the same player, ball and other player, it gives, for every match, the same user input
+and the same `computer_where_to_stand_by` as the in-engine computer.
+The expected landing point of the ball is looked up with `LandingPointTable.lookup_batch`,
+and the landing points of the six power hit directions are simulated together for every match close to the ball.
+
+Random draws: the in-engine computer draws from the generator of its match, and so does this one.
+For every match, it makes the same calls in the same order as `let_computer_decide_user_input` of `physics.py`:
+
+* `integers(0, 20)` if the player does not need to move to the expected landing point,
+  followed by `integers(0, 2)` (the new `computer_where_to_stand_by`) if it is 0
+* `integers(0, 2)` (the order of the y directions of the power hit) if the player is jumping close to the ball
+
+`ComputerPolicy` turns the decisions into actions of `ACTION_KEY_MAP` for a batch of `VecPikaPhysics.state` columns.
+Played as an opponent from outside the engine, it differs from the in-engine computer in three ways:
+the engine decides after moving the ball of the frame (and player 2's computer after moving player 1),
+while a policy sees the state of the previous frame, and the power hit key of an action
+is ignored if it was already pressed in the previous step (the in-engine computer sets `power_hit` directly).
+"""
+
+from typing import Optional, Sequence
+import numpy as np
+from numpy.typing import NDArray
+
+from .physics import (
+    GROUND_WIDTH,
+    GROUND_HALF_WIDTH,
+    PLAYER_LENGTH,
+    PLAYER_HALF_LENGTH,
+    BALL_RADIUS,
+    BALL_TOUCHING_GROUND_Y_COORD,
+    NET_PILLAR_HALF_WIDTH,
+    NET_PILLAR_TOP_TOP_Y_COORD,
+    INFINITE_LOOP_LIMIT,
+    PikaPhysics,
+)
+from .vec_physics import PLAYER_FIELDS, BALL_FIELDS, NUM_STATE_ROWS, VecPlayers, VecBall, VecPikaUserInput
+from .landing_point_table import LandingPointTable
+
+SIDES = ("player_1", "player_2")
+
+# x and y direction of the power hits tried by `decide_whether_input_power_hit`, in order,
+# [0] if the first `integers(0, 2)` is 0 and [1] otherwise
+POWER_HIT_X_DIRECTIONS: NDArray[np.int32] = np.array([1, 1, 1, 0, 0, 0], dtype=np.int32)
+POWER_HIT_Y_DIRECTIONS: NDArray[np.int32] = np.array([[-1, 0, 1, -1, 0, 1], [1, 0, -1, 1, 0, -1]], dtype=np.int32)
+
+
+def _action_index_table() -> NDArray[np.int64]:
+    """[x_direction + 1, y_direction + 1, power_hit] -> action whose keys give this user input"""
+    from .pikazoo_env import ACTION_KEY_MAP
+
+    table = np.empty((3, 3, 2), dtype=np.int64)
+    for action, (left, right, up, down, power_hit) in enumerate(ACTION_KEY_MAP.tolist()):
+        x_direction = -1 if left else right
+        y_direction = -1 if up else down
+        table[x_direction + 1, y_direction + 1, power_hit] = action
+    return table
+
+
+def get_physics_state(physics: PikaPhysics) -> NDArray[np.int32]:
+    """Column of `VecPikaPhysics.state` holding the players and the ball of `physics`
+
+    Args:
+        physics (PikaPhysics): physics of a `raw_env`, ex) `env.physics`
+
+    Returns:
+        NDArray[np.int32]: (NUM_STATE_ROWS,) state, stack them with `np.stack(..., axis=1)` for a batch
+    """
+    state = np.empty(NUM_STATE_ROWS, dtype=np.int32)
+    for i, name in enumerate(PLAYER_FIELDS):
+        state[2 * i] = getattr(physics.player1, name)
+        state[2 * i + 1] = getattr(physics.player2, name)
+    for i, name in enumerate(BALL_FIELDS):
+        state[2 * len(PLAYER_FIELDS) + i] = getattr(physics.ball, name)
+    return state
+
+
+def simulate_power_hit_landing_point_x(
+    user_input_x_direction: NDArray[np.int32],
+    user_input_y_direction: NDArray[np.int32],
+    x: NDArray[np.int32],
+    y: NDArray[np.int32],
+    y_velocity: NDArray[np.int32],
+) -> NDArray[np.int32]:
+    """`simulate_power_hit_landing_point_x` of `physics.py` for arrays of the same shape.
+    The flights are simulated together, and a flight is dropped from the arrays in the frame it lands.
+
+    Returns:
+        NDArray[np.int32]: x coord of expected landing point when power hit the ball
+    """
+    shape = np.shape(x)
+    x = np.asarray(x, dtype=np.int32).reshape(-1)
+    y = np.asarray(y, dtype=np.int32).reshape(-1)
+    x_velocity = np.where(x < GROUND_HALF_WIDTH, 10, -10) * (np.abs(np.reshape(user_input_x_direction, -1)) + 1)
+    y_velocity = np.abs(np.reshape(y_velocity, -1)) * np.reshape(user_input_y_direction, -1) * 2
+    landing_point_x = np.empty(x.size, dtype=np.int32)
+    # indices of the flights which did not land yet
+    index = np.arange(x.size)
+
+    loop_counter = 0
+    while index.size > 0:
+        loop_counter += 1
+
+        future_x = x + x_velocity
+        x_velocity = np.where((future_x < BALL_RADIUS) | (future_x > GROUND_WIDTH), -x_velocity, x_velocity)
+        y_velocity = np.where(y + y_velocity < 0, 1, y_velocity)
+        is_near_net = (np.abs(x - GROUND_HALF_WIDTH) < NET_PILLAR_HALF_WIDTH) & (y > NET_PILLAR_TOP_TOP_Y_COORD)
+        y_velocity = np.where(is_near_net & (y_velocity > 0), -y_velocity, y_velocity)
+
+        y = y + y_velocity
+        if loop_counter >= INFINITE_LOOP_LIMIT:
+            landing_point_x[index] = x
+            break
+        is_landing = y > BALL_TOUCHING_GROUND_Y_COORD
+        landing_point_x[index[is_landing]] = x[is_landing]
+        is_flying = ~is_landing
+        index, x, y, x_velocity, y_velocity = (
+            index[is_flying],
+            x[is_flying],
+            y[is_flying],
+            x_velocity[is_flying],
+            y_velocity[is_flying],
+        )
+        x = x + x_velocity
+        y_velocity = y_velocity + 1
+    return landing_point_x.reshape(shape)
+
+
+def let_computer_decide_user_input(
+    player: VecPlayers,
+    ball: VecBall,
+    side: int,
+    user_input: VecPikaUserInput,
+    np_randoms: Sequence[np.random.Generator],
+):
+    """Computer decides the user input of the player of `side` in every match,
+    and writes it to row `side` of `user_input`. `player.computer_where_to_stand_by[side]` is updated in place.
+
+    Args:
+        player (VecPlayers): players, `ball.expected_landing_point_x` must be up to date
+        ball (VecBall): balls
+        side (int): 0 for player 1, 1 for player 2
+        user_input (VecPikaUserInput): user input of both players of every match
+        np_randoms (Sequence[np.random.Generator]): The generator of each match, see the module docstring
+    """
+    x = player.x[side]
+    state = player.state[side]
+    boldness = player.computer_boldness[side]
+    where_to_stand_by = player.computer_where_to_stand_by[side]
+    the_other_player_x = player.x[1 - side]
+    expected_landing_point_x = ball.expected_landing_point_x
+    ball_distance = np.abs(ball.x - x)
+
+    left_boundary = side * GROUND_HALF_WIDTH
+    right_boundary = (side + 1) * GROUND_HALF_WIDTH
+    is_landing_on_other_side = (expected_landing_point_x <= left_boundary) | (
+        expected_landing_point_x >= side * GROUND_WIDTH + GROUND_HALF_WIDTH
+    )
+
+    # If conditions below met, the computer estimates the proper location to stay as the middle point of their side
+    is_standing_by_middle = (
+        (ball_distance > 100)
+        & (np.abs(ball.x_velocity) < boldness + 5)
+        & is_landing_on_other_side
+        & (where_to_stand_by == 0)
+    )
+    virtual_expected_landing_point_x = np.where(
+        is_standing_by_middle, left_boundary + GROUND_HALF_WIDTH // 2, expected_landing_point_x
+    )
+    is_moving = np.abs(virtual_expected_landing_point_x - x) > boldness + 8
+    x_direction = np.where(is_moving, np.where(x < virtual_expected_landing_point_x, 1, -1), 0)
+    y_direction = np.zeros_like(x_direction)
+    power_hit = np.zeros_like(x_direction)
+
+    toward_ball = np.where(x < ball.x, 1, -1)
+    is_normal = state == 0
+    is_jumping = is_normal & (
+        (np.abs(ball.x_velocity) < boldness + 3)
+        & (ball_distance < PLAYER_HALF_LENGTH)
+        & (ball.y > -36)
+        & (ball.y < 10 * boldness + 84)
+        & (ball.y_velocity > 0)
+    )
+    y_direction[is_jumping] = -1
+    # If conditions below met, the computer decides to dive!
+    is_diving = is_normal & (
+        (expected_landing_point_x > left_boundary)
+        & (expected_landing_point_x < right_boundary)
+        & (ball_distance > boldness * 5 + PLAYER_LENGTH)
+        & (ball.x > left_boundary)
+        & (ball.x < right_boundary)
+        & (ball.y > 174)
+    )
+    power_hit[is_diving] = 1
+    x_direction = np.where(is_diving, toward_ball, x_direction)
+
+    is_in_air = (state == 1) | (state == 2)
+    x_direction = np.where(is_in_air & (ball_distance > 8), toward_ball, x_direction)
+    is_near_ball = is_in_air & (ball_distance < 48) & (np.abs(ball.y - player.y[side]) < 48)
+
+    # random draws, for each match in the order of the in-engine computer
+    for n in np.flatnonzero(~is_moving):
+        if np_randoms[n].integers(0, 20) == 0:
+            where_to_stand_by[n] = np_randoms[n].integers(0, 2)
+    env_indices = np.flatnonzero(is_near_ball)
+    order = np.array([np_randoms[n].integers(0, 2) != 0 for n in env_indices], dtype=np.intp)
+
+    if env_indices.size > 0:
+        # `decide_whether_input_power_hit`, the six directions of each match in the order they are tried
+        candidate_x_directions = np.broadcast_to(POWER_HIT_X_DIRECTIONS, (env_indices.size, 6))
+        candidate_y_directions = POWER_HIT_Y_DIRECTIONS[order]
+        column = env_indices[:, np.newaxis]
+        landing_point_x = simulate_power_hit_landing_point_x(
+            candidate_x_directions,
+            candidate_y_directions,
+            np.broadcast_to(ball.x[column], candidate_x_directions.shape),
+            np.broadcast_to(ball.y[column], candidate_x_directions.shape),
+            np.broadcast_to(ball.y_velocity[column], candidate_x_directions.shape),
+        )
+        is_good = (
+            (landing_point_x <= left_boundary) | (landing_point_x >= side * GROUND_WIDTH + GROUND_HALF_WIDTH)
+        ) & (np.abs(landing_point_x - the_other_player_x[column]) > PLAYER_LENGTH)
+        will_power_hit = is_good.any(axis=1)
+        first = is_good.argmax(axis=1)[will_power_hit]
+        env_indices = env_indices[will_power_hit]
+        x_direction[env_indices] = candidate_x_directions[will_power_hit, first]
+        y_direction[env_indices] = candidate_y_directions[will_power_hit, first]
+        power_hit[env_indices] = 1
+        is_close = np.abs(the_other_player_x[env_indices] - x[env_indices]) < 80
+        y_direction[env_indices[is_close]] = -1
+
+    user_input.x_direction[side] = x_direction
+    user_input.y_direction[side] = y_direction
+    user_input.power_hit[side] = power_hit
+
+
+class ComputerPolicy:
+    """The computer of the original game as a policy mapping a batch of match states to a batch of actions.
+
+    The states are columns of `VecPikaPhysics.state` (`raw_vector_env.physics.state`,
+    or `get_physics_state(env.physics)` of `raw_env`s stacked with `np.stack(..., axis=1)`).
+    The policy copies them, so they are not changed.
+    `computer_where_to_stand_by`, the only memory of the computer, is kept by the policy for each match
+    and should be cleared by `reset` when a match starts again.
+    """
+
+    def __init__(
+        self,
+        num_envs: int,
+        side: str = "player_2",
+        landing_point_table: Optional[LandingPointTable] = None,
+    ) -> None:
+        """
+        Args:
+            num_envs (int): Number of matches
+            side (str): player_1 / player_2, the player controlled by the policy
+            landing_point_table (LandingPointTable, optional): Table of the expected landing points, built if not given
+        """
+        assert side in SIDES
+        self.num_envs = num_envs
+        self.side: int = SIDES.index(side)
+        self.landing_point_table = landing_point_table if landing_point_table is not None else LandingPointTable.build()
+        self.where_to_stand_by: NDArray[np.int32] = np.zeros(num_envs, dtype=np.int32)
+        # user input of the last `__call__`, row `side`
+        self.user_input = VecPikaUserInput(num_envs)
+
+        self._state = np.empty((NUM_STATE_ROWS, num_envs), dtype=np.int32)
+        num_player_rows = 2 * len(PLAYER_FIELDS)
+        self._player = VecPlayers(self._state[:num_player_rows].reshape(len(PLAYER_FIELDS), 2, num_envs))
+        self._ball = VecBall(self._state[num_player_rows:])
+        self._action_index = _action_index_table()
+
+    def reset(self, env_indices: Optional[NDArray[np.intp]] = None):
+        """Clear `computer_where_to_stand_by` of the given matches (all if not given), as a new `Player` does"""
+        if env_indices is None:
+            self.where_to_stand_by[...] = 0
+        else:
+            self.where_to_stand_by[env_indices] = 0
+
+    def __call__(self, state: NDArray[np.int32], np_randoms: Sequence[np.random.Generator]) -> NDArray[np.int64]:
+        """Actions of the computer in every match
+
+        Args:
+            state (NDArray[np.int32]): (NUM_STATE_ROWS, N) states of the matches
+            np_randoms (Sequence[np.random.Generator]): The generator of each match, see the module docstring
+
+        Returns:
+            NDArray[np.int64]: (N,) actions, indices of `ACTION_KEY_MAP`
+        """
+        assert state.shape == self._state.shape and len(np_randoms) == self.num_envs
+        np.copyto(self._state, state)
+        player, ball, side = self._player, self._ball, self.side
+        ball.expected_landing_point_x[...] = self.landing_point_table.lookup_batch(
+            ball.x, ball.y, ball.x_velocity, ball.y_velocity
+        )
+        player.computer_where_to_stand_by[side] = self.where_to_stand_by
+        let_computer_decide_user_input(player, ball, side, self.user_input, np_randoms)
+        self.where_to_stand_by[...] = player.computer_where_to_stand_by[side]
+        user_input = self.user_input
+        return self._action_index[
+            user_input.x_direction[side] + 1, user_input.y_direction[side] + 1, user_input.power_hit[side]
+        ]
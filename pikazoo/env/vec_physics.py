@@ -0,0 +1,499 @@
+"""
+Struct-of-arrays version of the physics engine in `physics.py`.
+
+The state of N matches is held in NumPy int arrays and every match is advanced at once.
+Each function below is the vectorized counterpart of the function with the same name in `physics.py`,
+and gives, for every match, the same result as the object engine frame for frame
+as long as the inputs and the random draws are the same.
+
+Player fields are (2, N) arrays, where row 0 is player 1 (left) and row 1 is player 2 (right).
+Ball fields are (N,) arrays. Boolean fields are stored as 0 or 1.
+"""
+
+from typing import List, Sequence
+import numpy as np
+from numpy.typing import NDArray
+
+from .physics import (
+    GROUND_WIDTH,
+    GROUND_HALF_WIDTH,
+    PLAYER_HALF_LENGTH,
+    PLAYER_TOUCHING_GROUND_Y_COORD,
+    BALL_RADIUS,
+    BALL_TOUCHING_GROUND_Y_COORD,
+    NET_PILLAR_HALF_WIDTH,
+    NET_PILLAR_TOP_TOP_Y_COORD,
+    NET_PILLAR_TOP_BOTTOM_Y_COORD,
+)
+
+PLAYER_FIELDS = (
+    "x",
+    "y",
+    "y_velocity",
+    "is_collision_with_ball_happened",
+    "state",
+    "frame_number",
+    "normal_status_arm_swing_direction",
+    "delay_before_next_frame",
+    "computer_boldness",
+    "diving_direction",
+    "lying_down_duration_left",
+    "is_winner",
+    "game_ended",
+    "computer_where_to_stand_by",
+)
+
+BALL_FIELDS = (
+    "x",
+    "y",
+    "x_velocity",
+    "y_velocity",
+    "punch_effect_radius",
+    "is_power_hit",
+    "expected_landing_point_x",
+    "rotation",
+    "fine_rotation",
+    "punch_effect_x",
+    "punch_effect_y",
+    "previous_x",
+    "previous_previous_x",
+    "previous_y",
+    "previous_previous_y",
+)
+
+USER_INPUT_FIELDS = (
+    "x_direction",
+    "y_direction",
+    "power_hit",
+    "power_hit_key_is_down_previous",
+)
+
+# number of rows of `VecPikaPhysics.state`
+NUM_STATE_ROWS: int = 2 * len(PLAYER_FIELDS) + len(BALL_FIELDS)
+
+# x-direction world boundary of player 1 (row 0) and player 2 (row 1)
+PLAYER_X_MIN: NDArray[np.int32] = np.array([[PLAYER_HALF_LENGTH], [GROUND_HALF_WIDTH + PLAYER_HALF_LENGTH]], np.int32)
+PLAYER_X_MAX: NDArray[np.int32] = np.array(
+    [[GROUND_HALF_WIDTH - PLAYER_HALF_LENGTH], [GROUND_WIDTH - PLAYER_HALF_LENGTH]], np.int32
+)
+# x coord of players at the start of a round
+PLAYER_INITIAL_X: NDArray[np.int32] = np.array([[36], [GROUND_WIDTH - 36]], np.int32)
+
+
+class VecPikaUserInput:
+    """
+    Vectorized `PikaUserInput` of N matches.
+    Every field is a (2, N) int32 array, row 0 for player 1 and row 1 for player 2.
+    """
+
+    __slots__ = USER_INPUT_FIELDS + ("num_envs",)
+
+    def __init__(self, num_envs: int) -> None:
+        self.num_envs = num_envs
+        # 0: no horizontal-direction input, -1: left-direction input, 1: right-direction input
+        self.x_direction: NDArray[np.int32] = np.zeros((2, num_envs), dtype=np.int32)
+        # 0: no vertical-direction input, -1: up-direction input, 1: down-direction input
+        self.y_direction: NDArray[np.int32] = np.zeros((2, num_envs), dtype=np.int32)
+        # 0: auto-repeated or no power hit input, 1: not auto-repeated power hit input
+        self.power_hit: NDArray[np.int32] = np.zeros((2, num_envs), dtype=np.int32)
+        self.power_hit_key_is_down_previous: NDArray[np.int32] = np.zeros((2, num_envs), dtype=np.int32)
+
+    def get_input(self, keys: NDArray[np.uint8]) -> None:
+        """
+        Same as `PikaUserInput.get_input` for every match.
+
+        Args:
+            keys (NDArray[np.uint8]): (2, N, 5) array, whether each key is pressed. [left, right, up, down, powerHit]
+        """
+        left_key = keys[..., 0] != 0
+        right_key = keys[..., 1] != 0
+        up_key = keys[..., 2] != 0
+        down_key = keys[..., 3] != 0
+        is_down = keys[..., 4] != 0
+
+        self.x_direction[...] = np.where(left_key, -1, right_key)
+        self.y_direction[...] = np.where(up_key, -1, down_key)
+        self.power_hit[...] = is_down & (self.power_hit_key_is_down_previous == 0)
+        self.power_hit_key_is_down_previous[...] = is_down
+
+
+class VecPlayers:
+    """
+    Players of N matches. Every field of `Player` is a (2, N) view into `VecPikaPhysics.state`,
+    row 0 for player 1 and row 1 for player 2.
+    """
+
+    __slots__ = PLAYER_FIELDS
+
+    def __init__(self, block: NDArray[np.int32]) -> None:
+        """
+        Args:
+            block (NDArray[np.int32]): (len(PLAYER_FIELDS), 2, N) array holding the players' state
+        """
+        for i, name in enumerate(PLAYER_FIELDS):
+            setattr(self, name, block[i])
+
+    def initialize_for_new_round(self, env_indices: NDArray[np.intp], np_randoms: Sequence[np.random.Generator]):
+        """Same as `Player.initialize_for_new_round` for both players of the given matches.
+        For each match, player 1 draws its boldness before player 2.
+
+        Args:
+            env_indices (NDArray[np.intp]): indices of the matches to initialize
+            np_randoms (Sequence[np.random.Generator]): The environment-dependent np.random.generator of each match
+        """
+        self.x[:, env_indices] = PLAYER_INITIAL_X
+        self.y[:, env_indices] = PLAYER_TOUCHING_GROUND_Y_COORD
+        self.y_velocity[:, env_indices] = 0
+        self.is_collision_with_ball_happened[:, env_indices] = 0
+        self.state[:, env_indices] = 0
+        self.frame_number[:, env_indices] = 0
+        self.normal_status_arm_swing_direction[:, env_indices] = 1
+        self.delay_before_next_frame[:, env_indices] = 0
+        for n in env_indices:
+            self.computer_boldness[0, n] = np_randoms[n].integers(0, 5)
+            self.computer_boldness[1, n] = np_randoms[n].integers(0, 5)
+
+
+class VecBall:
+    """Balls of N matches. Every field of `Ball` is a (N,) view into `VecPikaPhysics.state`."""
+
+    __slots__ = BALL_FIELDS
+
+    def __init__(self, block: NDArray[np.int32]) -> None:
+        """
+        Args:
+            block (NDArray[np.int32]): (len(BALL_FIELDS), N) array holding the balls' state
+        """
+        for i, name in enumerate(BALL_FIELDS):
+            setattr(self, name, block[i])
+
+    def initialize_for_new_round(self, env_indices: NDArray[np.intp], is_player2_serve: NDArray[np.bool_]):
+        """Same as `Ball.initialize_for_new_round` for the given matches.
+
+        Args:
+            env_indices (NDArray[np.intp]): indices of the matches to initialize
+            is_player2_serve (NDArray[np.bool_]): will player on the right side serve on this new round?
+        """
+        self.x[env_indices] = np.where(is_player2_serve, GROUND_WIDTH - 56, 56)
+        self.y[env_indices] = 0
+        self.x_velocity[env_indices] = 0
+        self.y_velocity[env_indices] = 1
+        self.punch_effect_radius[env_indices] = 0
+        self.is_power_hit[env_indices] = 0
+
+
+class VecPikaPhysics:
+    """Vectorized `PikaPhysics` holding the players and balls of N matches in one int32 array.
+
+    `state` is a (NUM_STATE_ROWS, N) array: the player fields (player 1 and player 2 rows interleaved)
+    followed by the ball fields, so that column n is the whole physics state of match n.
+    `player` and `ball` expose the rows under the attribute names of `Player` and `Ball`.
+    """
+
+    def __init__(self, num_envs: int, np_randoms: Sequence[np.random.Generator]) -> None:
+        """Create physics packs of N matches
+
+        Args:
+            num_envs (int): Number of matches
+            np_randoms (Sequence[np.random.Generator]): The environment-dependent np.random.generator of each match
+        """
+        assert len(np_randoms) == num_envs
+        self.num_envs = num_envs
+        self.np_randoms: List[np.random.Generator] = list(np_randoms)
+
+        self.state: NDArray[np.int32] = np.zeros((NUM_STATE_ROWS, num_envs), dtype=np.int32)
+        num_player_rows = 2 * len(PLAYER_FIELDS)
+        self.player = VecPlayers(self.state[:num_player_rows].reshape(len(PLAYER_FIELDS), 2, num_envs))
+        self.ball = VecBall(self.state[num_player_rows:])
+
+        # same as `PikaPhysics.__init__`
+        all_envs = np.arange(num_envs)
+        self.player.initialize_for_new_round(all_envs, self.np_randoms)
+        self.player.diving_direction[...] = 0
+        self.player.lying_down_duration_left[...] = -1
+        self.player.is_winner[...] = 0
+        self.player.game_ended[...] = 0
+        self.player.computer_where_to_stand_by[...] = 0
+        self.ball.initialize_for_new_round(all_envs, np.zeros(num_envs, dtype=bool))
+
+    def run_engine_for_next_frame(self, user_input: VecPikaUserInput) -> NDArray[np.bool_]:
+        """run `physics_engine` function for every match
+
+        Args:
+            user_input (VecPikaUserInput): user input of both players of every match
+
+        Returns:
+            NDArray[np.bool_]: (N,) Is ball touching ground?
+        """
+        return physics_engine(self.player, self.ball, user_input, self.np_randoms)
+
+
+def physics_engine(
+    player: VecPlayers,
+    ball: VecBall,
+    user_input: VecPikaUserInput,
+    np_randoms: Sequence[np.random.Generator],
+) -> NDArray[np.bool_]:
+    """Vectorized Pikachu Volleyball physics engine.
+    The players of a match do not depend on each other while moving,
+    so both rows are moved at once. Ball and player collisions are processed player 1 first, as in the object engine.
+
+    Args:
+        player (VecPlayers): players
+        ball (VecBall): balls
+        user_input (VecPikaUserInput): user input of both players
+        np_randoms (Sequence[np.random.Generator]): The environment-dependent np.random.generator of each match
+
+    Returns:
+        NDArray[np.bool_]: (N,) Is ball touching ground?
+    """
+    is_ball_touching_ground = process_collision_between_ball_and_world_and_set_ball_position(ball)
+
+    process_player_movement_and_set_player_position(player, user_input)
+
+    for i in range(2):
+        is_happened = is_collision_between_ball_and_player_happened(ball, player.x[i], player.y[i])
+        is_new_collision = is_happened & (player.is_collision_with_ball_happened[i] == 0)
+        if is_new_collision.any():
+            process_collision_between_ball_and_player(
+                ball,
+                player.x[i],
+                user_input.x_direction[i],
+                user_input.y_direction[i],
+                player.state[i],
+                is_new_collision,
+                np_randoms,
+            )
+        player.is_collision_with_ball_happened[i] = is_happened
+
+    return is_ball_touching_ground
+
+
+def is_collision_between_ball_and_player_happened(
+    ball: VecBall, player_x: NDArray[np.int32], player_y: NDArray[np.int32]
+) -> NDArray[np.bool_]:
+    """Is collision between ball and player happened?
+
+    Args:
+        ball (VecBall): balls
+        player_x (NDArray[np.int32]): (N,) player.x
+        player_y (NDArray[np.int32]): (N,) player.y
+
+    Returns:
+        NDArray[np.bool_]: (N,)
+    """
+    return (np.abs(ball.x - player_x) <= PLAYER_HALF_LENGTH) & (np.abs(ball.y - player_y) <= PLAYER_HALF_LENGTH)
+
+
+def process_collision_between_ball_and_world_and_set_ball_position(ball: VecBall) -> NDArray[np.bool_]:
+    """Process collision between ball and world and set ball position
+
+    Args:
+        ball (VecBall): balls
+
+    Returns:
+        NDArray[np.bool_]: (N,) Is ball touching ground?
+    """
+    ball.previous_previous_x[...] = ball.previous_x
+    ball.previous_previous_y[...] = ball.previous_y
+    ball.previous_x[...] = ball.x
+    ball.previous_y[...] = ball.y
+
+    future_fine_rotation = ball.fine_rotation + ball.x_velocity // 2
+    future_fine_rotation += np.where(future_fine_rotation < 0, 50, np.where(future_fine_rotation > 50, -50, 0))
+    ball.fine_rotation[...] = future_fine_rotation
+    ball.rotation[...] = future_fine_rotation // 10
+
+    future_ball_x = ball.x + ball.x_velocity
+    # If the center of ball would get out of left world bound or right world bound, bounce back.
+    np.negative(
+        ball.x_velocity, out=ball.x_velocity, where=(future_ball_x < BALL_RADIUS) | (future_ball_x > GROUND_WIDTH)
+    )
+
+    # if the center of ball would get out of upper world bound
+    ball.y_velocity[ball.y + ball.y_velocity < 0] = 1
+
+    is_touching_net = (np.abs(ball.x - GROUND_HALF_WIDTH) < NET_PILLAR_HALF_WIDTH) & (
+        ball.y > NET_PILLAR_TOP_TOP_Y_COORD
+    )
+    is_touching_net_top = is_touching_net & (ball.y <= NET_PILLAR_TOP_BOTTOM_Y_COORD)
+    np.negative(ball.y_velocity, out=ball.y_velocity, where=is_touching_net_top & (ball.y_velocity > 0))
+    abs_x_velocity = np.abs(ball.x_velocity)
+    np.copyto(
+        ball.x_velocity,
+        np.where(ball.x < GROUND_HALF_WIDTH, -abs_x_velocity, abs_x_velocity),
+        where=is_touching_net & ~is_touching_net_top,
+    )
+
+    future_ball_y = ball.y + ball.y_velocity
+    # if ball would touch ground
+    is_ball_touching_ground = future_ball_y > BALL_TOUCHING_GROUND_Y_COORD
+    is_flying = ~is_ball_touching_ground
+
+    np.negative(ball.y_velocity, out=ball.y_velocity, where=is_ball_touching_ground)
+    np.copyto(ball.punch_effect_x, ball.x, where=is_ball_touching_ground)
+    ball.y[is_ball_touching_ground] = BALL_TOUCHING_GROUND_Y_COORD
+    ball.punch_effect_radius[is_ball_touching_ground] = BALL_RADIUS
+    ball.punch_effect_y[is_ball_touching_ground] = BALL_TOUCHING_GROUND_Y_COORD + BALL_RADIUS
+
+    np.copyto(ball.y, future_ball_y, where=is_flying)
+    np.add(ball.x, ball.x_velocity, out=ball.x, where=is_flying)
+    np.add(ball.y_velocity, 1, out=ball.y_velocity, where=is_flying)
+
+    return is_ball_touching_ground
+
+
+def process_player_movement_and_set_player_position(player: VecPlayers, user_input: VecPikaUserInput) -> None:
+    """Process player movement according to user input and set player position, for both players at once
+
+    Args:
+        player (VecPlayers): players
+        user_input (VecPikaUserInput): user input of both players
+    """
+    state = player.state
+    frame_number = player.frame_number
+    delay_before_next_frame = player.delay_before_next_frame
+
+    # if player is lying down.. don't move
+    is_lying_down = state == 4
+    player.lying_down_duration_left[is_lying_down] -= 1
+    state[is_lying_down & (player.lying_down_duration_left < -1)] = 0
+    is_moving = ~is_lying_down
+
+    # process x-direction movement and x-direction world boundary
+    player_velocity_x = np.where(
+        state < 3,
+        user_input.x_direction * 6,
+        np.where(state == 3, player.diving_direction * 8, 0),
+    )
+    np.copyto(player.x, np.clip(player.x + player_velocity_x, PLAYER_X_MIN, PLAYER_X_MAX), where=is_moving)
+
+    # jump
+    is_jumping = is_moving & (state < 3) & (user_input.y_direction == -1) & (player.y == PLAYER_TOUCHING_GROUND_Y_COORD)
+    player.y_velocity[is_jumping] = -16
+    state[is_jumping] = 1
+    frame_number[is_jumping] = 0
+
+    # gravity
+    future_player_y = player.y + player.y_velocity
+    np.copyto(player.y, future_player_y, where=is_moving)
+    player.y_velocity[is_moving & (future_player_y < PLAYER_TOUCHING_GROUND_Y_COORD)] += 1
+    # if player is landing..
+    is_landing = is_moving & (future_player_y > PLAYER_TOUCHING_GROUND_Y_COORD)
+    is_landing_from_diving = is_landing & (state == 3)
+    player.y_velocity[is_landing] = 0
+    player.y[is_landing] = PLAYER_TOUCHING_GROUND_Y_COORD
+    frame_number[is_landing] = 0
+    state[is_landing] = 0
+    state[is_landing_from_diving] = 4
+    player.lying_down_duration_left[is_landing_from_diving] = 3
+
+    is_power_hit_input = is_moving & (user_input.power_hit == 1)
+    # if player is jumping, then player do power hit
+    is_power_hitting = is_power_hit_input & (state == 1)
+    # then player do diving!
+    is_diving = is_power_hit_input & (state == 0) & (user_input.x_direction != 0)
+    delay_before_next_frame[is_power_hitting] = 5
+    frame_number[is_power_hitting] = 0
+    state[is_power_hitting] = 2
+    state[is_diving] = 3
+    frame_number[is_diving] = 0
+    np.copyto(player.diving_direction, user_input.x_direction, where=is_diving)
+    player.y_velocity[is_diving] = -5
+
+    in_state_1 = is_moving & (state == 1)
+    in_state_2 = is_moving & (state == 2)
+    in_state_0 = is_moving & (state == 0)
+
+    frame_number[in_state_1] = (frame_number[in_state_1] + 1) % 3
+
+    is_next_frame = in_state_2 & (delay_before_next_frame < 1)
+    frame_number[is_next_frame] += 1
+    is_power_hit_ended = is_next_frame & (frame_number > 4)
+    frame_number[is_power_hit_ended] = 0
+    state[is_power_hit_ended] = 1
+    delay_before_next_frame[in_state_2 & ~is_next_frame] -= 1
+
+    delay_before_next_frame[in_state_0] += 1
+    is_arm_swinging = in_state_0 & (delay_before_next_frame > 3)
+    delay_before_next_frame[is_arm_swinging] = 0
+    future_frame_number = frame_number + player.normal_status_arm_swing_direction
+    np.negative(
+        player.normal_status_arm_swing_direction,
+        out=player.normal_status_arm_swing_direction,
+        where=is_arm_swinging & ((future_frame_number < 0) | (future_frame_number > 4)),
+    )
+    np.add(frame_number, player.normal_status_arm_swing_direction, out=frame_number, where=is_arm_swinging)
+
+    is_game_ended = is_moving & (player.game_ended != 0)
+    is_game_end_motion_started = is_game_ended & (state == 0)
+    np.copyto(state, np.where(player.is_winner != 0, 5, 6), where=is_game_end_motion_started)
+    delay_before_next_frame[is_game_end_motion_started] = 0
+    frame_number[is_game_end_motion_started] = 0
+
+    process_game_end_frame_for(player, is_game_ended)
+
+
+def process_game_end_frame_for(player: VecPlayers, is_game_ended: NDArray[np.bool_]) -> None:
+    """Process game end frame (for winner and loser motions) for the given players
+
+    Args:
+        player (VecPlayers): players
+        is_game_ended (NDArray[np.bool_]): (2, N) players to process
+    """
+    is_in_motion = is_game_ended & (player.frame_number < 4)
+    player.delay_before_next_frame[is_in_motion] += 1
+    is_next_frame = is_in_motion & (player.delay_before_next_frame > 4)
+    player.delay_before_next_frame[is_next_frame] = 0
+    player.frame_number[is_next_frame] += 1
+
+
+def process_collision_between_ball_and_player(
+    ball: VecBall,
+    player_x: NDArray[np.int32],
+    user_input_x_direction: NDArray[np.int32],
+    user_input_y_direction: NDArray[np.int32],
+    player_state: NDArray[np.int32],
+    is_collision: NDArray[np.bool_],
+    np_randoms: Sequence[np.random.Generator],
+) -> None:
+    """Process collision between ball and player for the matches in `is_collision`.
+    This function only sets velocity of ball.
+
+    Args:
+        ball (VecBall): balls
+        player_x (NDArray[np.int32]): (N,) player.x
+        user_input_x_direction (NDArray[np.int32]): (N,) user_input.x_direction
+        user_input_y_direction (NDArray[np.int32]): (N,) user_input.y_direction
+        player_state (NDArray[np.int32]): (N,) player.state
+        is_collision (NDArray[np.bool_]): (N,) matches where the collision happened
+        np_randoms (Sequence[np.random.Generator]): The environment-dependent np.random.generator of each match
+    """
+    # greater the x position difference between pika and ball, greater the x velocity of the ball
+    diff = ball.x - player_x
+    np.copyto(
+        ball.x_velocity,
+        np.where(diff < 0, -(np.abs(diff) // 3), np.where(diff > 0, diff // 3, ball.x_velocity)),
+        where=is_collision,
+    )
+
+    # If ball velocity x is 0, randomly choose one of -1, 0, 1.
+    for n in np.flatnonzero(is_collision & (ball.x_velocity == 0)):
+        ball.x_velocity[n] = np_randoms[n].integers(0, 3) - 1
+
+    ball_abs_y_velocity = np.abs(ball.y_velocity)
+    np.copyto(ball.y_velocity, np.where(ball_abs_y_velocity < 15, -15, -ball_abs_y_velocity), where=is_collision)
+
+    # player is jumping and power hitting
+    is_power_hit = is_collision & (player_state == 2)
+    power_hit_x_velocity = (np.abs(user_input_x_direction) + 1) * 10
+    np.copyto(
+        ball.x_velocity,
+        np.where(ball.x < GROUND_HALF_WIDTH, power_hit_x_velocity, -power_hit_x_velocity),
+        where=is_power_hit,
+    )
+    np.copyto(ball.punch_effect_x, ball.x, where=is_power_hit)
+    np.copyto(ball.punch_effect_y, ball.y, where=is_power_hit)
+    np.copyto(ball.y_velocity, np.abs(ball.y_velocity) * user_input_y_direction * 2, where=is_power_hit)
+    ball.punch_effect_radius[is_power_hit] = BALL_RADIUS
+    np.copyto(ball.is_power_hit, is_power_hit, where=is_collision)
@@ -0,0 +1,301 @@
+"""
+Self-play league: matches of the learner against a pool of past snapshots of itself.
+
+`OpponentPool` holds the snapshots and the results of the learner against each of them,
+and samples opponents with weights `(1 - win rate of the learner) ** exponent`
+(prioritized fictitious self-play, uniform if `exponent` is 0).
+
+`League` plays `num_envs` matches in worker processes, each stepping a shard of the matches with a `raw_vector_env`
+and evaluating the opponents of its matches itself, one `policy(params, observations)` call per distinct opponent.
+As `raw_async_vector_env`, the actions of the learner, its observations, rewards and terminations
+go through shared memory, so a step only sends short commands through the pipes.
+The parameters of a snapshot are sent to every worker once, when it is added to the pool.
+
+When a match ends, its worker sends back a `MatchResult`, the pool records it,
+and a new opponent is sampled for the slot, which was reset by `raw_vector_env` in the same step.
+
+    league = League(policy, num_envs=256)
+    league.add_opponent(params)
+    observations, infos = league.reset(seed=0)
+    observations, rewards, terminations, truncations, infos = league.step(actions)  # infos["results"]
+"""
+
+import multiprocessing
+import os
+import traceback
+from typing import Any, Callable, List, NamedTuple, Optional
+import numpy as np
+from numpy.typing import NDArray
+from pikazoo.env.shared_memory import (
+    SharedArraySpecs,
+    get_shared_arrays,
+    get_shared_buffer_size,
+    start_workers,
+    wait_for_workers,
+    close_workers,
+)
+
+SIDES = ("player_1", "player_2")
+
+
+class MatchResult(NamedTuple):
+    """Result of a finished match of the league"""
+
+    slot: int
+    opponent_id: int
+    # scores of the learner and the opponent
+    score: int
+    opponent_score: int
+
+    @property
+    def is_win(self) -> bool:
+        return self.score > self.opponent_score
+
+
+class OpponentPool:
+    """Snapshots of the learner, and the number of matches and wins of the learner against each of them"""
+
+    def __init__(self, exponent: float = 1.0) -> None:
+        """
+        Args:
+            exponent (float): Sampling weight of a snapshot is `(1 - win rate of the learner) ** exponent`.
+                The higher, the more the snapshots the learner loses to are played. 0 for uniform sampling.
+        """
+        assert exponent >= 0
+        self.exponent = exponent
+        self.params: List[Any] = []
+        self.games: NDArray[np.int64] = np.zeros(0, dtype=np.int64)
+        self.wins: NDArray[np.int64] = np.zeros(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.params)
+
+    def add(self, params: Any) -> int:
+        """Add a snapshot, returns its id"""
+        self.params.append(params)
+        self.games = np.append(self.games, 0)
+        self.wins = np.append(self.wins, 0)
+        return len(self.params) - 1
+
+    def record(self, opponent_id: int, is_win: bool):
+        """Record a match of the learner against the snapshot"""
+        self.games[opponent_id] += 1
+        self.wins[opponent_id] += is_win
+
+    @property
+    def win_rates(self) -> NDArray[np.float64]:
+        """Win rate of the learner against each snapshot, with one win and one loss added as a prior"""
+        return (self.wins + 1) / (self.games + 2)
+
+    @property
+    def weights(self) -> NDArray[np.float64]:
+        """Probability of each snapshot being sampled"""
+        weights = (1 - self.win_rates) ** self.exponent
+        return weights / weights.sum()
+
+    def sample(self, np_random: np.random.Generator, size: int) -> NDArray[np.int32]:
+        """Ids of `size` opponents sampled by `weights`"""
+        assert len(self.params) > 0, "The pool has no opponent"
+        return np_random.choice(len(self.params), size=size, p=self.weights).astype(np.int32)
+
+
+def get_shared_array_specs(num_envs: int) -> SharedArraySpecs:
+    """(name, shape, dtype) of every array in the shared memory block, see `pikazoo.env.shared_memory`"""
+    return (
+        ("actions", (num_envs,), np.dtype(np.int32)),
+        ("opponent_ids", (num_envs,), np.dtype(np.int32)),
+        ("observations", (num_envs, 35), np.dtype(np.int32)),
+        ("rewards", (num_envs,), np.dtype(np.float32)),
+        ("terminations", (num_envs,), np.dtype(bool)),
+        ("truncations", (num_envs,), np.dtype(bool)),
+        ("final_observation", (num_envs, 35), np.dtype(np.int32)),
+    )
+
+
+def _worker(pipe, buffer, num_envs: int, start: int, stop: int, side: int, policy: Callable, env_kwargs: dict):
+    """Step the matches [start, stop) with a `raw_vector_env`, playing the opponents with `policy`"""
+    from pikazoo.env.pikazoo_vector_env import raw_vector_env
+
+    shared_arrays = get_shared_arrays(buffer, get_shared_array_specs(num_envs))
+    learner_actions = shared_arrays["actions"][start:stop]
+    opponent_ids = shared_arrays["opponent_ids"][start:stop]
+    observations = shared_arrays["observations"][start:stop]
+    rewards = shared_arrays["rewards"][start:stop]
+    terminations = shared_arrays["terminations"][start:stop]
+    truncations = shared_arrays["truncations"][start:stop]
+    final_observation = shared_arrays["final_observation"][start:stop]
+
+    env = raw_vector_env(num_envs=stop - start, **env_kwargs)
+    actions = np.zeros((stop - start, 2), dtype=np.int32)
+    # params of every snapshot of the pool, by id
+    params: List[Any] = []
+
+    try:
+        while True:
+            command, data = pipe.recv()
+            if command == "step":
+                actions[:, side] = learner_actions
+                opponent_observations = env.observations[:, 1 - side]
+                for opponent_id in np.unique(opponent_ids):
+                    slots = opponent_ids == opponent_id
+                    actions[slots, 1 - side] = policy(params[opponent_id], opponent_observations[slots])
+                env_observations, env_rewards, env_terminations, env_truncations, infos = env.step(actions)
+                observations[...] = env_observations[:, side]
+                rewards[...] = env_rewards[:, side]
+                terminations[...] = env_terminations[:, side]
+                truncations[...] = env_truncations[:, side]
+                results = []
+                if "final_observation" in infos:
+                    for n in np.flatnonzero(env_terminations[:, side]):
+                        final_observation[n] = infos["final_observation"][n, side]
+                        score = infos["final_score"][n]
+                        results.append(
+                            MatchResult(start + int(n), int(opponent_ids[n]), int(score[side]), int(score[1 - side]))
+                        )
+                pipe.send(("ok", results))
+            elif command == "add":
+                params.append(data)
+                pipe.send(("ok", None))
+            elif command == "reset":
+                env.reset(seed=None if data is None else data + start)
+                observations[...] = env.observations[:, side]
+                pipe.send(("ok", None))
+            elif command == "close":
+                env.close()
+                pipe.send(("closed", None))
+                break
+    except KeyboardInterrupt:
+        pass
+    except Exception:
+        pipe.send(("error", traceback.format_exc()))
+    finally:
+        pipe.close()
+
+
+class League:
+    """
+    `num_envs` matches of the learner against opponents sampled from an `OpponentPool`,
+    stepped by worker processes which also evaluate the opponents.
+
+    Actions are given as a (N,) int array of the learner's actions, and observations, rewards,
+    terminations and truncations are returned as (N, 35) and (N,) arrays of the learner,
+    in buffers overwritten by the next `step()` or `reset()`.
+    Finished matches are reset in the step they finish, as in `raw_vector_env`,
+    their last observation is in `infos["final_observation"]` and their `MatchResult`s in `infos["results"]`.
+    `infos["opponent_ids"]` is the snapshot played in each slot.
+    """
+
+    def __init__(
+        self,
+        policy: Callable[[Any, NDArray[np.int32]], NDArray],
+        num_envs: int = 1,
+        num_workers: Optional[int] = None,
+        side: str = "player_1",
+        pool: Optional[OpponentPool] = None,
+        seed: Optional[int] = None,
+        context: Optional[str] = None,
+        winning_score: int = 15,
+        serve: str = "winner",
+    ):
+        """
+        Args:
+            policy (Callable[[Any, NDArray[np.int32]], NDArray]): `policy(params, observations)` returns the actions
+                of a snapshot for a (M, 35) batch of observations. It must be picklable, ex) a module level function.
+            num_envs (int): Number of matches of all workers
+            num_workers (int, optional): Number of worker processes. Defaults to the number of cores.
+            side (str): player_1 / player_2, the side of the learner
+            pool (OpponentPool, optional): Pool of the snapshots, an empty `OpponentPool()` if not given
+            seed (int, optional): Seed of the sampling of the opponents
+            context (str, optional): Start method of the workers, "fork", "spawn" or "forkserver"
+        """
+        assert side in SIDES
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        num_workers = min(num_workers, num_envs)
+        self.num_envs: int = num_envs
+        self.num_workers: int = num_workers
+        self.side = side
+        self.pool = pool if pool is not None else OpponentPool()
+        self.np_random = np.random.default_rng(seed)
+        env_kwargs = {"winning_score": winning_score, "serve": serve}
+
+        ctx = multiprocessing.get_context(context)
+        arrays = get_shared_array_specs(num_envs)
+        self._buffer = ctx.RawArray("b", get_shared_buffer_size(arrays))
+        self._shared_arrays = get_shared_arrays(self._buffer, arrays)
+        self._pipes, self._processes = start_workers(
+            ctx, _worker, self._buffer, num_envs, num_workers, SIDES.index(side), policy, env_kwargs
+        )
+        self.closed = False
+        # the snapshots of `pool` already sent to the workers
+        self._num_sent_opponents = 0
+        self._send_new_opponents()
+
+    def add_opponent(self, params: Any) -> int:
+        """Add a snapshot to the pool and send it to the workers, returns its id"""
+        opponent_id = self.pool.add(params)
+        self._send_new_opponents()
+        return opponent_id
+
+    def reset(self, seed: Optional[int] = None, options: Optional[dict] = None):
+        """Reset every match and sample an opponent for every slot.
+        If `seed` is given, match n is seeded with `seed + n`, same as `raw_vector_env`."""
+        self._send_new_opponents()
+        self._shared_arrays["opponent_ids"][...] = self.pool.sample(self.np_random, self.num_envs)
+        for pipe in self._pipes:
+            pipe.send(("reset", seed))
+        self._wait()
+        return self._shared_arrays["observations"], {"opponent_ids": self._shared_arrays["opponent_ids"]}
+
+    def step(self, actions):
+        self.step_async(actions)
+        return self.step_wait()
+
+    def step_async(self, actions):
+        """Write the actions of the learner into the shared memory and let the workers step"""
+        self._send_new_opponents()
+        self._shared_arrays["actions"][...] = actions
+        for pipe in self._pipes:
+            pipe.send(("step", None))
+
+    def step_wait(self):
+        """Wait for the workers, record the finished matches and sample the opponents of their slots"""
+        results: List[MatchResult] = [result for worker_results in self._wait() for result in worker_results]
+        shared_arrays = self._shared_arrays
+        infos = {"results": results}
+        if results:
+            for result in results:
+                self.pool.record(result.opponent_id, result.is_win)
+            # the opponents of the next matches of the slots
+            slots = [result.slot for result in results]
+            shared_arrays["opponent_ids"][slots] = self.pool.sample(self.np_random, len(slots))
+            infos["final_observation"] = shared_arrays["final_observation"]
+        infos["opponent_ids"] = shared_arrays["opponent_ids"]
+        return (
+            shared_arrays["observations"],
+            shared_arrays["rewards"],
+            shared_arrays["terminations"],
+            shared_arrays["truncations"],
+            infos,
+        )
+
+    def _send_new_opponents(self):
+        while self._num_sent_opponents < len(self.pool):
+            params = self.pool.params[self._num_sent_opponents]
+            for pipe in self._pipes:
+                pipe.send(("add", params))
+            self._wait()
+            self._num_sent_opponents += 1
+
+    def _wait(self) -> list:
+        return wait_for_workers(self._pipes, self.close, "League")
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        close_workers(self._pipes, self._processes)
+
+    def __del__(self):
+        if not getattr(self, "closed", True):
+            self.close()
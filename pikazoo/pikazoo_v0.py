@@ -1,3 +1,29 @@
-from pikazoo.env.pikazoo_env import env, raw_env
+"""
+The environments are imported on first access, so that importing `pikazoo_v0` costs nothing
+and a process only imports the modules of the environments it makes.
+"""
 
-__all__ = ["env", "raw_env"]
+import importlib
+
+_MODULES = {
+    "env": "pikazoo.env.pikazoo_env",
+    "raw_env": "pikazoo.env.pikazoo_env",
+    "vector_env": "pikazoo.env.pikazoo_vector_env",
+    "raw_vector_env": "pikazoo.env.pikazoo_vector_env",
+    "async_vector_env": "pikazoo.env.pikazoo_async_vector_env",
+    "raw_async_vector_env": "pikazoo.env.pikazoo_async_vector_env",
+}
+
+__all__ = list(_MODULES)
+
+
+def __getattr__(name):
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_MODULES[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return __all__
@@ -0,0 +1,204 @@
+"""
+Replays of `raw_env` matches.
+
+A match of `raw_env` depends only on the arguments of the env, the seed of `reset` and the actions of every step
+(rendering draws from its own generator), so a replay stores just these, in a small binary file:
+
+* header (`HEADER_STRUCT`) : the arguments which change the match, the seed, the number of steps,
+  and the number of frames and the scores at the end, which `play` checks
+* zlib compressed (steps, 2) uint8 actions of player 1 and player 2
+
+Replays are recorded by `pikazoo.wrappers.RecordReplay`, and rendered to videos in a process pool by
+
+    python -m pikazoo.replay replays/*.pkzr --video-folder videos --workers 8
+"""
+
+import argparse
+import concurrent.futures
+import os
+import struct
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from numpy.typing import NDArray
+
+MAGIC = b"PKZR"
+VERSION = 2
+SERVES = ("winner", "alternate", "random")
+# magic, version, winning_score, serve, is_player1_computer, is_player2_computer, frame_skip, fast_forward,
+# buffered_random, seed, number of steps, number of frames, player 1 score, player 2 score
+HEADER_STRUCT = struct.Struct("<4sBHB??H??QIIHH")
+
+
+class Replay:
+    """Seed, arguments and actions of a match, and its number of frames and scores to check it against"""
+
+    def __init__(
+        self,
+        env_kwargs: Dict,
+        seed: int,
+        actions: NDArray[np.uint8],
+        frames: int,
+        scores: Tuple[int, int],
+    ) -> None:
+        """
+        Args:
+            env_kwargs (Dict): winning_score, serve, is_player1_computer, is_player2_computer, frame_skip, fast_forward,
+                buffered_random
+            seed (int): seed of `reset`, in [0, 2**64)
+            actions (NDArray[np.uint8]): (steps, 2) actions of player 1 and player 2 of every step
+            frames (int): number of frames run in the match
+            scores (Tuple[int, int]): scores at the end of the match
+        """
+        self.env_kwargs = env_kwargs
+        self.seed = seed
+        self.actions = actions
+        self.frames = frames
+        self.scores = scores
+
+    @classmethod
+    def from_env(cls, env, seed: int, actions: NDArray[np.uint8]) -> "Replay":
+        """Replay of the match played by `env`, a `raw_env` reset with `seed`"""
+        env_kwargs = dict(
+            winning_score=env.winning_score,
+            serve=env.serve,
+            is_player1_computer=env.physics.player1.is_computer,
+            is_player2_computer=env.physics.player2.is_computer,
+            frame_skip=env.frame_skip,
+            fast_forward=env.fast_forward,
+            buffered_random=env.buffered_random,
+        )
+        return cls(env_kwargs, seed, actions, env.frames, (env.scores[0], env.scores[1]))
+
+    @classmethod
+    def load(cls, path: str) -> "Replay":
+        """Load a replay saved by `save`"""
+        with open(path, "rb") as f:
+            data = f.read()
+        (
+            magic,
+            version,
+            winning_score,
+            serve,
+            is_player1_computer,
+            is_player2_computer,
+            frame_skip,
+            fast_forward,
+            buffered_random,
+            seed,
+            steps,
+            frames,
+            player1_score,
+            player2_score,
+        ) = HEADER_STRUCT.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a replay of version {VERSION}")
+        actions = np.frombuffer(zlib.decompress(data[HEADER_STRUCT.size :]), dtype=np.uint8).reshape(steps, 2)
+        env_kwargs = dict(
+            winning_score=winning_score,
+            serve=SERVES[serve],
+            is_player1_computer=is_player1_computer,
+            is_player2_computer=is_player2_computer,
+            frame_skip=frame_skip,
+            fast_forward=fast_forward,
+            buffered_random=buffered_random,
+        )
+        return cls(env_kwargs, seed, actions, frames, (player1_score, player2_score))
+
+    def save(self, path: str) -> None:
+        """Save the replay as a binary file, usually a few hundred bytes"""
+        kwargs = self.env_kwargs
+        header = HEADER_STRUCT.pack(
+            MAGIC,
+            VERSION,
+            kwargs["winning_score"],
+            SERVES.index(kwargs["serve"]),
+            kwargs["is_player1_computer"],
+            kwargs["is_player2_computer"],
+            kwargs["frame_skip"],
+            kwargs["fast_forward"],
+            kwargs["buffered_random"],
+            self.seed,
+            len(self.actions),
+            self.frames,
+            *self.scores,
+        )
+        with open(path, "wb") as f:
+            f.write(header + zlib.compress(np.ascontiguousarray(self.actions, dtype=np.uint8).tobytes()))
+
+    def play(self, callback: Optional[Callable] = None, **kwargs):
+        """Play the match again
+
+        Args:
+            callback (Callable, optional): called with the env after `reset` and after every step
+            **kwargs: arguments of `raw_env` which do not change the match, ex) render_mode
+
+        Raises:
+            ValueError: If the number of frames or the scores are not the ones of the recorded match
+
+        Returns:
+            raw_env: the env at the end of the match
+        """
+        from pikazoo.env.pikazoo_env import raw_env
+
+        env = raw_env(**self.env_kwargs, **kwargs)
+        env.reset(seed=self.seed)
+        if callback is not None:
+            callback(env)
+        for player1_action, player2_action in self.actions.tolist():
+            env.step({"player_1": player1_action, "player_2": player2_action})
+            if callback is not None:
+                callback(env)
+        if env.frames != self.frames or tuple(env.scores) != self.scores:
+            raise ValueError(
+                f"The replay ended after {env.frames} frames with {tuple(env.scores)}, "
+                f"but the match ended after {self.frames} frames with {self.scores}"
+            )
+        return env
+
+
+def render_replay(path: str, video_path: str, writer_factory: Optional[Callable] = None) -> str:
+    """Render a replay to a video, one frame after `reset` and after every step
+
+    Args:
+        path (str): path of the replay
+        video_path (str): path of the video
+        writer_factory (Callable, optional): see `RecordVideo`, the ffmpeg writer of `moviepy` if not given
+
+    Returns:
+        str: `video_path`
+    """
+    from pikazoo.env.pikazoo_env import raw_env
+    from pikazoo.env.rasterizer import SCREEN_SHAPE
+    from pikazoo.wrappers.record_video import ffmpeg_writer
+
+    if writer_factory is None:
+        writer_factory = ffmpeg_writer
+    replay = Replay.load(path)
+    frame = np.empty(SCREEN_SHAPE, dtype=np.uint8)
+    writer = writer_factory(video_path, (SCREEN_SHAPE[1], SCREEN_SHAPE[0]), raw_env.metadata["render_fps"])
+    try:
+        replay.play(lambda env: writer.write_frame(env.render_into(frame)), render_mode="rgb_array", renderer="numpy")
+    finally:
+        writer.close()
+    return video_path
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Render replays to videos in a process pool")
+    parser.add_argument("replays", nargs="+", help="paths of the replays")
+    parser.add_argument("--video-folder", default="videos")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.video_folder, exist_ok=True)
+    video_paths = [
+        os.path.join(args.video_folder, os.path.splitext(os.path.basename(path))[0] + ".mp4") for path in args.replays
+    ]
+    with concurrent.futures.ProcessPoolExecutor(args.workers) as executor:
+        for video_path in executor.map(render_replay, args.replays, video_paths):
+            print(video_path)
+
+
+if __name__ == "__main__":
+    main()
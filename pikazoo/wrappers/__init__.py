@@ -1,6 +1,8 @@
 from pikazoo.wrappers.reward_in_normal_state import RewardInNormalState
 from pikazoo.wrappers.reward_by_ball_position import RewardByBallPosition
-from pikazoo.wrappers.convert_single_agent import ConvertSingleAgent
+from pikazoo.wrappers.convert_single_agent import ConvertSingleAgent, BatchedPolicy
 from pikazoo.wrappers.record_episode_statistics import RecordEpisodeStatistics
 from pikazoo.wrappers.normalize_observation import NormalizeObservation
 from pikazoo.wrappers.simplify_action import SimplifyAction
+from pikazoo.wrappers.record_video import RecordVideo
+from pikazoo.wrappers.record_replay import RecordReplay
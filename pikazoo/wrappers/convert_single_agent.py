@@ -1,24 +1,126 @@
+from typing import Callable, List, Optional, Sequence, Union
+import numpy as np
+from numpy.typing import NDArray
+from gymnasium import spaces
 from pettingzoo.utils import BaseParallelWrapper
 from pettingzoo.utils.env import ParallelEnv
 
+# number of random opponent actions drawn at once
+RANDOM_BUFFER_SIZE = 4096
+
+
+class BatchedPolicy:
+    """A frozen policy shared by many `ConvertSingleAgent`s, evaluated once for the opponents of all of them.
+
+    Every env hands the observation of its opponent to the policy after `reset` and `step`.
+    The first env which asks for an action after its observation changed evaluates the policy on the observations
+    of every env, so envs stepped in lockstep (ex. a `gymnasium.vector.SyncVectorEnv` of `ConvertSingleAgent`s)
+    make one policy call per step for all of them.
+    """
+
+    def __init__(self, policy: Callable[[NDArray], NDArray]):
+        """
+        Args:
+            policy (Callable[[NDArray], NDArray]): Maps (num_envs, *observation_shape) observations
+                to (num_envs,) actions
+        """
+        self.policy = policy
+        self.num_envs = 0
+        self.num_calls = 0
+        # latest observation of the opponent of every env, allocated by the first `observe`
+        self._observations: Optional[NDArray] = None
+        self._actions: Optional[NDArray] = None
+        # whether the observation of the env changed since the last policy call
+        self._is_pending: List[bool] = []
+
+    def add_env(self) -> int:
+        """Register an env, returns its index"""
+        self.num_envs += 1
+        self._is_pending.append(True)
+        return self.num_envs - 1
+
+    def observe(self, index: int, observation: NDArray):
+        """Copy the observation of the opponent of env `index`"""
+        if self._observations is None or len(self._observations) < self.num_envs:
+            observations = np.zeros((self.num_envs,) + np.shape(observation), dtype=np.asarray(observation).dtype)
+            if self._observations is not None:
+                observations[: len(self._observations)] = self._observations
+            self._observations = observations
+        self._observations[index] = observation
+        self._is_pending[index] = True
+
+    def act(self, index: int) -> int:
+        """Action of the opponent of env `index`, calling the policy for every env if its observation changed"""
+        if self._is_pending[index]:
+            self._actions = np.asarray(self.policy(self._observations[: self.num_envs]))
+            self.num_calls += 1
+            for i in range(self.num_envs):
+                self._is_pending[i] = False
+        return int(self._actions[index])
+
 
 class ConvertSingleAgent(BaseParallelWrapper):
-    def __init__(self, env: ParallelEnv, side: str):
+    """Single agent env of `side`, whose opponent is played by the wrapper.
+
+    opponent:
+
+    * None: random actions, drawn `RANDOM_BUFFER_SIZE` at a time from `np_random` of the opponent's action space
+    * "computer": the built-in computer of the game (`is_player1_computer` / `is_player2_computer` of `raw_env`)
+    * a `BatchedPolicy`, shared by the envs whose opponents are evaluated together
+    * a callable mapping a batch of observations to a batch of actions, evaluated for this env alone
+    * a sequence of actions, played in order from every `reset` and repeated
+    """
+
+    def __init__(
+        self,
+        env: ParallelEnv,
+        side: str,
+        opponent: Union[None, str, BatchedPolicy, Callable[[NDArray], NDArray], Sequence[int]] = None,
+    ):
         super().__init__(env)
         assert side in ("player_1", "player_2")
         self.side = side
         self.other_side = "player_1" if side == "player_2" else "player_2"
 
+        if opponent is None:
+            space = self.action_space(self.other_side)
+            assert isinstance(space, spaces.Discrete)
+            self._random_actions: List[int] = []
+            self._opponent_action = self._random_action
+        elif isinstance(opponent, str):
+            assert opponent == "computer"
+            physics = self.env.unwrapped.physics
+            player = physics.player1 if self.other_side == "player_1" else physics.player2
+            # the computer decides the input of its player, the action is not used
+            player.is_computer = True
+            self._opponent_action = self._no_action
+        elif isinstance(opponent, BatchedPolicy) or callable(opponent):
+            # `BatchedPolicy` is not callable itself, so it is checked before falling back to a script
+            if not isinstance(opponent, BatchedPolicy):
+                opponent = BatchedPolicy(opponent)
+            self.policy = opponent
+            self._policy_index = self.policy.add_env()
+            self._opponent_action = self._policy_action
+        else:
+            self.script: List[int] = [int(action) for action in opponent]
+            assert len(self.script) > 0
+            self._script_index = 0
+            self._opponent_action = self._script_action
+        self.opponent = opponent
+
     def reset(self, seed=None, options=None):
         obs, infos = super().reset(seed=seed, options=options)
+        self._script_index = 0
+        self._observe(obs)
         return obs[self.side], infos[self.side]
 
     def step(self, action):
         actions = {
             self.side: action,
-            self.other_side: self.action_space(self.other_side).sample(),
+            self.other_side: self._opponent_action(),
         }
         obs, rews, terminateds, truncateds, infos = super().step(actions)
+        self._observe(obs)
         return (
             obs[self.side],
             rews[self.side],
@@ -26,3 +128,26 @@ class ConvertSingleAgent(BaseParallelWrapper):
             truncateds[self.side],
             infos[self.side],
         )
+
+    def _observe(self, obs):
+        if isinstance(self.opponent, BatchedPolicy):
+            self.policy.observe(self._policy_index, obs[self.other_side])
+
+    def _random_action(self) -> int:
+        if not self._random_actions:
+            space = self.action_space(self.other_side)
+            actions = space.start + space.np_random.integers(0, space.n, RANDOM_BUFFER_SIZE)
+            # popped from the end
+            self._random_actions = actions[::-1].tolist()
+        return self._random_actions.pop()
+
+    def _no_action(self) -> int:
+        return 0
+
+    def _policy_action(self) -> int:
+        return self.policy.act(self._policy_index)
+
+    def _script_action(self) -> int:
+        action = self.script[self._script_index]
+        self._script_index = (self._script_index + 1) % len(self.script)
+        return action
@@ -0,0 +1,58 @@
+import os
+import secrets
+from typing import Optional
+import numpy as np
+import pettingzoo
+from pettingzoo.utils import BaseParallelWrapper
+from pikazoo.replay import Replay
+
+
+class RecordReplay(BaseParallelWrapper):
+    """This wrapper saves every episode as a `pikazoo.replay.Replay`, `{replay_folder}/{name_prefix}-{episode_id}.pkzr`.
+
+    It has to wrap `raw_env` directly, so that the recorded actions are the actions given to `raw_env`.
+    A step only appends the two actions to a bytearray.
+    """
+
+    def __init__(self, env: pettingzoo.ParallelEnv, replay_folder: str, name_prefix: str = "episode"):
+        BaseParallelWrapper.__init__(self, env)
+        assert self.env is self.env.unwrapped
+        self.agents = self.env.agents
+        self.replay_folder = replay_folder
+        os.makedirs(replay_folder, exist_ok=True)
+        self.name_prefix = name_prefix
+        self.episode_id = -1
+        self.seed: Optional[int] = None
+        self._actions = bytearray()
+
+    def reset(self, seed: Optional[int] = None, options: Optional[dict] = None):
+        """Resets the environment with `seed`, or a new random seed if not given, which is saved in the replay."""
+        if seed is None:
+            seed = secrets.randbits(63)
+        assert 0 <= seed < 2**64
+        self.seed = seed
+        self.episode_id += 1
+        self._actions.clear()
+        obs, info = super().reset(seed, options)
+        self.agents = self.env.agents
+        return obs, info
+
+    def step(self, action):
+        """Steps through the environment, recording the actions, and saves the replay at the end of the episode."""
+        self._actions += bytes((action["player_1"], action["player_2"]))
+        obs, rews, terminateds, truncateds, infos = super().step(action)
+        self.agents = self.env.agents
+        if all(terminateds.values()) or all(truncateds.values()):
+            self.save()
+        return obs, rews, terminateds, truncateds, infos
+
+    def save(self) -> str:
+        """Save the replay of the episode played so far
+
+        Returns:
+            str: path of the replay
+        """
+        actions = np.frombuffer(bytes(self._actions), dtype=np.uint8).reshape(-1, 2)
+        path = os.path.join(self.replay_folder, f"{self.name_prefix}-{self.episode_id}.pkzr")
+        Replay.from_env(self.env, self.seed, actions).save(path)
+        return path
@@ -0,0 +1,158 @@
+import os
+import queue
+import threading
+from typing import Callable, Optional
+import numpy as np
+import pettingzoo
+from pettingzoo.utils import BaseParallelWrapper
+from pikazoo.env.rasterizer import SCREEN_SHAPE
+
+
+def ffmpeg_writer(path: str, size, fps: float):
+    """Writer of `moviepy` which streams the frames to an ffmpeg process"""
+    from moviepy.video.io.ffmpeg_writer import FFMPEG_VideoWriter
+
+    return FFMPEG_VideoWriter(path, size, fps)
+
+
+class RecordVideo(BaseParallelWrapper):
+    """This wrapper records episodes to video files, encoded by a background thread while the env keeps stepping.
+
+    Every frame is drawn by `render_into` into one of `queue_size` preallocated frame buffers and handed to the thread,
+    which writes it to the file and gives the buffer back, so no frame is kept longer than it takes to encode it.
+    If every buffer is waiting to be encoded, `step` waits for one (`policy="block"`),
+    or the frame is not recorded (`policy="drop"`) and counted in `dropped_frames`.
+    """
+
+    def __init__(
+        self,
+        env: pettingzoo.ParallelEnv,
+        video_folder: str,
+        name_prefix: str = "episode",
+        episode_trigger: Optional[Callable[[int], bool]] = None,
+        queue_size: int = 64,
+        policy: str = "block",
+        fps: Optional[float] = None,
+        writer_factory: Callable = ffmpeg_writer,
+    ):
+        """
+        Args:
+            env (pettingzoo.ParallelEnv): env whose `unwrapped` is a `raw_env` with `render_mode="rgb_array"`
+            video_folder (str): folder of the videos, `{name_prefix}-{episode_id}.mp4`
+            name_prefix (str): prefix of the file names
+            episode_trigger (Callable[[int], bool], optional): Whether to record the episode of the id, starting from 0.
+                Every episode is recorded if not given.
+            queue_size (int): number of frame buffers
+            policy (str): block / drop, what `step` does when every frame buffer is waiting to be encoded
+            fps (float, optional): frames per second of the videos, `metadata["render_fps"]` if not given
+            writer_factory (Callable): `writer_factory(path, (width, height), fps)` returns an object
+                with `write_frame(frame)` and `close()`, the ffmpeg writer of `moviepy` by default
+        """
+        BaseParallelWrapper.__init__(self, env)
+        assert self.env.unwrapped.render_mode == "rgb_array"
+        assert policy in ("block", "drop")
+        assert queue_size >= 1
+        self.agents = self.env.agents
+        self.video_folder = video_folder
+        os.makedirs(video_folder, exist_ok=True)
+        self.name_prefix = name_prefix
+        self.episode_trigger = episode_trigger
+        self.policy = policy
+        self.fps = fps if fps is not None else self.env.unwrapped.metadata["render_fps"]
+        self.writer_factory = writer_factory
+
+        self.episode_id = -1
+        self.recording = False
+        self.dropped_frames = 0
+
+        self._frames = np.empty((queue_size,) + SCREEN_SHAPE, dtype=np.uint8)
+        # indices of the frame buffers which can be drawn into
+        self._free_frames = queue.Queue()
+        for i in range(queue_size):
+            self._free_frames.put(i)
+        # ("start", path), ("frame", index), ("end", None), or None to stop the thread
+        self._messages = queue.Queue()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._encode, daemon=True)
+        self._thread.start()
+
+    def reset(self, seed: Optional[int] = None, options: Optional[dict] = None):
+        """Resets the environment, and starts recording the new episode if `episode_trigger` says so."""
+        self._check_error()
+        if self.recording:
+            self._end_recording()
+        obs, info = super().reset(seed, options)
+        self.agents = self.env.agents
+        self.episode_id += 1
+        if self.episode_trigger is None or self.episode_trigger(self.episode_id):
+            path = os.path.join(self.video_folder, f"{self.name_prefix}-{self.episode_id}.mp4")
+            self._messages.put(("start", path))
+            self.recording = True
+            self._capture_frame()
+        return obs, info
+
+    def step(self, action):
+        """Steps through the environment, handing the frame to the encoder thread if the episode is recorded."""
+        obs, rews, terminateds, truncateds, infos = super().step(action)
+        self.agents = self.env.agents
+        if self.recording:
+            self._check_error()
+            self._capture_frame()
+            if all(terminateds.values()) or all(truncateds.values()):
+                self._end_recording()
+        return obs, rews, terminateds, truncateds, infos
+
+    def close(self):
+        """Finishes the video being recorded, waits for the encoder thread and closes the environment."""
+        if self.recording:
+            self._end_recording()
+        self._messages.put(None)
+        self._thread.join()
+        super().close()
+        self._check_error()
+
+    def _capture_frame(self):
+        if self.policy == "block":
+            index = self._free_frames.get()
+        else:
+            try:
+                index = self._free_frames.get_nowait()
+            except queue.Empty:
+                self.dropped_frames += 1
+                return
+        self.env.unwrapped.render_into(self._frames[index])
+        self._messages.put(("frame", index))
+
+    def _end_recording(self):
+        self._messages.put(("end", None))
+        self.recording = False
+
+    def _check_error(self):
+        if self._error is not None:
+            raise RuntimeError("The video encoder thread failed") from self._error
+
+    def _encode(self):
+        """Body of the encoder thread"""
+        writer = None
+        while True:
+            message = self._messages.get()
+            if message is None:
+                break
+            kind, value = message
+            try:
+                if kind == "start":
+                    writer = self.writer_factory(value, (SCREEN_SHAPE[1], SCREEN_SHAPE[0]), self.fps)
+                elif kind == "frame":
+                    if writer is not None:
+                        writer.write_frame(self._frames[value])
+                elif writer is not None:
+                    writer.close()
+                    writer = None
+            except BaseException as e:
+                self._error = e
+                writer = None
+            finally:
+                if kind == "frame":
+                    self._free_frames.put(value)
+        if writer is not None:
+            writer.close()
@@ -0,0 +1,38 @@
+import numpy as np
+from pikazoo import pikazoo_v0
+from pikazoo.env.buffered_random import BufferedRandom
+
+
+def test_buffered_random_draw_order():
+    random = BufferedRandom(np.random.default_rng(0), block_size=7)
+    values = [random.integers(3, 8) for _ in range(20)]
+    expected = np.floor(np.random.default_rng(0).random(21)[:20] * 5).astype(int) + 3
+    assert values == expected.tolist()
+
+    state = random.state
+    values = [random.integers(0, 20) for _ in range(10)]
+    random.state = state
+    assert [random.integers(0, 20) for _ in range(10)] == values
+
+
+def test_buffered_random_env():
+    kwargs = dict(winning_score=3, serve="random", is_player1_computer=True, is_player2_computer=True)
+    env = pikazoo_v0.env(buffered_random=True, **kwargs)
+    other_env = pikazoo_v0.env(buffered_random=True, **kwargs)
+    env.reset(seed=0)
+    other_env.reset(seed=0)
+    for _ in range(500):
+        env.step({"player_1": 0, "player_2": 0})
+        other_env.step({"player_1": 0, "player_2": 0})
+    assert env.get_state() == other_env.get_state()
+
+    state = env.get_state()
+    scores = []
+    while env.agents:
+        env.step({"player_1": 0, "player_2": 0})
+    scores.append(tuple(env.scores))
+    env.set_state(state)
+    while env.agents:
+        env.step({"player_1": 0, "player_2": 0})
+    scores.append(tuple(env.scores))
+    assert scores[0] == scores[1]
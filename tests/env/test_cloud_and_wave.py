@@ -0,0 +1,52 @@
+import numpy as np
+from pikazoo.env.cloud_and_wave import NUM_OF_CLOUDS, Clouds, Wave, cloud_and_wave_engine
+
+
+class RecordingGenerator:
+    """Generator which keeps the random numbers it draws"""
+
+    def __init__(self, seed):
+        self.np_random = np.random.default_rng(seed)
+        self.draws = []
+
+    def integers(self, low, high):
+        random_numbers = self.np_random.integers(low, high)
+        self.draws.append(random_numbers)
+        return random_numbers
+
+
+def test_engine_matches_scalar_engine():
+    np_random = RecordingGenerator(0)
+    clouds = Clouds(np_random)
+    wave = Wave()
+    x = clouds.top_left_point_x.tolist()
+    y = clouds.top_left_point_y.tolist()
+    x_velocity = clouds.top_left_point_x_velocity.tolist()
+    turn = clouds.size_diff_turn_number.tolist()
+    vertical_coord, vertical_coord_velocity = 0, 2
+    for _ in range(1000):
+        cloud_and_wave_engine(clouds, wave, np_random)
+        random_numbers = np_random.draws[-1].tolist()
+        # the loop of the original engine, given the same random numbers
+        for i in range(NUM_OF_CLOUDS):
+            x[i] += x_velocity[i]
+            if x[i] > 432:
+                x[i] = -68
+                y[i] = random_numbers[i]
+                x_velocity[i] = 1 + random_numbers[NUM_OF_CLOUDS + i]
+            turn[i] = (turn[i] + 1) % 11
+        vertical_coord += vertical_coord_velocity
+        if vertical_coord > 32:
+            vertical_coord = 32
+            vertical_coord_velocity = -1
+        elif vertical_coord < 0 and vertical_coord_velocity < 0:
+            vertical_coord_velocity = 2
+            vertical_coord = -random_numbers[2 * NUM_OF_CLOUDS]
+        y_coords = [314 - vertical_coord + r for r in random_numbers[2 * NUM_OF_CLOUDS + 1 :]]
+
+        size_diff = [5 - abs(t - 5) for t in turn]
+        assert clouds.sprite_top_left_point_x.tolist() == [a - d for a, d in zip(x, size_diff)]
+        assert clouds.sprite_top_left_point_y.tolist() == [a - d for a, d in zip(y, size_diff)]
+        assert clouds.sprite_width.tolist() == [48 + 2 * d for d in size_diff]
+        assert wave.y_coords.tolist() == y_coords
+    assert len(np_random.draws) == 1 + 1000
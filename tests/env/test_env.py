@@ -19,3 +19,108 @@ def observation_divide_and_assert(observations: Dict[str, NDArray]):
     player2_info2, player1_info2 = observations["player_2"][0:13], observations["player_2"][13:26]
     assert np.all(player1_info1 == player1_info2)
     assert np.all(player2_info1 == player2_info2)
+
+
+def test_observation_buffer():
+    env = pikazoo_v0.env(is_player1_computer=True, is_player2_computer=True)
+    copy_env = pikazoo_v0.env(is_player1_computer=True, is_player2_computer=True, copy_observation=True)
+    observations, _ = env.reset(seed=0)
+    copy_observations, _ = copy_env.reset(seed=0)
+    kept_observations = []
+    for _ in range(500):
+        assert observations["player_1"].dtype == np.int32
+        assert np.shares_memory(observations["player_1"], env.observations)
+        assert np.shares_memory(observations["player_2"], env.observations)
+        assert not np.shares_memory(copy_observations["player_1"], copy_env.observations)
+        for agent in env.agents:
+            assert np.array_equal(observations[agent], copy_observations[agent])
+            assert env.observation_space(agent).contains(observations[agent])
+        kept_observations.append(copy_observations["player_1"])
+        observations, _, _, _, _ = env.step({"player_1": 0, "player_2": 0})
+        copy_observations, _, _, _, _ = copy_env.step({"player_1": 0, "player_2": 0})
+    # the copies are not overwritten by the later steps
+    assert len({observation.tobytes() for observation in kept_observations}) > 1
+
+
+def test_frame_skip_matches_repeated_steps():
+    random = np.random.default_rng(0)
+    for frame_skip in (2, 4):
+        skip_env = pikazoo_v0.env(winning_score=3, is_player2_computer=True, frame_skip=frame_skip)
+        env = pikazoo_v0.env(winning_score=3, is_player2_computer=True)
+        skip_env.reset(seed=frame_skip)
+        env.reset(seed=frame_skip)
+        while skip_env.agents:
+            # FIRE and its combinations often, so that power hit keys are held over the repeated frames
+            actions = {"player_1": int(random.choice([1, 10, 11, 12, int(random.integers(0, 18))])), "player_2": 0}
+            observations, rewards, terminations, _, _ = skip_env.step(actions)
+            total_reward = 0
+            for _ in range(frame_skip):
+                expected_observations, expected_rewards, expected_terminations, _, _ = env.step(actions)
+                total_reward += expected_rewards["player_1"]
+                if expected_rewards["player_1"] != 0:
+                    break
+            assert np.array_equal(observations["player_1"], expected_observations["player_1"])
+            assert rewards["player_1"] == total_reward
+            assert terminations == expected_terminations
+            assert skip_env.scores == env.scores
+        assert not env.agents
+
+
+def test_fast_forward_matches_repeated_steps():
+    random = np.random.default_rng(0)
+    for is_player2_computer in (False, True):
+        fast_env = pikazoo_v0.env(winning_score=5, is_player2_computer=is_player2_computer, fast_forward=True)
+        env = pikazoo_v0.env(winning_score=5, is_player2_computer=is_player2_computer)
+        observations, infos = fast_env.reset(seed=0)
+        env.reset(seed=0)
+        # no key is pressed in the frames skipped by `reset`, the last action is repeated in those skipped by `step`
+        actions = {"player_1": 0, "player_2": 0}
+        skipped_frames = infos["player_1"]["skipped_frames"]
+        assert skipped_frames > 0
+        while True:
+            total_reward = 0
+            for _ in range(skipped_frames):
+                expected_observations, expected_rewards, _, _, _ = env.step(actions)
+                total_reward += expected_rewards["player_1"]
+            assert total_reward == 0
+            if skipped_frames > 0:
+                assert np.array_equal(observations["player_1"], expected_observations["player_1"])
+            if not fast_env.agents:
+                break
+            actions = {"player_1": int(random.integers(0, 18)), "player_2": int(random.integers(0, 18))}
+            observations, rewards, terminations, _, infos = fast_env.step(actions)
+            expected_observations, expected_rewards, expected_terminations, _, _ = env.step(actions)
+            skipped_frames = infos["player_1"]["skipped_frames"] if fast_env.agents else 0
+            assert rewards["player_1"] == expected_rewards["player_1"]
+            assert terminations == expected_terminations
+            assert fast_env.scores == env.scores
+            if rewards["player_1"] == 0 or terminations["player_1"]:
+                assert skipped_frames == 0
+                assert np.array_equal(observations["player_1"], expected_observations["player_1"])
+            else:
+                assert skipped_frames > 0
+        assert not env.agents
+
+
+def test_fast_forward_against_computer_moves_the_agent():
+    # the agent keeps running to one side in the skipped frames, as far as the computer can move in them
+    env = pikazoo_v0.env(winning_score=3, is_player2_computer=True, fast_forward=True)
+    env.reset(seed=0)
+    physics = env.unwrapped.physics
+    random = np.random.default_rng(0)
+    rounds = 0
+    while env.agents:
+        # 3: right, 4: left
+        action = int(random.choice([3, 4]))
+        _, rewards, _, _, infos = env.step({"player_1": action, "player_2": 0})
+        if rewards["player_1"] == 0 or not env.agents:
+            continue
+        rounds += 1
+        skipped_frames = infos["player_1"]["skipped_frames"]
+        assert skipped_frames > 0
+        # a new round starts at x = 36, the player moves 6 px per frame until the wall or the net
+        if action == 3:
+            assert physics.player1.x == min(36 + 6 * skipped_frames, 216 - 32)
+        else:
+            assert physics.player1.x == 32
+    assert rounds > 0
@@ -0,0 +1,41 @@
+import numpy as np
+from pikazoo import pikazoo_v0
+from pikazoo.env.landing_point_table import LandingPointTable
+from pikazoo.env.physics import simulate_landing_point_x
+
+
+def test_landing_point_table_matches_simulation(tmp_path):
+    table = LandingPointTable.build()
+    path = str(tmp_path / "landing_point_table.npz")
+    table.save(path)
+    loaded_table = LandingPointTable.load(path)
+
+    random = np.random.default_rng(0)
+    num_states = 20000
+    # including states out of the table
+    x = random.integers(-10, 470, num_states)
+    y = random.integers(0, 253, num_states)
+    x_velocity = random.integers(-25, 26, num_states)
+    y_velocity = random.integers(-140, 140, num_states)
+    landing_point_x = loaded_table.lookup_batch(x, y, x_velocity, y_velocity)
+    for i in range(num_states):
+        state = int(x[i]), int(y[i]), int(x_velocity[i]), int(y_velocity[i])
+        expected = simulate_landing_point_x(*state)
+        assert table.lookup(*state) == expected
+        assert landing_point_x[i] == expected
+
+
+def test_env_with_landing_point_table():
+    table = LandingPointTable.build()
+    env = pikazoo_v0.env(winning_score=5, is_player1_computer=True, is_player2_computer=True)
+    table_env = pikazoo_v0.env(
+        winning_score=5, is_player1_computer=True, is_player2_computer=True, landing_point_table=table
+    )
+    env.reset(seed=0)
+    table_env.reset(seed=0)
+    while env.agents:
+        observations, *_ = env.step({agent: 0 for agent in env.agents})
+        table_observations, *_ = table_env.step({agent: 0 for agent in table_env.agents})
+        assert env.physics.ball.expected_landing_point_x == table_env.physics.ball.expected_landing_point_x
+        assert np.array_equal(observations["player_1"], table_observations["player_1"])
+    assert not table_env.agents
@@ -0,0 +1,52 @@
+import numpy as np
+from pikazoo import pikazoo_v0
+from pikazoo.env import rasterizer
+
+
+def test_pixel_observation_stacks_frames():
+    env = pikazoo_v0.env(obs_type="pixels", pixel_shape=(304, 432), grayscale=False, frame_stack=3)
+    observations, _ = env.reset(seed=0)
+    assert env.observation_space("player_1").shape == (3, 304, 432, 3)
+    first_frame = rasterizer.render_batch(env.get_render_state())[0]
+    for frame in observations["player_1"]:
+        assert np.array_equal(frame, first_frame)
+
+    frames = [first_frame]
+    for _ in range(10):
+        observations, *_ = env.step({"player_1": 0, "player_2": 0})
+        frames.append(rasterizer.render_batch(env.get_render_state())[0])
+        obs = observations["player_1"]
+        assert obs is observations["player_2"]
+        assert np.shares_memory(obs, env.pixel_observation._stack)
+        assert env.observation_space("player_1").contains(obs)
+        for frame, expected in zip(obs, ([first_frame] * 2 + frames)[-3:]):
+            assert np.array_equal(frame, expected)
+
+
+def test_pixel_observation_downsampling():
+    env = pikazoo_v0.env(obs_type="pixels", pixel_shape=(76, 108), grayscale=True, frame_stack=1)
+    observations, _ = env.reset(seed=0)
+    obs = observations["player_1"]
+    assert obs.shape == env.observation_space("player_1").shape == (1, 76, 108)
+    rgb = rasterizer.render_batch(env.get_render_state())[0][::4, ::4].astype(np.int32)
+    gray = (77 * rgb[..., 0] + 150 * rgb[..., 1] + 29 * rgb[..., 2]) >> 8
+    assert np.array_equal(obs[0], gray)
+
+
+def test_pixel_observation_does_not_change_rendering():
+    # the frames of an env which also observes pixels are the frames of an env which only renders
+    env = pikazoo_v0.env(render_mode="rgb_array", renderer="numpy", is_player1_computer=True, is_player2_computer=True)
+    pixel_env = pikazoo_v0.env(
+        render_mode="rgb_array",
+        renderer="numpy",
+        obs_type="pixels",
+        is_player1_computer=True,
+        is_player2_computer=True,
+    )
+    env.reset(seed=0)
+    pixel_env.reset(seed=0)
+    for _ in range(200):
+        assert np.array_equal(pixel_env.render(), env.render())
+        assert np.array_equal(pixel_env.get_render_state(), env.get_render_state())
+        env.step({"player_1": 0, "player_2": 0})
+        pixel_env.step({"player_1": 0, "player_2": 0})
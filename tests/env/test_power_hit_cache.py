@@ -0,0 +1,44 @@
+import numpy as np
+from pikazoo import pikazoo_v0
+from pikazoo.env import physics
+
+
+def test_cached_power_hit_landing_point_matches_simulation():
+    random = np.random.default_rng(0)
+    physics.cached_power_hit_landing_points_x.cache_clear()
+    for _ in range(2000):
+        x, y, y_velocity = int(random.integers(20, 433)), int(random.integers(0, 253)), int(random.integers(-60, 61))
+        expected = tuple(
+            physics.simulate_power_hit_landing_point_x(x_direction, y_direction, x, y, y_velocity)
+            for x_direction, y_direction in physics.POWER_HIT_DIRECTIONS
+        )
+        # twice, once for the miss and once for the hit
+        for _ in range(2):
+            assert physics.cached_power_hit_landing_points_x(x, y, abs(y_velocity)) == expected
+    cache_info = physics.cached_power_hit_landing_points_x.cache_info()
+    assert cache_info.hits >= cache_info.misses > 0
+    assert cache_info.currsize <= physics.POWER_HIT_CACHE_SIZE
+
+
+def run_computer_game(seed: int):
+    env = pikazoo_v0.env(winning_score=3, is_player1_computer=True, is_player2_computer=True)
+    env.reset(seed=seed)
+    history = []
+    for _ in range(3000):
+        observations, _, _, _, _ = env.step({"player_1": 0, "player_2": 0})
+        history.append(observations["player_1"].copy())
+        if not env.agents:
+            break
+    return np.array(history)
+
+
+def test_env_with_power_hit_cache(monkeypatch):
+    physics.cached_power_hit_landing_points_x.cache_clear()
+    with_cache = [run_computer_game(seed) for seed in range(3)]
+    assert physics.cached_power_hit_landing_points_x.cache_info().hits > 0
+    monkeypatch.setattr(
+        physics, "cached_power_hit_landing_points_x", physics.cached_power_hit_landing_points_x.__wrapped__
+    )
+    without_cache = [run_computer_game(seed) for seed in range(3)]
+    for a, b in zip(with_cache, without_cache):
+        assert np.array_equal(a, b)
@@ -0,0 +1,116 @@
+import numpy as np
+import pygame
+from pikazoo import pikazoo_v0
+from pikazoo.env.pikazoo_env import raw_env
+from pikazoo.env import rasterizer
+from pikazoo.env.rasterizer import RENDER_STATE_FIELDS, SCORES
+
+
+def test_cached_background_matches_tiles():
+    env = pikazoo_v0.env(render_mode="rgb_array")
+    env.reset(seed=0)
+    env.render()
+    # The tiles leave a few transparent pixels of the ground uncovered, which are black on a new screen.
+    env.screen.fill((0, 0, 0))
+    env.draw_background_tiles(env.screen)
+    tiles = pygame.surfarray.array3d(env.screen)
+    env.screen.fill((255, 255, 255))
+    env.draw_background()
+    assert np.array_equal(pygame.surfarray.array3d(env.screen), tiles)
+    env.close()
+
+    # the cached background is still used after pygame.quit()
+    env = pikazoo_v0.env(render_mode="rgb_array")
+    env.reset(seed=0)
+    env.render()
+    env.draw_background()
+    assert np.array_equal(pygame.surfarray.array3d(env.screen), tiles)
+    env.close()
+
+
+def test_cached_sprite_transforms():
+    env = pikazoo_v0.env(render_mode="rgb_array")
+    env.reset(seed=0)
+    env.render()
+    for sprite, flipped in zip(env.pikachu, env.flipped_pikachu):
+        expected = pygame.transform.flip(sprite, True, False)
+        assert np.array_equal(pygame.surfarray.pixels_alpha(flipped), pygame.surfarray.pixels_alpha(expected))
+        assert np.array_equal(pygame.surfarray.array3d(flipped), pygame.surfarray.array3d(expected))
+    clouds = env.clouds
+    for size_diff, width, height in zip(clouds.size_diff, clouds.sprite_width, clouds.sprite_height):
+        assert env.scaled_cloud[size_diff].get_size() == (width, height)
+    for radius, punch in enumerate(env.scaled_ball_punch):
+        assert punch.get_size() == (2 * radius, 2 * radius)
+    env.close()
+
+
+def test_sprites_shared_by_envs():
+    env1 = pikazoo_v0.env(render_mode="rgb_array")
+    env2 = pikazoo_v0.env(render_mode="rgb_array")
+    for name in ("pikachu", "flipped_pikachu", "scaled_cloud", "ball", "shadow"):
+        assert getattr(env1, name) is getattr(env2, name) is raw_env.sprites[name]
+
+
+def test_numpy_renderer_matches_pygame():
+    env = pikazoo_v0.env(winning_score=12, render_mode="rgb_array", is_player1_computer=True, is_player2_computer=True)
+    env.reset(seed=0)
+    # the frames are compared one at a time, a whole match of frames does not fit in memory
+    is_power_hit = is_punch_effect = is_diving = is_two_digit_score = False
+    while env.agents:
+        frame = env.render()
+        render_state = env.get_render_state()
+        assert np.array_equal(frame, rasterizer.render_batch(render_state[None])[0])
+        # the frames with power hits, punch effects, diving players and scores of two digits are compared
+        is_power_hit |= bool(render_state[RENDER_STATE_FIELDS.index("ball_is_power_hit")])
+        is_punch_effect |= bool(render_state[RENDER_STATE_FIELDS.index("ball_punch_effect_radius")])
+        is_diving |= bool(render_state[RENDER_STATE_FIELDS.index("player1_state")] == 3)
+        is_two_digit_score |= bool((render_state[SCORES : SCORES + 2] >= 10).any())
+        env.step({"player_1": 0, "player_2": 0})
+    assert is_power_hit and is_punch_effect and is_diving and is_two_digit_score
+    env.close()
+
+
+def test_numpy_renderer_env():
+    env = pikazoo_v0.env(render_mode="rgb_array", renderer="numpy", is_player1_computer=True, is_player2_computer=True)
+    env.reset(seed=0)
+    for _ in range(100):
+        env.step({"player_1": 0, "player_2": 0})
+    state = env.get_render_state()
+    frame = env.render()
+    assert frame.shape == (304, 432, 3) and frame.dtype == np.uint8
+    # rendering only draws, the clouds, the wave and the punch effect move in `step`
+    assert np.array_equal(env.get_render_state(), state)
+    assert np.array_equal(env.render(), frame)
+    assert np.array_equal(frame, rasterizer.render_batch(state)[0])
+
+
+def test_sampled_render_matches_full_size():
+    env = pikazoo_v0.env(renderer="numpy", render_mode="rgb_array", is_player1_computer=True, is_player2_computer=True)
+    env.reset(seed=0)
+    for _ in range(300):
+        env.step({"player_1": 0, "player_2": 0})
+        render_state = env.get_render_state()
+        full = rasterizer.render_batch(render_state)[0]
+        for shape in ((76, 108), (100, 150), (304, 432), (1, 1)):
+            rows, columns = rasterizer.get_sampling(*shape)
+            frame = rasterizer.render_batch(render_state, shape=shape)[0]
+            assert np.array_equal(frame, full[rows[:, None], columns])
+
+
+def test_render_into():
+    for renderer in ("pygame", "numpy"):
+        env = pikazoo_v0.env(render_mode="rgb_array", renderer=renderer)
+        env_into = pikazoo_v0.env(render_mode="rgb_array", renderer=renderer)
+        env.reset(seed=0)
+        env_into.reset(seed=0)
+        frames = np.zeros((3,) + rasterizer.SCREEN_SHAPE, dtype=np.uint8)
+        for i in range(len(frames)):
+            frame = env.render()
+            assert frame.flags.c_contiguous
+            out = frames[i]
+            assert env_into.render_into(out) is out
+            assert np.array_equal(out, frame)
+            env.step({"player_1": 0, "player_2": 0})
+            env_into.step({"player_1": 0, "player_2": 0})
+        env.close()
+        env_into.close()
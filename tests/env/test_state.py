@@ -0,0 +1,64 @@
+import numpy as np
+from pikazoo import pikazoo_v0
+
+
+def play(env, actions):
+    history = []
+    for player1_action, player2_action in actions:
+        if not env.agents:
+            break
+        observations, rewards, terminations, _, _ = env.step({"player_1": player1_action, "player_2": player2_action})
+        history.append(
+            (
+                observations["player_1"].tobytes(),
+                rewards["player_1"],
+                terminations["player_1"],
+                tuple(env.scores),
+                env.frames,
+            )
+        )
+    return history
+
+
+def test_set_state_continues_identically():
+    random = np.random.default_rng(0)
+    for is_computer, serve in ((True, "winner"), (False, "random"), (True, "alternate")):
+        env = pikazoo_v0.env(winning_score=3, serve=serve, is_player1_computer=is_computer, is_player2_computer=True)
+        env.reset(seed=0)
+        for _ in range(3):
+            play(env, random.integers(0, 18, size=(int(random.integers(0, 1000)), 2)))
+            state = env.get_state()
+            actions = random.integers(0, 18, size=(3000, 2))
+            history = play(env, actions)
+
+            env.set_state(state)
+            assert play(env, actions) == history
+
+            other_env = pikazoo_v0.env(
+                winning_score=3, serve=serve, is_player1_computer=is_computer, is_player2_computer=True
+            )
+            other_env.reset(seed=1)
+            other_env.set_state(state)
+            assert other_env.get_state() == state
+            assert play(other_env, actions) == history
+
+            env.set_state(state)
+
+
+def test_set_state_clears_stacked_frames():
+    env = pikazoo_v0.env(obs_type="pixels", frame_skip=2, frame_stack=4, is_player1_computer=True)
+    env.reset(seed=0)
+    for _ in range(10):
+        env.step({"player_1": 0, "player_2": 0})
+    state = env.get_state()
+    frames = env.frames
+    for _ in range(10):
+        env.step({"player_1": 0, "player_2": 0})
+
+    env.set_state(state)
+    assert env.frames == frames
+    observations, _, _, _, _ = env.step({"player_1": 0, "player_2": 0})
+    assert env.frames == frames + 2
+    # the stack is filled with the first frame after `set_state`
+    stack = observations["player_1"]
+    assert all(np.array_equal(frame, stack[-1]) for frame in stack)
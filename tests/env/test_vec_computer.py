@@ -0,0 +1,99 @@
+import copy
+import numpy as np
+from pikazoo.env import physics
+from pikazoo.env.physics import PikaPhysics, PikaUserInput
+from pikazoo.env.pikazoo_env import ACTION_KEY_MAP
+from pikazoo.env.vec_physics import NUM_STATE_ROWS, PLAYER_FIELDS, VecPlayers, VecBall, VecPikaUserInput
+from pikazoo.env.vec_computer import (
+    ComputerPolicy,
+    get_physics_state,
+    let_computer_decide_user_input,
+    simulate_power_hit_landing_point_x,
+)
+
+
+def test_power_hit_landing_point_matches_simulation():
+    random = np.random.default_rng(0)
+    size = 5000
+    x_direction = random.integers(0, 2, size)
+    y_direction = random.integers(-1, 2, size)
+    x = random.integers(20, 433, size)
+    y = random.integers(-10, 253, size)
+    y_velocity = random.integers(-60, 61, size)
+    landing_point_x = simulate_power_hit_landing_point_x(x_direction, y_direction, x, y, y_velocity)
+    for i in range(size):
+        assert landing_point_x[i] == physics.simulate_power_hit_landing_point_x(
+            int(x_direction[i]), int(y_direction[i]), int(x[i]), int(y[i]), int(y_velocity[i])
+        )
+
+
+def collect_computer_states(frames: int):
+    """Copies of the players and the ball in a computer vs computer match, as the in-engine computer sees them"""
+    computer_physics = PikaPhysics(True, True, np.random.default_rng(0))
+    user_inputs = [PikaUserInput(), PikaUserInput()]
+    snapshots = []
+    for frame in range(frames):
+        if computer_physics.run_engine_for_next_frame(user_inputs):
+            computer_physics.player1.initialize_for_new_round()
+            computer_physics.player2.initialize_for_new_round()
+            computer_physics.ball.initialize_for_new_round(frame % 2 == 0)
+        physics.calculate_expected_landing_point_x_for(computer_physics.ball)
+        snapshot = copy.deepcopy(computer_physics)
+        # both values of the memory of the computer
+        snapshot.player1.computer_where_to_stand_by = snapshot.player2.computer_where_to_stand_by = frame % 2
+        snapshots.append(snapshot)
+    return snapshots
+
+
+def test_vec_computer_matches_in_engine_computer():
+    snapshots = collect_computer_states(3000)
+    num_envs = len(snapshots)
+    state = np.stack([get_physics_state(snapshot) for snapshot in snapshots], axis=1)
+    assert state.shape == (NUM_STATE_ROWS, num_envs)
+    num_player_rows = 2 * len(PLAYER_FIELDS)
+    player = VecPlayers(state[:num_player_rows].reshape(len(PLAYER_FIELDS), 2, num_envs))
+    ball = VecBall(state[num_player_rows:])
+    user_input = VecPikaUserInput(num_envs)
+
+    for side in range(2):
+        np_randoms = [np.random.default_rng(n) for n in range(num_envs)]
+        let_computer_decide_user_input(player, ball, side, user_input, np_randoms)
+        power_hits = 0
+        for n, snapshot in enumerate(snapshots):
+            players = (snapshot.player1, snapshot.player2)
+            expected_input = PikaUserInput()
+            np_random = np.random.default_rng(n)
+            physics.let_computer_decide_user_input(
+                players[side], snapshot.ball, players[1 - side], expected_input, np_random
+            )
+            assert user_input.x_direction[side, n] == expected_input.x_direction, (side, n)
+            assert user_input.y_direction[side, n] == expected_input.y_direction, (side, n)
+            assert user_input.power_hit[side, n] == expected_input.power_hit, (side, n)
+            assert player.computer_where_to_stand_by[side, n] == players[side].computer_where_to_stand_by, (side, n)
+            # same random draws
+            assert np_randoms[n].bit_generator.state == np_random.bit_generator.state, (side, n)
+            power_hits += expected_input.power_hit
+        assert power_hits > 0
+
+
+def test_computer_policy_actions():
+    snapshots = collect_computer_states(500)
+    num_envs = len(snapshots)
+    state = np.stack([get_physics_state(snapshot) for snapshot in snapshots], axis=1)
+    original_state = state.copy()
+    policy = ComputerPolicy(num_envs, side="player_1")
+    np_randoms = [np.random.default_rng(n) for n in range(num_envs)]
+    actions = policy(state, np_randoms)
+    # the policy does not change the states
+    assert np.array_equal(state, original_state)
+    for n, action in enumerate(actions):
+        # the keys of the action give the user input decided by the computer
+        key_input = PikaUserInput()
+        key_input.get_input(ACTION_KEY_MAP[action])
+        assert key_input.x_direction == policy.user_input.x_direction[0, n]
+        assert key_input.y_direction == policy.user_input.y_direction[0, n]
+        assert key_input.power_hit == policy.user_input.power_hit[0, n]
+
+    policy.where_to_stand_by[...] = 1
+    policy.reset(np.arange(0, num_envs, 2))
+    assert np.array_equal(policy.where_to_stand_by, np.arange(num_envs) % 2)
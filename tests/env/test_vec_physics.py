@@ -0,0 +1,60 @@
+import numpy as np
+from pikazoo.env.physics import PikaPhysics, PikaUserInput, GROUND_HALF_WIDTH
+from pikazoo.env.vec_physics import VecPikaPhysics, VecPikaUserInput, PLAYER_FIELDS, BALL_FIELDS
+
+
+def assert_same_state(physics_list, vec_physics):
+    for n, physics in enumerate(physics_list):
+        for i, player in enumerate((physics.player1, physics.player2)):
+            for name in PLAYER_FIELDS:
+                assert getattr(player, name) == getattr(vec_physics.player, name)[i, n], (n, i, name)
+        for name in BALL_FIELDS:
+            assert getattr(physics.ball, name) == getattr(vec_physics.ball, name)[n], (n, name)
+
+
+def test_vec_physics_matches_object_engine():
+    num_envs = 16
+    seeds = range(num_envs)
+    physics_list = [PikaPhysics(False, False, np.random.default_rng(seed)) for seed in seeds]
+    user_inputs = [[PikaUserInput(), PikaUserInput()] for _ in seeds]
+    vec_physics = VecPikaPhysics(num_envs, [np.random.default_rng(seed) for seed in seeds])
+    vec_user_input = VecPikaUserInput(num_envs)
+    assert_same_state(physics_list, vec_physics)
+
+    key_random = np.random.default_rng(1234)
+    for frame in range(3000):
+        keys = key_random.integers(0, 2, size=(2, num_envs, 5), dtype=np.uint8)
+        # hold power hit key sometimes so that the edge detection matters
+        keys[..., 4] &= key_random.integers(0, 2, size=(2, num_envs), dtype=np.uint8)
+
+        if frame == 2000:
+            # game end frames for half of the matches
+            for n in range(0, num_envs, 2):
+                physics_list[n].player1.game_ended = physics_list[n].player2.game_ended = True
+                physics_list[n].player1.is_winner = True
+                vec_physics.player.game_ended[:, n] = 1
+                vec_physics.player.is_winner[0, n] = 1
+
+        vec_user_input.get_input(keys)
+        touching = vec_physics.run_engine_for_next_frame(vec_user_input)
+        for n, physics in enumerate(physics_list):
+            for i in range(2):
+                user_inputs[n][i].get_input(keys[i, n])
+            assert physics.run_engine_for_next_frame(user_inputs[n]) == touching[n]
+
+        for i in range(2):
+            assert np.array_equal(
+                vec_user_input.power_hit_key_is_down_previous[i],
+                [user_inputs[n][i].power_hit_key_is_down_previous for n in seeds],
+            )
+        assert_same_state(physics_list, vec_physics)
+
+        # new round for the matches whose ball touched ground
+        env_indices = np.flatnonzero(touching)
+        is_player2_serve = vec_physics.ball.punch_effect_x[env_indices] < GROUND_HALF_WIDTH
+        for n, serve in zip(env_indices, is_player2_serve):
+            physics_list[n].player1.initialize_for_new_round()
+            physics_list[n].player2.initialize_for_new_round()
+            physics_list[n].ball.initialize_for_new_round(serve)
+        vec_physics.player.initialize_for_new_round(env_indices, vec_physics.np_randoms)
+        vec_physics.ball.initialize_for_new_round(env_indices, is_player2_serve)
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+from pikazoo import pikazoo_v0
+
+
+@pytest.mark.parametrize("serve", ["winner", "alternate", "random"])
+def test_vector_env_matches_raw_env(serve):
+    num_envs = 8
+    vec_env = pikazoo_v0.vector_env(num_envs=num_envs, winning_score=2, serve=serve)
+    envs = [pikazoo_v0.env(winning_score=2, serve=serve) for _ in range(num_envs)]
+
+    vec_observations, _ = vec_env.reset(seed=42)
+    for n, env in enumerate(envs):
+        observations, _ = env.reset(seed=42 + n)
+        assert np.array_equal(vec_observations[n, 0], observations["player_1"])
+        assert np.array_equal(vec_observations[n, 1], observations["player_2"])
+
+    action_random = np.random.default_rng(0)
+    num_game_ended = 0
+    for _ in range(3000):
+        actions = action_random.integers(0, 18, size=(num_envs, 2))
+        vec_observations, vec_rewards, vec_terminations, _, vec_infos = vec_env.step(actions)
+        for n, env in enumerate(envs):
+            observations, rewards, terminations, _, infos = env.step(
+                {"player_1": actions[n, 0], "player_2": actions[n, 1]}
+            )
+            assert vec_rewards[n, 0] == rewards["player_1"] and vec_rewards[n, 1] == rewards["player_2"]
+            assert vec_terminations[n, 0] == terminations["player_1"]
+            if terminations["player_1"]:
+                num_game_ended += 1
+                assert np.array_equal(vec_infos["final_observation"][n, 0], observations["player_1"])
+                assert np.array_equal(vec_infos["final_score"][n], infos["player_1"]["score"])
+                observations, _ = env.reset()
+            assert np.array_equal(vec_observations[n, 0], observations["player_1"])
+            assert np.array_equal(vec_observations[n, 1], observations["player_2"])
+    assert num_game_ended > 0
+
+
+@pytest.mark.parametrize("context", ["fork", "spawn"])
+def test_async_vector_env_matches_vector_env(context):
+    num_envs = 7
+    vec_env = pikazoo_v0.vector_env(num_envs=num_envs, winning_score=2)
+    async_env = pikazoo_v0.async_vector_env(num_envs=num_envs, num_workers=3, context=context, winning_score=2)
+    try:
+        vec_observations, _ = vec_env.reset(seed=7)
+        async_observations, _ = async_env.reset(seed=7)
+        assert np.array_equal(vec_observations, async_observations)
+
+        action_random = np.random.default_rng(0)
+        for _ in range(1000):
+            actions = action_random.integers(0, 18, size=(num_envs, 2))
+            vec_results = vec_env.step(actions)
+            async_results = async_env.step(actions)
+            for vec_result, async_result in zip(vec_results[:4], async_results[:4]):
+                assert np.array_equal(vec_result, async_result)
+            game_ended = vec_results[2][:, 0]
+            if game_ended.any():
+                for key in ("final_observation", "final_score"):
+                    assert np.array_equal(vec_results[4][key][game_ended], async_results[4][key][game_ended])
+    finally:
+        async_env.close()
+
+
+def test_vector_env_observation_space():
+    vec_env = pikazoo_v0.vector_env(num_envs=2)
+    async_env = pikazoo_v0.async_vector_env(num_envs=2, num_workers=1)
+    try:
+        env = pikazoo_v0.env()
+        observations, _ = vec_env.reset(seed=0)
+        for agent in env.possible_agents:
+            assert vec_env.observation_space(agent) == env.observation_space(agent)
+            assert async_env.observation_space(agent) == env.observation_space(agent)
+            for n in range(2):
+                assert vec_env.observation_space(agent).contains(observations[n, env.possible_agents.index(agent)])
+    finally:
+        async_env.close()
+
+
+@pytest.mark.parametrize("context", ["fork", "spawn"])
+def test_async_vector_env_worker_error_closes_cleanly(context):
+    async_env = pikazoo_v0.async_vector_env(num_envs=4, num_workers=2, context=context)
+    try:
+        async_env.reset(seed=0)
+        # an invalid action in the shard of the first worker, while the second worker steps as usual
+        actions = np.zeros((4, 2), dtype=np.int32)
+        actions[0, 0] = 18
+        with pytest.raises(RuntimeError, match="Worker of async_vector_env failed"):
+            async_env.step(actions)
+        assert async_env.closed
+        # the second worker read its close command after its step reply, and exited without an error
+        assert [process.exitcode for process in async_env._processes] == [0, 0]
+    finally:
+        async_env.close()
@@ -0,0 +1,29 @@
+import json
+from pikazoo import benchmark
+
+
+def test_benchmark_writes_results_and_catches_regressions(tmp_path):
+    output = tmp_path / "results.json"
+    scenarios = ["step", "reset", "wrapper_*"]
+    argv = ["--scenarios", *scenarios, "--steps", "50", "--rounds", "1", "--memory-steps", "10"]
+    assert benchmark.main(argv + ["--output", str(output)]) == 0
+
+    with open(output) as f:
+        data = json.load(f)
+    results = data["results"]
+    assert set(results) == {"step", "reset"} | {f"wrapper_{name}" for name in benchmark.WRAPPERS}
+    for metrics in results.values():
+        assert metrics["frames_per_sec"] > 0
+        assert 0 < metrics["p50_us"] <= metrics["p99_us"]
+        assert metrics["peak_memory_kib"] > 0
+    assert data["metadata"]["pikazoo"]
+
+    # a baseline 10 times faster than this run
+    for metrics in results.values():
+        metrics["frames_per_sec"] *= 10
+    baseline = tmp_path / "baseline.json"
+    with open(baseline, "w") as f:
+        json.dump(data, f)
+    argv = ["--scenarios", "step", "--steps", "50", "--rounds", "1", "--memory-steps", "10"]
+    assert benchmark.main(argv + ["--baseline", str(baseline)]) == 1
+    assert benchmark.compare(results, results, 0.1) == []
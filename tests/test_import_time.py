@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_headless_env_does_not_import_pygame():
+    # a new interpreter, since pygame may already be imported by other tests
+    code = (
+        "import sys\n"
+        "from pikazoo import pikazoo_v0\n"
+        "assert 'pikazoo.env.pikazoo_env' not in sys.modules\n"
+        "env = pikazoo_v0.env()\n"
+        "env.reset()\n"
+        "assert 'pygame' not in sys.modules\n"
+        "env.step({'player_1': 0, 'player_2': 0})\n"
+        "assert 'pygame' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+
+
+def test_import_time_within_baseline():
+    # the baseline was measured on one machine, so only a several times slower import fails here
+    script = os.path.join(ROOT, "benchmarks", "import_time.py")
+    baseline = os.path.join(ROOT, "benchmarks", "import_time.json")
+    argv = ["--runs", "3", "--top", "0", "--baseline", baseline, "--tolerance", "4"]
+    subprocess.run([sys.executable, script, *argv], cwd=ROOT, check=True)
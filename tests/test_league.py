@@ -0,0 +1,63 @@
+import numpy as np
+from pikazoo.league import League, OpponentPool
+
+
+def constant_policy(params, observations):
+    """Snapshot whose params are the action it always takes"""
+    return np.full(len(observations), params)
+
+
+def test_opponent_pool_prioritizes_stronger_opponents():
+    pool = OpponentPool(exponent=2.0)
+    weak = pool.add("weak")
+    strong = pool.add("strong")
+    assert np.allclose(pool.weights, [0.5, 0.5])
+    for _ in range(10):
+        pool.record(weak, True)
+        pool.record(strong, False)
+    assert pool.weights[strong] > 0.9
+    opponent_ids = pool.sample(np.random.default_rng(0), 1000)
+    assert (opponent_ids == strong).mean() > 0.9
+
+    uniform_pool = OpponentPool(exponent=0.0)
+    uniform_pool.add(None)
+    uniform_pool.add(None)
+    uniform_pool.record(0, True)
+    assert np.allclose(uniform_pool.weights, [0.5, 0.5])
+
+
+def test_league_plays_and_records_matches():
+    num_envs = 6
+    league = League(constant_policy, num_envs=num_envs, num_workers=2, seed=0, context="fork", winning_score=1)
+    try:
+        # NOOP and always jumping
+        league.add_opponent(0)
+        league.add_opponent(2)
+        observations, infos = league.reset(seed=0)
+        assert observations.shape == (num_envs, 35)
+        assert set(infos["opponent_ids"].tolist()) <= {0, 1}
+
+        action_random = np.random.default_rng(0)
+        results = []
+        for _ in range(3000):
+            actions = action_random.integers(0, 18, size=num_envs)
+            observations, rewards, terminations, truncations, infos = league.step(actions)
+            assert rewards.shape == terminations.shape == (num_envs,)
+            for result in infos["results"]:
+                assert terminations[result.slot]
+                assert max(result.score, result.opponent_score) == 1
+            results += infos["results"]
+        assert len(results) > num_envs
+        assert league.pool.games.sum() == len(results)
+        assert league.pool.wins.sum() == sum(result.is_win for result in results)
+
+        # a snapshot added while playing is sent to the workers
+        new_opponent = league.add_opponent(4)
+        league.pool.exponent = 0.0
+        for _ in range(3000):
+            _, _, _, _, infos = league.step(action_random.integers(0, 18, size=num_envs))
+            if new_opponent in infos["opponent_ids"]:
+                break
+        assert new_opponent in infos["opponent_ids"]
+    finally:
+        league.close()
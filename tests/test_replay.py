@@ -0,0 +1,31 @@
+import os
+import numpy as np
+import pytest
+from pikazoo import pikazoo_v0
+from pikazoo.replay import Replay
+from pikazoo.wrappers import RecordReplay
+
+
+def test_replay_reproduces_match(tmp_path):
+    # rendering while recording must not change the match
+    env = RecordReplay(
+        pikazoo_v0.env(winning_score=3, serve="random", is_player2_computer=True, render_mode="rgb_array"),
+        str(tmp_path),
+    )
+    env.reset(seed=3)
+    rng = np.random.default_rng(0)
+    while env.agents:
+        env.step({"player_1": int(rng.integers(18)), "player_2": 0})
+        env.render()
+    path = str(tmp_path / "episode-0.pkzr")
+    assert os.path.getsize(path) < 4096
+
+    replay = Replay.load(path)
+    assert replay.seed == 3
+    assert replay.env_kwargs["serve"] == "random"
+    replayed = replay.play()
+    assert replayed.get_state() == env.unwrapped.get_state()
+
+    replay.frames += 1
+    with pytest.raises(ValueError):
+        replay.play()
@@ -0,0 +1,73 @@
+import numpy as np
+from pikazoo import pikazoo_v0
+from pikazoo.env.pikazoo_env import ACTION_KEY_MAP
+from pikazoo.wrappers import BatchedPolicy, ConvertSingleAgent
+
+
+def play(env, steps):
+    for _ in range(steps):
+        _, _, terminated, truncated, _ = env.step(0)
+        if terminated or truncated:
+            env.reset()
+
+
+def test_random_opponent_is_seeded_by_action_space():
+    opponent_actions = []
+    for _ in range(2):
+        env = ConvertSingleAgent(pikazoo_v0.env(), "player_1")
+        env.action_space("player_2").seed(0)
+        env.reset(seed=0)
+        play(env, 100)
+        opponent_actions.append(list(env._random_actions))
+    assert opponent_actions[0] == opponent_actions[1]
+    assert all(0 <= action < 18 for action in opponent_actions[0])
+
+
+def test_computer_opponent():
+    env = ConvertSingleAgent(pikazoo_v0.env(), "player_1", opponent="computer")
+    assert env.unwrapped.physics.player2.is_computer
+    assert not env.unwrapped.physics.player1.is_computer
+    env.reset(seed=0)
+    play(env, 300)
+    # the computer moves without any action
+    assert env.unwrapped.physics.player2.x != 432 - 36
+
+
+def test_script_opponent():
+    script = [4, 3, 2]
+    env = ConvertSingleAgent(pikazoo_v0.env(), "player_2", opponent=script)
+    env.reset(seed=0)
+    for step in range(7):
+        env.step(0)
+        keys = ACTION_KEY_MAP[script[step % len(script)]]
+        assert env.unwrapped.keyboard_array[0].left_key == bool(keys[0])
+        assert env.unwrapped.keyboard_array[0].right_key == bool(keys[1])
+        assert env.unwrapped.keyboard_array[0].up_key == bool(keys[2])
+    env.reset()
+    env.step(0)
+    assert env.unwrapped.keyboard_array[0].left_key
+
+
+def test_batched_policy_is_called_once_per_step():
+    batch_sizes = []
+
+    def policy(observations):
+        batch_sizes.append(len(observations))
+        # move toward the ball
+        return np.where(observations[:, 0] < observations[:, 26], 3, 4)
+
+    batched_policy = BatchedPolicy(policy)
+    envs = [ConvertSingleAgent(pikazoo_v0.env(), "player_1", opponent=batched_policy) for _ in range(4)]
+    for seed, env in enumerate(envs):
+        env.reset(seed=seed)
+    for _ in range(50):
+        for env in envs:
+            env.step(0)
+    assert batched_policy.num_calls == 50
+    assert batch_sizes == [4] * 50
+
+    # a plain callable is evaluated for its env alone
+    env = ConvertSingleAgent(pikazoo_v0.env(), "player_1", opponent=policy)
+    env.reset(seed=0)
+    env.step(0)
+    assert batch_sizes[-1] == 1
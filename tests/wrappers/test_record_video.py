@@ -0,0 +1,76 @@
+import threading
+import numpy as np
+from pikazoo import pikazoo_v0
+from pikazoo.wrappers import RecordVideo
+
+
+class ListWriter:
+    """Writer which keeps the frames, made by `writer_factory`"""
+
+    writers = []
+
+    def __init__(self, path, size, fps):
+        self.path = path
+        self.size = size
+        self.frames = []
+        self.closed = False
+        ListWriter.writers.append(self)
+
+    def write_frame(self, frame):
+        self.frames.append(frame.copy())
+
+    def close(self):
+        self.closed = True
+
+
+class SlowWriter(ListWriter):
+    """Writer which writes nothing until `release` is set"""
+
+    release = threading.Event()
+
+    def write_frame(self, frame):
+        SlowWriter.release.wait()
+        super().write_frame(frame)
+
+
+def test_record_video_writes_every_frame(tmp_path):
+    ListWriter.writers = []
+    kwargs = dict(winning_score=1, render_mode="rgb_array", is_player1_computer=True, is_player2_computer=True)
+    env = RecordVideo(pikazoo_v0.env(**kwargs), str(tmp_path), queue_size=4, writer_factory=ListWriter)
+    expected_env = pikazoo_v0.env(**kwargs)
+    expected = []
+    for seed in range(2):
+        env.reset(seed=seed)
+        expected_env.reset(seed=seed)
+        frames = [expected_env.render()]
+        while env.agents:
+            env.step({"player_1": 0, "player_2": 0})
+            expected_env.step({"player_1": 0, "player_2": 0})
+            frames.append(expected_env.render())
+        expected.append(frames)
+    env.close()
+
+    assert env.dropped_frames == 0
+    assert len(ListWriter.writers) == 2
+    for episode_id, (writer, frames) in enumerate(zip(ListWriter.writers, expected)):
+        assert writer.path == str(tmp_path / f"episode-{episode_id}.mp4")
+        assert writer.size == (432, 304)
+        assert writer.closed
+        assert len(writer.frames) == len(frames)
+        for frame, expected_frame in zip(writer.frames, frames):
+            assert np.array_equal(frame, expected_frame)
+
+
+def test_record_video_drops_frames(tmp_path):
+    ListWriter.writers = []
+    SlowWriter.release.clear()
+    env = pikazoo_v0.env(render_mode="rgb_array")
+    env = RecordVideo(env, str(tmp_path), queue_size=2, policy="drop", writer_factory=SlowWriter)
+    env.reset(seed=0)
+    for _ in range(10):
+        env.step({"player_1": 0, "player_2": 0})
+    # the frame of reset and of the first step fill both buffers
+    assert env.dropped_frames == 11 - 2
+    SlowWriter.release.set()
+    env.close()
+    assert len(ListWriter.writers[0].frames) == 2